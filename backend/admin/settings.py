@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 import dj_database_url
@@ -48,7 +49,7 @@ CSRF_COOKIE_SECURE = DEBUG is False
 
 CUSTOM_APPS = [
     'authentication.apps.AuthenticationConfig',
-    'utils',
+    'utils.apps.UtilsConfig',
 ]
 
 INSTALLED_APPS = [
@@ -63,12 +64,15 @@ INSTALLED_APPS = [
 ] + CUSTOM_APPS
 
 MIDDLEWARE = [
+    'utils.middleware.RequestMetricsMiddleware',
+    'utils.profiling.ProfilingMiddleware',
+    'utils.routers.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'authentication.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -109,6 +113,96 @@ if DEBUG:
 else:
     DATABASES = {'default': dj_database_url.parse(os.getenv('DB_URL'))}
 
+# Read replicas (see utils.routers), comma separated database URLs
+DATABASE_REPLICAS = []
+
+for i, url in enumerate(filter(None, os.getenv('DB_REPLICA_URLS', '').split(',')), 1):
+    DATABASES[f'replica_{i}'] = {
+        **dj_database_url.parse(url.strip()),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{i}')
+
+# Keep a client's reads on the primary this long after it wrote
+REPLICA_PIN_SECONDS = 5
+
+# Users sharded by id (see authentication.sharding), comma separated database
+# URLs added next to `default`, which keeps the bucket map and email directory
+USER_SHARDS = []
+
+for i, url in enumerate(filter(None, os.getenv('USER_SHARD_URLS', '').split(',')), 1):
+    DATABASES[f'shard_{i}'] = dj_database_url.parse(url.strip())
+    USER_SHARDS.append(f'shard_{i}')
+
+if USER_SHARDS:
+    USER_SHARDS.insert(0, 'default')
+
+SHARD_MAP_TTL = 5  # seconds before a moved bucket is seen by every process
+
+DATABASE_ROUTERS = []
+
+if USER_SHARDS:
+    DATABASE_ROUTERS.append('authentication.sharding.UserShardRouter')
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS.append('utils.routers.ReplicaRouter')
+
+
+# Sessions
+# https://docs.djangoproject.com/en/4.0/topics/http/sessions/
+
+SESSION_ENGINE = os.getenv('SESSION_ENGINE', 'django.contrib.sessions.backends.db')
+
+# In-process session LRU used by `utils.sessions`
+SESSION_LOCAL_CACHE_SIZE = 10_000
+
+# Sessions deleted by other processes stay valid in the LRU for up to this
+# long, 0 disables the LRU
+SESSION_LOCAL_CACHE_TTL = int(os.getenv('SESSION_LOCAL_CACHE_TTL', 5))  # seconds
+
+SESSION_WRITE_BEHIND_INTERVAL = 1  # seconds
+
+# Failed session writes are retried on the next flushes, then dropped
+SESSION_WRITE_BEHIND_RETRIES = 3
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/4.0/topics/auth/passwords/
+# Run `manage.py calibrate_hasher` to pick the costs for this host.
+
+PASSWORD_HASHER = os.getenv(
+    'PASSWORD_HASHER', 'authentication.hashers.TunedPBKDF2PasswordHasher'
+)
+
+PASSWORD_HASHERS = [PASSWORD_HASHER] + [
+    hasher
+    for hasher in [
+        'authentication.hashers.TunedPBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'authentication.hashers.TunedArgon2PasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+        'authentication.hashers.TunedScryptPasswordHasher',
+    ]
+    if hasher != PASSWORD_HASHER
+]
+
+# Empty values keep Django's defaults
+PBKDF2_ITERATIONS = int(os.getenv('PBKDF2_ITERATIONS', 0)) or None
+
+SCRYPT_WORK_FACTOR = int(os.getenv('SCRYPT_WORK_FACTOR', 0)) or None
+
+ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', 0)) or None
+
+ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', 0)) or None
+
+# Authentication events and last_login writes, buffered (see
+# authentication.audit)
+AUTH_EVENTS_FLUSH_INTERVAL = 1  # seconds
+
+AUTH_EVENTS_BUFFER_SIZE = 1000
+
+AUTH_EVENTS_RETRIES = 3  # failed flushes in a row before dropping the items
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -128,6 +222,15 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Breached passwords file (see authentication.validators), built with
+# `manage.py build_breached_passwords`, not checked when empty
+BREACHED_PASSWORDS_FILE = os.getenv('BREACHED_PASSWORDS_FILE', '')
+
+if BREACHED_PASSWORDS_FILE:
+    AUTH_PASSWORD_VALIDATORS.append(
+        {'NAME': 'authentication.validators.BreachedPasswordValidator'}
+    )
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.0/topics/i18n/
@@ -160,6 +263,48 @@ EMAIL_USE_TLS = EMAIL_PORT == 587
 
 EMAIL_USE_SSL = EMAIL_PORT == 465
 
+# Queue emails in the DB outbox, delivered by `manage.py run_mail_worker`
+EMAIL_USE_OUTBOX = os.getenv('EMAIL_USE_OUTBOX', '0') == '1'
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = 8
+
+EMAIL_OUTBOX_RETRY_DELAY = 30  # seconds, doubled on every attempt
+
+EMAIL_OUTBOX_MAX_RETRY_DELAY = 60 * 60
+
+# Claimed emails are due again after it, should their worker die mid batch
+EMAIL_OUTBOX_LEASE = 5 * 60  # seconds
+
+# Request metrics (see utils.metrics), served on /metrics/
+# Share of requests whose phases are timed and sent as `Server-Timing`
+METRICS_SAMPLE_RATE = float(os.getenv('METRICS_SAMPLE_RATE', '0.05'))
+
+# Bearer token required to read /metrics/, only open in DEBUG when empty
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Request profiling (see utils.profiling), read with `manage.py profiles`
+# Share of requests profiled, besides those sent with a signed `X-Profile`
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+
+# `sampling` (collapsed stacks) or `cprofile` (pstats)
+PROFILING_MODE = os.getenv('PROFILING_MODE', 'sampling')
+
+PROFILING_INTERVAL = 0.001  # seconds between stack samples
+
+PROFILING_DIR = os.getenv(
+    'PROFILING_DIR', os.path.join(tempfile.gettempdir(), 'request-profiles')
+)
+
+PROFILING_MAX_FILES = 200
+
+PROFILING_SIGNATURE_MAX_AGE = 60 * 60  # seconds
+
+# OpenAPI schema built once per URLconf (see utils.schema), prebuild it with
+# `manage.py build_schema`; kept in memory only when empty
+SCHEMA_CACHE_DIR = os.getenv(
+    'SCHEMA_CACHE_DIR', os.path.join(BASE_DIR, 'cache', 'openapi-schema')
+)
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/4.0/howto/static-files/
 
@@ -178,6 +323,14 @@ MEDIA_ROOT = BASE_DIR / 'static' / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Base 64 primary keys (see utils.models)
+
+PK_BASE_64_GENERATOR = (
+    'utils.models.ShardedTimeOrderedBase64Generator'
+    if USER_SHARDS
+    else 'utils.models.TimeOrderedBase64Generator'
+)
+
 # Authentication
 # https://docs.djangoproject.com/en/4.0/topics/auth/customizing/
 
@@ -185,11 +338,91 @@ AUTH_USER_MODEL = 'authentication.User'
 
 AUTHENTICATION_BACKENDS = ['authentication.backends.EmailBackend']
 
+# Cache alias for sign-in email lookups, disabled when empty
+AUTH_EMAIL_LOOKUP_CACHE = os.getenv('AUTH_EMAIL_LOOKUP_CACHE') or None
+
+AUTH_EMAIL_LOOKUP_CACHE_TIMEOUT = 5 * 60
+
+# Cache alias for permission sets shared across workers (see
+# authentication.permissions), disabled when empty
+AUTH_PERMISSION_CACHE = os.getenv('AUTH_PERMISSION_CACHE') or None
+
+AUTH_PERMISSION_CACHE_TIMEOUT = 60 * 60
+
+# Authenticated users cache (see authentication.user_cache): an in-process
+# LRU, in front of a shared cache alias when set
+AUTH_USER_CACHE = os.getenv('AUTH_USER_CACHE') or None
+
+AUTH_USER_CACHE_TIMEOUT = 10 * 60
+
+AUTH_USER_CACHE_SIZE = 10_000
+
+AUTH_USER_CACHE_TTL = 5  # seconds, bounds staleness across processes
+
+# Signed access tokens, issued by sign-in on request (see
+# authentication.access_tokens)
+ACCESS_TOKEN_LIFETIME = int(os.getenv('ACCESS_TOKEN_LIFETIME', 5 * 60))
+
+REFRESH_TOKEN_LIFETIME = int(os.getenv('REFRESH_TOKEN_LIFETIME', 14 * 24 * 60 * 60))
+
+# How often a process reloads revoked tokens, in seconds
+ACCESS_TOKEN_DENYLIST_INTERVAL = 30
+
+# Serve the async authentication viewsets (ASGI deployments)
+ASYNC_AUTH_VIEWS = os.getenv('ASYNC_AUTH_VIEWS', '0') == '1'
+
+# Threads used to hash passwords off the event loop
+PASSWORD_HASHING_THREADS = int(os.getenv('PASSWORD_HASHING_THREADS', os.cpu_count()))
+
+# Concurrent password hashing requests, extra ones wait in a short queue and
+# are answered with 503 once it's full
+HASHING_CONCURRENCY_PER_PROCESS = int(
+    os.getenv('HASHING_CONCURRENCY_PER_PROCESS', os.cpu_count())
+)
+
+HASHING_CONCURRENCY_PER_HOST = (
+    int(os.getenv('HASHING_CONCURRENCY_PER_HOST', 0)) or None
+)
+
+HASHING_QUEUE_SIZE = 8
+
+HASHING_QUEUE_TIMEOUT = 0.5  # seconds
+
+HASHING_RETRY_AFTER = 1  # seconds
+
+# Outdated password hashes waiting to be upgraded in the background, sign ins
+# beyond it leave the upgrade to a later one
+PASSWORD_REHASH_QUEUE_SIZE = 100
+
 # DRF
 # https://www.django-rest-framework.org/
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'authentication.access_tokens.AccessTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
+    # JSON through orjson when it's installed, `json` otherwise
+    'DEFAULT_RENDERER_CLASSES': [
+        'utils.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'utils.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_THROTTLE_RATES': {
+        'sign_in': '30/min',
+        'sign_in_email': '10/min',
+        'account_mail': '20/hour',
+        'account_mail_email': '5/hour',
+    },
+    # Proxies in front of the app, throttles ignore X-Forwarded-For without
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
+
+# Sliding window throttle counters: 'local' (per process) or a cache alias
+THROTTLE_STORE = os.getenv('THROTTLE_STORE', 'local')
+
+THROTTLE_LOCAL_MAX_KEYS = 100_000  # per scope, least recently hit evicted first
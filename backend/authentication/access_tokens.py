@@ -0,0 +1,211 @@
+"""
+Signed, stateless access tokens for clients that don't keep a session.
+
+`sign_in` issues them on request: a short lived access token with a refresh
+token, both carrying the user, its backend, its session auth hash and a
+family shared by the tokens refreshed from the same sign in.
+
+Access tokens are checked in process: signature, age and session auth hash,
+the user coming from authentication.user_cache. Revoked families only reach
+them through `denylist`, which each process reloads every
+`ACCESS_TOKEN_DENYLIST_INTERVAL` seconds, so most requests don't touch the
+database. Refresh tokens are checked against the database and single use.
+"""
+import secrets
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.extensions import OpenApiAuthenticationExtension
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from .models import RevokedToken
+from .user_cache import load_user
+
+ACCESS_SALT = 'authentication.access_tokens.access'
+REFRESH_SALT = 'authentication.access_tokens.refresh'
+
+
+def _signer(salt) -> signing.TimestampSigner:
+    return signing.TimestampSigner(salt=salt, algorithm='sha256')
+
+
+def _new_id() -> str:
+    return secrets.token_urlsafe(12)
+
+
+def issue_tokens(user, backend=None, family=None) -> dict:
+    """
+    Sign a new access and refresh token pair for `user`, in a new family
+    unless `family` is given.
+    """
+    claims = {
+        'u': user.pk,
+        'b': backend or getattr(user, 'backend', settings.AUTHENTICATION_BACKENDS[0]),
+        'h': user.get_session_auth_hash(),
+        'f': family or _new_id(),
+    }
+    return {
+        'token_type': 'Bearer',
+        'access': _signer(ACCESS_SALT).sign_object(claims),
+        'refresh': _signer(REFRESH_SALT).sign_object({**claims, 'j': _new_id()}),
+        'expires_in': settings.ACCESS_TOKEN_LIFETIME,
+    }
+
+
+def read_token(token: str, salt: str, max_age: int) -> dict | None:
+    """
+    Claims of `token` if it's signed with `salt` and not expired.
+    """
+    try:
+        claims = _signer(salt).unsign_object(token, max_age=max_age)
+    except signing.BadSignature:
+        return None
+    return claims if isinstance(claims, dict) else None
+
+
+class Denylist:
+    """
+    Ids revoked recently enough for access tokens to carry them, reloaded at
+    most every `ACCESS_TOKEN_DENYLIST_INTERVAL` seconds.
+    """
+
+    def __init__(self):
+        self.ids = frozenset()
+        self.loaded_at = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, token_id) -> bool:
+        if (
+            self.loaded_at is None
+            or time.monotonic() - self.loaded_at
+            >= settings.ACCESS_TOKEN_DENYLIST_INTERVAL
+        ):
+            self.reload()
+        return token_id in self.ids
+
+    def reload(self):
+        # Other threads keep reading the previous ids meanwhile.
+        if self.loaded_at is not None and self._lock.locked():
+            return
+        with self._lock:
+            # Access tokens issued before a revocation expire within their
+            # lifetime, older revocations can't match any.
+            since = timezone.now() - timedelta(seconds=settings.ACCESS_TOKEN_LIFETIME)
+            self.ids = frozenset(
+                RevokedToken.objects.filter(revoked_at__gte=since).values_list(
+                    'id', flat=True
+                )
+            )
+            self.loaded_at = time.monotonic()
+
+    def add(self, token_id):
+        self.ids = self.ids | {token_id}
+
+    def clear(self):
+        self.ids = frozenset()
+        self.loaded_at = None
+
+
+denylist = Denylist()
+
+
+def revoke(token_id: str) -> bool:
+    """
+    Revoke a refresh token or a family, False when it already was.
+    """
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=settings.REFRESH_TOKEN_LIFETIME)
+    RevokedToken.objects.filter(expires_at__lt=now).delete()
+    try:
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            RevokedToken.objects.create(id=token_id, expires_at=expires_at)
+    except IntegrityError:
+        return False
+    denylist.add(token_id)
+    return True
+
+
+def authenticate_access(token: str):
+    """
+    Return the user of a valid access token with its claims, None otherwise.
+    """
+    claims = read_token(token, ACCESS_SALT, settings.ACCESS_TOKEN_LIFETIME)
+    if claims is None or claims['f'] in denylist:
+        return None
+    user = load_user(claims['u'], claims['b'], claims['h'])
+    return None if user is None else (user, claims)
+
+
+def refresh_tokens(token: str) -> dict | None:
+    """
+    Exchange a refresh token for a new pair of the same family, None when
+    it's invalid, expired or revoked.
+    """
+    claims = read_token(token, REFRESH_SALT, settings.REFRESH_TOKEN_LIFETIME)
+    if claims is None:
+        return None
+    revoked = RevokedToken.objects.using(DEFAULT_DB_ALIAS).filter(pk=claims['f'])
+    if revoked.exists():
+        return None
+    user = load_user(claims['u'], claims['b'], claims['h'])
+    if user is None:
+        return None
+    if not revoke(claims['j']):
+        # Refreshed twice, the token leaked: end the whole family.
+        revoke(claims['f'])
+        return None
+    return issue_tokens(user, claims['b'], claims['f'])
+
+
+def revoke_tokens(token: str) -> bool:
+    """
+    Revoke the family of a refresh token, False when it's invalid.
+    """
+    claims = read_token(token, REFRESH_SALT, settings.REFRESH_TOKEN_LIFETIME)
+    if claims is None:
+        return False
+    revoke(claims['f'])
+    return True
+
+
+class AccessTokenAuthentication(BaseAuthentication):
+    """
+    Authenticate `Authorization: Bearer <access token>` requests. No cookie is
+    involved, so no CSRF check either.
+    """
+
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        header = get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(header) != 2:
+            raise AuthenticationFailed(_('Invalid token header.'))
+        try:
+            token = header[1].decode()
+        except UnicodeError as error:
+            raise AuthenticationFailed(_('Invalid token header.')) from error
+
+        authenticated = authenticate_access(token)
+        if authenticated is None:
+            raise AuthenticationFailed(_('Invalid or expired token.'))
+        return authenticated
+
+    def authenticate_header(self, request):
+        return self.keyword
+
+
+class AccessTokenScheme(OpenApiAuthenticationExtension):
+    target_class = AccessTokenAuthentication
+    name = 'accessToken'
+
+    def get_security_definition(self, auto_schema):
+        return {'type': 'http', 'scheme': 'bearer'}
@@ -6,4 +6,9 @@ class AuthenticationConfig(AppConfig):
     name = 'authentication'
 
     def ready(self) -> None:
+        from django.contrib.auth.signals import user_logged_in
+
         import authentication.signals  # pylint: disable=unused-import
+
+        # last_login is written in batches by authentication.audit instead.
+        user_logged_in.disconnect(dispatch_uid='update_last_login')
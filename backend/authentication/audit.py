@@ -0,0 +1,108 @@
+"""
+Authentication events and last_login writes, buffered in process.
+
+Receivers only queue them, background threads insert events with
+`bulk_create` and update the last_login of each user once per flush, in
+separate queues so a failure of one doesn't hold back the other. They flush
+every `AUTH_EVENTS_FLUSH_INTERVAL` seconds, as soon as
+`AUTH_EVENTS_BUFFER_SIZE` items are waiting, and when the process exits.
+
+Failed flushes are retried `AUTH_EVENTS_RETRIES` times before their items are
+dropped, and items still buffered when the process is killed are lost: the
+audit trail is best effort.
+"""
+import logging
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_ipv46_address
+from django.db import DataError, IntegrityError, transaction
+from django.utils import timezone
+
+from utils.background import BackgroundQueue
+
+from .models import AuthEvent, User
+from .sharding import pk_shard
+
+logger = logging.getLogger(__name__)
+
+EMAIL_MAX_LENGTH = AuthEvent._meta.get_field('email').max_length
+
+
+def flush_events(events):
+    try:
+        with transaction.atomic():
+            AuthEvent.objects.bulk_create(events, batch_size=500)
+    except (DataError, IntegrityError):
+        # Insert one by one, only dropping the rows the database rejects.
+        for event in events:
+            try:
+                with transaction.atomic():
+                    event.save()
+            except (DataError, IntegrityError):
+                logger.exception('Dropped auth event %s', event)
+
+
+def flush_logins(users):
+    # Users deleted meanwhile have no row left to update.
+    shards = defaultdict(list)
+    for user in users:
+        shards[pk_shard(user.pk)].append(user)
+    for database, shard_users in shards.items():
+        with transaction.atomic(using=database):
+            User.objects.using(database).bulk_update(
+                shard_users, ['last_login'], batch_size=500
+            )
+
+
+def _queue(flush, name) -> BackgroundQueue:
+    return BackgroundQueue(
+        flush,
+        interval=settings.AUTH_EVENTS_FLUSH_INTERVAL,
+        max_size=settings.AUTH_EVENTS_BUFFER_SIZE,
+        name=name,
+        retries=settings.AUTH_EVENTS_RETRIES,
+    )
+
+
+@lru_cache(maxsize=None)
+def event_queue() -> BackgroundQueue:
+    return _queue(flush_events, 'auth-events')
+
+
+@lru_cache(maxsize=None)
+def login_queue() -> BackgroundQueue:
+    return _queue(flush_logins, 'auth-last-login')
+
+
+def client_ip(request) -> str | None:
+    ip = request.META.get('REMOTE_ADDR') if request is not None else None
+    try:
+        validate_ipv46_address(ip)
+    except ValidationError:
+        return None
+    return ip
+
+
+def record(kind: AuthEvent.Kind, request=None, user=None, email=''):
+    event_queue().put(
+        AuthEvent(
+            kind=kind,
+            user_id=getattr(user, 'pk', None),
+            # Failed sign ins carry whatever email was posted.
+            email=(email or getattr(user, 'email', ''))[:EMAIL_MAX_LENGTH],
+            ip=client_ip(request),
+        )
+    )
+
+
+def record_login(request, user: User):
+    """
+    Record a sign in and update last_login, `update_last_login` replacement.
+    """
+    user.last_login = timezone.now()
+    # Repeated sign ins of a user only keep the latest last_login.
+    login_queue().put(User(pk=user.pk, last_login=user.last_login), key=user.pk)
+    record(AuthEvent.Kind.LOGIN, request, user)
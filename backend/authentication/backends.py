@@ -1,26 +1,249 @@
+import enum
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import _clean_credentials, get_backends, user_login_failed
 from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Permission
+from django.core.cache import caches
 from django.db.models import Q
 
-from .models import User
+from utils.models import normalize_email
+
+from .hashing import acheck_password, amake_password, verify_password
+from .models import EffectivePermission, User
+from .permissions import cached_permissions
+from .sharding import pk_shard, users_by_email
+
+# Cached marker for emails without an account.
+MISSING = 'missing'
+
+
+class AuthOutcome(enum.Enum):
+    OK = 'ok'
+    UNVERIFIED = 'unverified'
+    UNKNOWN = 'unknown'
+    INACTIVE = 'inactive'
+
+
+def _email_cache():
+    alias = getattr(settings, 'AUTH_EMAIL_LOOKUP_CACHE', None)
+    return caches[alias] if alias else None
+
+
+def _email_cache_key(email: str) -> str:
+    key = normalize_email(email)
+    return 'auth:email:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_user_by_email(email: str) -> User | None:
+    """
+    Return the user owning `email`. With `AUTH_EMAIL_LOOKUP_CACHE` the id of
+    the owner is cached, unknown emails too so repeated misses stay cheap, and
+    the user is loaded by id: cached entries hold no password hash and can't
+    go stale on `.update()`.
+    """
+    cache = _email_cache()
+    if cache is None:
+        return users_by_email(email).first()
+
+    key = _email_cache_key(email)
+    user_id = cache.get(key)
+    if user_id == MISSING:
+        return None
+    if user_id is not None:
+        user = (
+            User._default_manager.using(pk_shard(user_id))
+            .filter(pk=user_id, email_normalized=normalize_email(email))
+            .first()
+        )
+        if user is not None:
+            return user
+
+    user = users_by_email(email).first()
+    user_id = MISSING if user is None else user.pk
+    cache.set(key, user_id, settings.AUTH_EMAIL_LOOKUP_CACHE_TIMEOUT)
+    return user
+
+
+def invalidate_email_lookup(*emails):
+    cache = _email_cache()
+    if cache is not None:
+        cache.delete_many([_email_cache_key(email) for email in emails if email])
 
 
 class EmailBackend(ModelBackend):
+    def _get_permissions(self, user_obj, obj, from_name):
+        # Permission sets come from the shared cache when it's enabled.
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        perm_cache_name = f'_{from_name}_perm_cache'
+        if not hasattr(user_obj, perm_cache_name):
+            cached = cached_permissions(user_obj)
+            if cached is None:
+                return super()._get_permissions(user_obj, obj, from_name)
+            user_obj._user_perm_cache, user_obj._group_perm_cache = map(set, cached)
+        return getattr(user_obj, perm_cache_name)
+
+    def with_perm(self, perm, is_active=True, include_superusers=True, obj=None):
+        """
+        Return users that have permission `perm`, through `EffectivePermission`
+        instead of joining groups and permissions per user.
+
+        The queryset runs on `default`, call `.using()` for the users of
+        other shards: the index is kept on the shard of each user.
+        """
+        if isinstance(perm, str):
+            try:
+                app_label, codename = perm.split('.')
+            except ValueError as error:
+                raise ValueError(
+                    'Permission name should be in the form '
+                    'app_label.permission_codename.'
+                ) from error
+            permissions = Permission.objects.filter(
+                codename=codename, content_type__app_label=app_label
+            )
+        elif isinstance(perm, Permission):
+            permissions = Permission.objects.filter(pk=perm.pk)
+        else:
+            raise TypeError(
+                'The `perm` argument must be a string or a permission instance.'
+            )
+
+        if obj is not None:
+            return User._default_manager.none()
+
+        user_q = Q(
+            pk__in=EffectivePermission.objects.filter(
+                permission__in=permissions.values('pk')
+            ).values('user_id')
+        )
+        if include_superusers:
+            user_q |= Q(is_superuser=True)
+        if is_active is not None:
+            user_q &= Q(is_active=is_active)
+        return User._default_manager.filter(user_q)
+
+    def get_user(self, user_id):
+        try:
+            user = User._default_manager.db_manager(pk_shard(user_id)).get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
     def authenticate(  # pylint: disable=W0237
         self, request, email=None, password=None, **kwargs
     ):
+        outcome, user = self.authenticate_outcome(
+            request, email=email, password=password, **kwargs
+        )
+        return user if outcome is AuthOutcome.OK else None
+
+    def authenticate_outcome(self, request, email=None, password=None, **kwargs):
+        """
+        Authenticate with a single user lookup, returning `(outcome, user)`.
+        """
         if email is None:
             email = kwargs.get('username', kwargs.get('email'))
         if email is None or password is None:
-            return None
-        try:
-            user: User = User._default_manager.get(
-                Q(email=email) & Q(email_verified=True)
-            )
-        except User.DoesNotExist:
+            return AuthOutcome.UNKNOWN, None
+
+        user = get_user_by_email(email)
+        if user is None or not user.email_verified:
             # Run the default password hasher once to reduce the timing
             # difference between an existing and a nonexistent user (#20760).
             User().set_password(password)
+            return self.outcome(user, False), None
+        return self.outcome(user, verify_password(user, password)), user
+
+    async def aauthenticate(self, request, email=None, password=None, **kwargs):
+        outcome, user = await self.aauthenticate_outcome(
+            request, email=email, password=password, **kwargs
+        )
+        return user if outcome is AuthOutcome.OK else None
+
+    async def aauthenticate_outcome(
+        self, request, email=None, password=None, **kwargs
+    ):
+        """
+        Async `authenticate_outcome`, hashing runs in the bounded hashing executor.
+        """
+        if email is None:
+            email = kwargs.get('username', kwargs.get('email'))
+        if email is None or password is None:
+            return AuthOutcome.UNKNOWN, None
+
+        user = await sync_to_async(get_user_by_email)(email)
+        if user is None or not user.email_verified:
+            await amake_password(password)
+            return self.outcome(user, False), None
+        return self.outcome(user, await acheck_password(user, password)), user
+
+    def outcome(self, user: User | None, password_valid: bool) -> AuthOutcome:
+        if user is None:
+            return AuthOutcome.UNKNOWN
+        if not user.email_verified:
+            return AuthOutcome.UNVERIFIED
+        if not password_valid:
+            return AuthOutcome.UNKNOWN
+        if not self.user_can_authenticate(user):
+            return AuthOutcome.INACTIVE
+        return AuthOutcome.OK
+
+
+def _login_failed(request, credentials):
+    user_login_failed.send(
+        sender=__name__, credentials=_clean_credentials(credentials), request=request
+    )
+
+
+def authenticate_outcome(request=None, **credentials):
+    """
+    Like `django.contrib.auth.authenticate` but return `(outcome, user)`.
+    """
+    outcome = AuthOutcome.UNKNOWN
+    for backend in get_backends():
+        if hasattr(backend, 'authenticate_outcome'):
+            outcome, user = backend.authenticate_outcome(request, **credentials)
         else:
-            if user.check_password(password) and self.user_can_authenticate(user):
-                return user
-        return None
+            user = backend.authenticate(request, **credentials)
+            outcome = AuthOutcome.OK if user is not None else outcome
+        if outcome is AuthOutcome.OK:
+            user.backend = f'{backend.__module__}.{backend.__class__.__qualname__}'
+            return outcome, user
+        if outcome is not AuthOutcome.UNKNOWN:
+            break
+
+    _login_failed(request, credentials)
+    return outcome, None
+
+
+async def aauthenticate_outcome(request=None, **credentials):
+    """
+    Async counterpart of `authenticate_outcome`.
+    """
+    outcome = AuthOutcome.UNKNOWN
+    for backend in get_backends():
+        if hasattr(backend, 'aauthenticate_outcome'):
+            outcome, user = await backend.aauthenticate_outcome(request, **credentials)
+        else:
+            user = await sync_to_async(backend.authenticate)(request, **credentials)
+            outcome = AuthOutcome.OK if user is not None else outcome
+        if outcome is AuthOutcome.OK:
+            user.backend = f'{backend.__module__}.{backend.__class__.__qualname__}'
+            return outcome, user
+        if outcome is not AuthOutcome.UNKNOWN:
+            break
+
+    await sync_to_async(_login_failed)(request, credentials)
+    return outcome, None
+
+
+async def aauthenticate(request=None, **credentials):
+    """
+    Async counterpart of `django.contrib.auth.authenticate`.
+    """
+    _, user = await aauthenticate_outcome(request, **credentials)
+    return user
@@ -0,0 +1,130 @@
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError
+from django.utils import timezone
+
+from utils.models import get_pk_generator, normalize_email
+
+from .models import User, UserDirectory
+from .sharding import pk_shard
+
+
+def _init_worker():
+    # Spawned (non forked) workers start without a configured Django.
+    if not apps.ready:
+        django.setup()
+
+
+class HashingPool(ProcessPoolExecutor):
+    """
+    Process pool for password hashing, one worker per core by default.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count()
+        super().__init__(max_workers=self.workers, initializer=_init_worker)
+
+
+def hashing_pool(workers=None) -> HashingPool:
+    return HashingPool(workers)
+
+
+def hash_passwords(pool: HashingPool, passwords: list[str]):
+    """
+    Hash `passwords` across `pool`, returning a lazy iterator of encoded hashes.
+
+    The work is submitted immediately, so callers can overlap it with I/O.
+    """
+    chunksize = max(1, len(passwords) // (pool.workers * 4))
+    return pool.map(make_password, passwords, chunksize=chunksize)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def build_users(rows: list[dict], hashed_passwords) -> list[User]:
+    """
+    Build unsaved users from `rows`, assigning ids in one generator call.
+    """
+    ids = get_pk_generator().generate_batch(len(rows))
+    return [
+        User(
+            id=pk,
+            email=User.objects.normalize_email(row['email']),
+            first_name=row.get('first_name', ''),
+            last_name=row.get('last_name', ''),
+            email_verified=row.get('email_verified', False),
+            is_active=row.get('is_active', True),
+            date_joined=row.get('date_joined') or timezone.now(),
+            password=password,
+        )
+        for pk, row, password in zip(ids, rows, hashed_passwords)
+    ]
+
+
+def _insert(users: list[User], using) -> tuple[int, list[User]]:
+    """
+    Insert `users` skipping conflicts, return how many were inserted and the
+    users whose id (not email) conflicted.
+    """
+    keys = [normalize_email(user.email) for user in users]
+    if not settings.USER_SHARDS:
+        User.objects.using(using).bulk_create(users, ignore_conflicts=True)
+        stored = dict(
+            User.objects.using(using)
+            .filter(email_normalized__in=keys)
+            .values_list('email_normalized', 'pk')
+        )
+        inserted = sum(stored.get(key) == user.pk for key, user in zip(keys, users))
+        return inserted, [user for key, user in zip(keys, users) if key not in stored]
+
+    # Sharded users go to the shard of their id, once the directory has them.
+    UserDirectory.objects.bulk_create(
+        [UserDirectory(email=key, user_id=user.pk) for key, user in zip(keys, users)],
+        ignore_conflicts=True,
+    )
+    claimed = dict(
+        UserDirectory.objects.filter(email__in=keys).values_list('email', 'user_id')
+    )
+    shards = defaultdict(list)
+    for key, user in zip(keys, users):
+        if claimed.get(key) == user.pk:
+            shards[pk_shard(user.pk)].append(user)
+    for shard, shard_users in shards.items():
+        User.objects.using(shard).bulk_create(shard_users, ignore_conflicts=True)
+    inserted = sum(len(shard_users) for shard_users in shards.values())
+    return inserted, [user for key, user in zip(keys, users) if key not in claimed]
+
+
+def bulk_insert_users(users: list[User], using='default', retries=3) -> int:
+    """
+    Insert `users` and return how many were inserted.
+
+    Existing emails are skipped, so a resumed import can replay a chunk, and
+    users whose generated id collided are retried with new ids.
+    """
+    # Imported here, `backends` depends on this module through `permissions`.
+    from .backends import invalidate_email_lookup
+
+    # `bulk_create` skips `post_save`, so cached unknown emails are dropped here.
+    emails = [user.email for user in users]
+    inserted = 0
+    for _ in range(retries + 1):
+        count, users = _insert(users, using)
+        inserted += count
+        if not users:
+            invalidate_email_lookup(*emails)
+            return inserted
+        for user, pk in zip(users, get_pk_generator().generate_batch(len(users))):
+            user.pk = pk
+    raise IntegrityError(f'{len(users)} user ids kept colliding.')
@@ -0,0 +1,47 @@
+"""
+Password hashers whose cost comes from settings, as written by
+`manage.py calibrate_hasher`.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from utils.metrics import timed
+
+from .hashing import hashing_slot
+
+
+class TimedHasherMixin:
+    """
+    Count hashing as the `hash` phase of request metrics, in a hashing slot
+    within `limit_hashing` actions.
+    """
+
+    def encode(self, *args, **kwargs):
+        with timed('hash'), hashing_slot():
+            return super().encode(*args, **kwargs)
+
+    def verify(self, *args, **kwargs):
+        with timed('hash'), hashing_slot():
+            return super().verify(*args, **kwargs)
+
+
+class TunedPBKDF2PasswordHasher(TimedHasherMixin, hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.PBKDF2_ITERATIONS or super().iterations
+
+
+class TunedScryptPasswordHasher(TimedHasherMixin, hashers.ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return settings.SCRYPT_WORK_FACTOR or super().work_factor
+
+
+class TunedArgon2PasswordHasher(TimedHasherMixin, hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST or super().time_cost
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST or super().memory_cost
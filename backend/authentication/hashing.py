@@ -0,0 +1,149 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial, wraps
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+from utils.concurrency import ConcurrencyLimiter
+from utils.metrics import registry
+
+# Set while running an action decorated with `limit_hashing`.
+_limited = contextvars.ContextVar('limited_hashing', default=False)
+
+
+@lru_cache(maxsize=None)
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Return the bounded executor that runs password hashing off the event loop.
+
+    hashlib releases the GIL while hashing, so the threads hash in parallel.
+    """
+    return ThreadPoolExecutor(
+        max_workers=getattr(settings, 'PASSWORD_HASHING_THREADS', 4),
+        thread_name_prefix='password-hashing',
+    )
+
+
+async def run_in_executor(func, *args):
+    loop = asyncio.get_running_loop()
+    # Carry context variables (e.g. request metrics) into the worker thread.
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_executor(), partial(context.run, func, *args)
+    )
+
+
+@lru_cache(maxsize=None)
+def get_rehash_executor() -> ThreadPoolExecutor:
+    """
+    Return the thread hashing upgraded passwords, off the sign in requests.
+    """
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix='password-rehash')
+
+
+@lru_cache(maxsize=None)
+def get_rehash_slots() -> threading.BoundedSemaphore:
+    return threading.BoundedSemaphore(settings.PASSWORD_REHASH_QUEUE_SIZE)
+
+
+def make_password_later(raw_password) -> Future | None:
+    """
+    Hash `raw_password` in the background, None when
+    `PASSWORD_REHASH_QUEUE_SIZE` hashes are already pending.
+    """
+    slots = get_rehash_slots()
+    # The slot is released by the future, once the hash is done.
+    if not slots.acquire(blocking=False):  # pylint: disable=consider-using-with
+        return None
+    future = get_rehash_executor().submit(make_password, raw_password)
+    future.add_done_callback(lambda future: slots.release())
+    return future
+
+
+def verify_password(user, raw_password) -> bool:
+    """
+    Check `raw_password` for `user` without saving.
+
+    When the stored hash is outdated, the new one is computed in the
+    background and left on `user._upgraded_password`, as a future, for
+    `authentication.rehash`.
+    """
+
+    def setter(raw_password):
+        user._upgraded_password = make_password_later(raw_password)
+
+    with hashing_slot():
+        return check_password(raw_password, user.password, setter)
+
+
+async def acheck_password(user, raw_password) -> bool:
+    return await run_in_executor(verify_password, user, raw_password)
+
+
+async def amake_password(raw_password) -> str:
+    return await run_in_executor(make_password, raw_password)
+
+
+@lru_cache(maxsize=None)
+def get_hashing_limiter() -> ConcurrencyLimiter:
+    limiter = ConcurrencyLimiter(
+        'password-hashing',
+        process_limit=settings.HASHING_CONCURRENCY_PER_PROCESS,
+        host_limit=settings.HASHING_CONCURRENCY_PER_HOST,
+        queue_size=settings.HASHING_QUEUE_SIZE,
+        queue_timeout=settings.HASHING_QUEUE_TIMEOUT,
+        retry_after=settings.HASHING_RETRY_AFTER,
+    )
+    registry.add_limiter(limiter)
+    return limiter
+
+
+@contextmanager
+def hashing_slot():
+    """
+    Hold a password hashing slot while hashing in `limit_hashing` actions,
+    raising `Overloaded` (503 with `Retry-After`) when none is free.
+    """
+    if not _limited.get():
+        yield
+        return
+    # Hashing nested in the block reuses the slot.
+    token = _limited.set(False)
+    try:
+        with get_hashing_limiter().slot():
+            yield
+    finally:
+        _limited.reset(token)
+
+
+def limit_hashing(view_action):
+    """
+    Make password hashing in a viewset action wait for a hashing slot, the
+    slot is only held while hashing (see `hashing_slot`).
+    """
+    if asyncio.iscoroutinefunction(view_action):
+
+        @wraps(view_action)
+        async def async_wrapper(self, request, *args, **kwargs):
+            # Copied into the hashing executor and `sync_to_async` threads.
+            token = _limited.set(True)
+            try:
+                return await view_action(self, request, *args, **kwargs)
+            finally:
+                _limited.reset(token)
+
+        return async_wrapper
+
+    @wraps(view_action)
+    def wrapper(self, request, *args, **kwargs):
+        token = _limited.set(True)
+        try:
+            return view_action(self, request, *args, **kwargs)
+        finally:
+            _limited.reset(token)
+
+    return wrapper
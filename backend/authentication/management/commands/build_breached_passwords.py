@@ -0,0 +1,162 @@
+import gzip
+import heapq
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.validators import HEADER, MAGIC, password_key
+
+# Records read or written per I/O call.
+BLOCK_RECORDS = 64 * 1024
+
+
+def open_text(path: Path):
+    if path.suffix == '.gz':
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return path.open(encoding='utf-8', errors='replace')
+
+
+def read_records(file, width):
+    while block := file.read(width * BLOCK_RECORDS):
+        for start in range(0, len(block), width):
+            yield block[start : start + width]
+
+
+class Command(BaseCommand):
+    help = (
+        'Build the breached passwords file checked by BreachedPasswordValidator '
+        'from dumps of `SHA1[:count]` lines (or plain passwords with '
+        '--plaintext), keeping sorted and distinct SHA-1 prefixes.'
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.skipped = 0
+
+    def add_arguments(self, parser):
+        parser.add_argument('dumps', nargs='+', type=Path)
+        parser.add_argument(
+            '--output',
+            type=Path,
+            default=None,
+            help='Default: BREACHED_PASSWORDS_FILE.',
+        )
+        parser.add_argument(
+            '--width',
+            type=int,
+            default=8,
+            help='Bytes kept of each SHA-1, 8 keeps false positives negligible.',
+        )
+        parser.add_argument(
+            '--min-count',
+            type=int,
+            default=1,
+            help='Skip hashes seen fewer times in breaches.',
+        )
+        parser.add_argument('--plaintext', action='store_true')
+        parser.add_argument(
+            '--run-size',
+            type=int,
+            default=10_000_000,
+            help='Hashes sorted in memory at once, bigger dumps are merged '
+            'from sorted runs on disk.',
+        )
+
+    def handle(self, *args, **options):
+        output = options['output'] or settings.BREACHED_PASSWORDS_FILE
+        if not output:
+            raise CommandError('Set --output or BREACHED_PASSWORDS_FILE.')
+        output = Path(output)
+        width = options['width']
+        if not 1 <= width <= 20:
+            raise CommandError('--width must be between 1 and 20 bytes.')
+        for dump in options['dumps']:
+            if not dump.exists():
+                raise CommandError(f'{dump} does not exist.')
+
+        output.parent.mkdir(parents=True, exist_ok=True)
+        self.skipped = 0
+        keys = self.read_keys(options['dumps'], width, options)
+        with tempfile.TemporaryDirectory(dir=output.parent) as directory:
+            runs = self.sorted_runs(keys, options['run_size'], width, directory)
+            written = self.write(heapq.merge(*runs), output, width, directory)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Wrote {written:,} hashes ({output.stat().st_size:,} bytes) to '
+                f'{output}, skipped {self.skipped:,} lines.'
+            )
+        )
+
+    def read_keys(self, dumps, width, options):
+        for dump in dumps:
+            with open_text(dump) as file:
+                for line in file:
+                    line = line.rstrip('\r\n')
+                    if options['plaintext']:
+                        if line:
+                            yield password_key(line, width)
+                        continue
+
+                    digest, _, count = line.strip().partition(':')
+                    try:
+                        if count and int(count) < options['min_count']:
+                            continue
+                        key = bytes.fromhex(digest)
+                    except ValueError:
+                        key = b''
+                    if len(key) != 20:
+                        self.skipped += 1
+                        continue
+                    yield key[:width]
+
+    def sorted_runs(self, keys, run_size, width, directory):
+        """
+        Sort `keys` by runs of `run_size`, spilled to `directory` when there
+        are several.
+        """
+        runs = []
+        run = []
+        for key in keys:
+            run.append(key)
+            if len(run) >= run_size:
+                runs.append(self.spill(sorted(run), directory))
+                run = []
+        run.sort()
+        if not runs:
+            return [run]
+
+        runs.append(self.spill(run, directory))
+        return [read_records(run, width) for run in runs]
+
+    def spill(self, run, directory):
+        file = tempfile.TemporaryFile(dir=directory)
+        for start in range(0, len(run), BLOCK_RECORDS):
+            file.write(b''.join(run[start : start + BLOCK_RECORDS]))
+        file.seek(0)
+        return file
+
+    def write(self, keys, output, width, directory) -> int:
+        handle, path = tempfile.mkstemp(dir=directory)
+        written = 0
+        previous = None
+        block = []
+        with os.fdopen(handle, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, width))
+            for key in keys:
+                if key == previous:
+                    continue
+                previous = key
+                block.append(key)
+                if len(block) >= BLOCK_RECORDS:
+                    file.write(b''.join(block))
+                    written += len(block)
+                    block = []
+            file.write(b''.join(block))
+            written += len(block)
+        # Validators map the new file on their next check.
+        os.replace(path, output)
+        return written
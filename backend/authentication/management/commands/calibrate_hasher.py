@@ -0,0 +1,129 @@
+import importlib.util
+import time
+from pathlib import Path
+
+from django.contrib.auth import hashers
+from django.core.management.base import BaseCommand, CommandError
+
+SAMPLE_PASSWORD = 'correct horse battery staple'
+
+
+def measure(hasher, rounds=3) -> float:
+    """
+    Best of `rounds` seconds to hash one password with `hasher`.
+    """
+    salt = hasher.salt()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        hasher.encode(SAMPLE_PASSWORD, salt)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def calibrate_pbkdf2(target):
+    hasher = hashers.PBKDF2PasswordHasher()
+    hasher.iterations = 100_000
+    per_iteration = measure(hasher) / hasher.iterations
+    # Round down to a multiple of 10k so settings stay readable.
+    hasher.iterations = max(10_000, int(target / per_iteration) // 10_000 * 10_000)
+    return {'PBKDF2_ITERATIONS': hasher.iterations}, measure(hasher)
+
+
+def calibrate_scrypt(target):
+    hasher = hashers.ScryptPasswordHasher()
+    hasher.work_factor = 2**12
+    elapsed = measure(hasher)
+    # Cost doubles with the work factor, stop before overshooting.
+    while elapsed * 2 <= target and hasher.work_factor < 2**20:
+        hasher.work_factor *= 2
+        elapsed = measure(hasher)
+    return {'SCRYPT_WORK_FACTOR': hasher.work_factor}, elapsed
+
+
+def calibrate_argon2(target):
+    hasher = hashers.Argon2PasswordHasher()
+    hasher.time_cost = 1
+    elapsed = measure(hasher)
+    while elapsed * (hasher.time_cost + 1) / hasher.time_cost <= target:
+        hasher.time_cost += 1
+        elapsed = measure(hasher)
+    return {
+        'ARGON2_TIME_COST': hasher.time_cost,
+        'ARGON2_MEMORY_COST': hasher.memory_cost,
+    }, elapsed
+
+
+HASHERS = {
+    'pbkdf2': (
+        'authentication.hashers.TunedPBKDF2PasswordHasher',
+        calibrate_pbkdf2,
+        None,
+    ),
+    'scrypt': (
+        'authentication.hashers.TunedScryptPasswordHasher',
+        calibrate_scrypt,
+        None,
+    ),
+    'argon2': (
+        'authentication.hashers.TunedArgon2PasswordHasher',
+        calibrate_argon2,
+        'argon2',
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the password hashers on this host and write the settings '
+        'hitting a target time per hash.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target-ms', type=float, default=250, help='Time per hash (ms).'
+        )
+        parser.add_argument(
+            '--hasher',
+            choices=HASHERS,
+            action='append',
+            help='Hasher to calibrate, repeat for several (default: all).',
+        )
+        parser.add_argument(
+            '--use', choices=HASHERS, help='Hasher to make the default.'
+        )
+        parser.add_argument(
+            '--output', type=Path, help='Append the settings to this .env file.'
+        )
+
+    def handle(self, *args, **options):
+        target = options['target_ms'] / 1000
+        names = options['hasher'] or list(HASHERS)
+        if options['use'] and options['use'] not in names:
+            names.append(options['use'])
+
+        env = {}
+        for name in names:
+            path, calibrate, requirement = HASHERS[name]
+            if requirement and importlib.util.find_spec(requirement) is None:
+                self.stdout.write(f'{name:<8} skipped, `{requirement}` not installed')
+                continue
+            values, elapsed = calibrate(target)
+            env.update(values)
+            params = ', '.join(f'{key}={value}' for key, value in values.items())
+            self.stdout.write(f'{name:<8} {elapsed * 1000:8.1f} ms  {params}')
+            if name == options['use']:
+                env['PASSWORD_HASHER'] = path
+
+        if not env:
+            raise CommandError('No hasher could be calibrated.')
+
+        lines = ''.join(f'{key}="{value}"\n' for key, value in env.items())
+        if options['output']:
+            with options['output'].open('a', encoding='utf-8') as file:
+                file.write(lines)
+            self.stdout.write(
+                self.style.SUCCESS(f'Settings written to {options["output"]}')
+            )
+        else:
+            self.stdout.write(lines, ending='')
@@ -0,0 +1,132 @@
+import csv
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from authentication.bulk import (
+    build_users,
+    bulk_insert_users,
+    chunked,
+    hash_passwords,
+    hashing_pool,
+)
+
+BOOLEAN_FIELDS = ('email_verified', 'is_active')
+
+
+def read_csv(file):
+    yield from csv.DictReader(file)
+
+
+def read_ndjson(file):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+READERS = {'csv': read_csv, 'ndjson': read_ndjson}
+
+
+def parse_row(row: dict) -> dict:
+    for field in BOOLEAN_FIELDS:
+        if isinstance(row.get(field), str):
+            row[field] = row[field].strip().lower() in ('1', 'true', 'yes')
+    return row
+
+
+class Command(BaseCommand):
+    help = (
+        'Import users from a CSV or NDJSON file with `email`, `password`, '
+        '`first_name`, `last_name` and optional `email_verified` columns.'
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.database = 'default'
+        self.state_file = None
+        self.started = 0.0
+        # Rows done including previous runs, rows read and inserted by this one.
+        self.done = self.read = self.imported = 0
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=Path)
+        parser.add_argument('--format', choices=READERS, default=None)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--workers', type=int, default=None, help='Hashing processes.'
+        )
+        parser.add_argument(
+            '--state-file',
+            type=Path,
+            default=None,
+            help='Progress file used to resume (default: <path>.progress).',
+        )
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        path: Path = options['path']
+        if not path.exists():
+            raise CommandError(f'{path} does not exist.')
+
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError(f'Unknown format "{file_format}", use --format.')
+
+        self.database = options['database']
+        self.state_file = options['state_file'] or path.with_name(
+            path.name + '.progress'
+        )
+        self.done = self.load_progress(self.state_file)
+        if self.done:
+            self.stdout.write(f'Resuming after {self.done} rows.')
+
+        self.started = time.perf_counter()
+        self.imported = 0
+        with path.open(newline='', encoding='utf-8') as file, hashing_pool(
+            options['workers']
+        ) as pool:
+            rows = (parse_row(row) for row in READERS[file_format](file))
+            for _ in range(self.done):
+                next(rows, None)
+
+            # Hash the next chunk while the previous one is being inserted.
+            pending = None
+            for chunk in chunked(rows, options['batch_size']):
+                hashing = hash_passwords(pool, [row['password'] for row in chunk])
+                if pending:
+                    self.flush(*pending)
+                pending = (chunk, hashing)
+            if pending:
+                self.flush(*pending)
+
+        self.state_file.unlink(missing_ok=True)
+        skipped = self.read - self.imported
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {self.imported} rows, skipped {skipped} existing emails.'
+            )
+        )
+
+    def flush(self, chunk, hashing):
+        users = build_users(chunk, hashing)
+        with transaction.atomic(using=self.database):
+            self.imported += bulk_insert_users(users, using=self.database)
+        self.done += len(chunk)
+        self.read += len(chunk)
+        self.save_progress(self.state_file, self.done)
+
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(f'{self.done} rows ({self.imported / elapsed:,.0f} rows/s)')
+
+    def load_progress(self, state_file: Path) -> int:
+        if not state_file.exists():
+            return 0
+        return json.loads(state_file.read_text())['rows']
+
+    def save_progress(self, state_file: Path, rows: int):
+        tmp = state_file.with_name(state_file.name + '.tmp')
+        tmp.write_text(json.dumps({'rows': rows}))
+        tmp.replace(state_file)
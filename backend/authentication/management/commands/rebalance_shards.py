@@ -0,0 +1,232 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from authentication import permissions
+from authentication.bulk import chunked
+from authentication.models import ShardBucket, User
+from authentication.sharding import bucket_map, users_in_bucket
+from utils.models import SORTED_BASE_64
+
+
+def through_models():
+    """
+    Auto created many to many tables of users, with the column of the other side.
+    """
+    return [
+        (through, field.m2m_reverse_name())
+        for field in User._meta.many_to_many
+        if (through := field.remote_field.through)._meta.auto_created
+    ]
+
+
+def user_digests(users) -> dict:
+    """
+    Digest of each user's values by id, enough to tell changed users without
+    keeping whole buckets in memory.
+    """
+    fields = [field.attname for field in User._meta.concrete_fields]
+    return {
+        user.pk: hashlib.blake2b(
+            repr([getattr(user, field) for field in fields]).encode(), digest_size=16
+        ).digest()
+        for user in users
+    }
+
+
+def links(through, column, database, user_ids) -> set:
+    rows = set()
+    for chunk in chunked(user_ids, 1000):
+        rows.update(
+            through._default_manager.using(database)
+            .filter(user_id__in=chunk)
+            .values_list('user_id', column)
+        )
+    return rows
+
+
+def copy_bucket(bucket, source, target, batch_size) -> tuple[dict, dict]:
+    """
+    Copy the users of `bucket` and their many to many rows, return what was
+    copied (user digests by id, and the rows of each table) to later tell the
+    changes made on either side.
+    """
+    # Leftovers of an interrupted move, the bucket isn't served from `target`.
+    users_in_bucket(bucket, target).delete()
+
+    copied, copied_links = {}, {through: set() for through, _ in through_models()}
+    users = users_in_bucket(bucket, source).order_by('pk').iterator(batch_size)
+    for batch in chunked(users, batch_size):
+        User._default_manager.using(target).bulk_create(batch)
+        copied.update(user_digests(batch))
+
+        for through, column in through_models():
+            rows = links(through, column, source, [user.pk for user in batch])
+            through._default_manager.using(target).bulk_create(
+                through(user_id=user_id, **{column: other}) for user_id, other in rows
+            )
+            copied_links[through] |= rows
+    return copied, copied_links
+
+
+def replay(target, copied, changed) -> tuple[int, int]:
+    """
+    Apply `changed` users (None when deleted) on `target` where it still has
+    them as copied. Return the number of users replayed and of conflicts.
+    """
+    target_users = User._default_manager.using(target)
+    current = user_digests(target_users.filter(pk__in=list(changed)))
+    replayed = conflicts = 0
+    for pk, user in changed.items():
+        if current.get(pk) != copied.get(pk):
+            conflicts += 1
+            continue
+        if user is None:
+            target_users.filter(pk=pk).delete()
+        elif pk in current:
+            user.save(using=target, force_update=True)
+        else:
+            target_users.bulk_create([user])
+        replayed += 1
+    return replayed, conflicts
+
+
+def source_changes(bucket, source, copied, batch_size):
+    """
+    Yield the users of `bucket` changed on `source` since the copy, by chunks
+    of `{id: user}`, deleted ones last as None.
+    """
+    deleted = set(copied)
+    users = users_in_bucket(bucket, source).iterator(batch_size)
+    for batch in chunked(users, batch_size):
+        deleted.difference_update(user.pk for user in batch)
+        digests = user_digests(batch)
+        yield {
+            user.pk: user for user in batch if copied.get(user.pk) != digests[user.pk]
+        }
+    for pks in chunked(deleted, batch_size):
+        yield dict.fromkeys(pks)
+
+
+def sync_users(bucket, source, target, copied, batch_size) -> tuple[int, int]:
+    """
+    Replay on `target` the users inserted, updated or deleted on `source`
+    after the copy, unless `target` changed them too: its writes are newer.
+
+    Return the number of users replayed and of conflicts left to `target`.
+    """
+    replayed = conflicts = 0
+    for changed in source_changes(bucket, source, copied, batch_size):
+        done, kept = replay(target, copied, changed)
+        replayed += done
+        conflicts += kept
+    return replayed, conflicts
+
+
+def sync_links(bucket, source, target, copied_links) -> set:
+    """
+    Replay on `target` the many to many rows added or removed on `source`
+    after the copy, unless `target` changed them too. Return the users whose
+    rows were replayed.
+    """
+    user_ids = set(users_in_bucket(bucket, target).values_list('pk', flat=True))
+    changed_users = set()
+    for through, column in through_models():
+        before = copied_links[through]
+        now = links(through, column, source, user_ids)
+        current = links(through, column, target, user_ids)
+        rows = through._default_manager.using(target)
+        for row in before ^ now:
+            # Rows changed on `target` too are left as they are.
+            if row[0] not in user_ids or (row in current) != (row in before):
+                continue
+            user_id, other = row
+            if row in now:
+                rows.create(user_id=user_id, **{column: other})
+            else:
+                rows.filter(user_id=user_id, **{column: other}).delete()
+            changed_users.add(user_id)
+    return changed_users
+
+
+def delete_bucket(bucket, source, batch_size):
+    """
+    Delete the users left on `source`, with their many to many rows.
+
+    Signal receivers skip the directory entries of the moved users, see
+    `sharding.is_moved_copy`. Rows of other tables referencing them on
+    `source`, e.g. admin log entries and effective permissions, are deleted
+    too.
+    """
+    users = users_in_bucket(bucket, source)
+    while pks := list(users.values_list('pk', flat=True)[:batch_size]):
+        with transaction.atomic(using=source):
+            User._default_manager.using(source).filter(pk__in=pks).delete()
+
+
+class Command(BaseCommand):
+    help = (
+        'Move user buckets (first character of their id) to another shard '
+        'while the site keeps running.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bucket', action='append', required=True)
+        parser.add_argument('--to', dest='target', required=True)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--settle',
+            type=float,
+            default=None,
+            help='Seconds to wait for every process to see a move '
+            '(default: 2 x SHARD_MAP_TTL).',
+        )
+
+    def handle(self, *args, **options):
+        target = options['target']
+        if target not in settings.USER_SHARDS:
+            raise CommandError(f'{target!r} is not in USER_SHARDS.')
+        for bucket in options['bucket']:
+            if len(bucket) != 1 or bucket not in SORTED_BASE_64:
+                raise CommandError(f'{bucket!r} is not a base 64 character.')
+
+        settle = options['settle']
+        if settle is None:
+            settle = 2 * settings.SHARD_MAP_TTL
+        batch_size = options['batch_size']
+
+        for bucket in options['bucket']:
+            source = bucket_map(cached=False).get(bucket, DEFAULT_DB_ALIAS)
+            if source == target:
+                self.stdout.write(f'{bucket}: already on {target}')
+                continue
+
+            # Copy while the source keeps serving, switch the bucket, then
+            # replay what was written on the source before every process
+            # saw the switch.
+            copied, copied_links = copy_bucket(bucket, source, target, batch_size)
+            ShardBucket.objects.using(DEFAULT_DB_ALIAS).update_or_create(
+                bucket=bucket, defaults={'database': target}
+            )
+            bucket_map(cached=False)
+            time.sleep(settle)
+            replayed, conflicts = sync_users(
+                bucket, source, target, copied, batch_size
+            )
+            relinked = sync_links(bucket, source, target, copied_links)
+            # Index the moved users on `target`, theirs on `source` go with them.
+            permissions.users_changed(
+                users_in_bucket(bucket, target).values_list('pk', flat=True)
+            )
+            delete_bucket(bucket, source, batch_size)
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'{bucket}: moved {len(copied)} users from {source} to '
+                    f'{target} ({replayed} replayed, {len(relinked)} with '
+                    f'relations replayed, {conflicts} kept as on {target})'
+                )
+            )
@@ -0,0 +1,42 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from authentication.outbox import deliver_batch
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbox emails in batches over a single mail connection.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--interval', type=float, default=5, help='Seconds to wait when idle.'
+        )
+        parser.add_argument(
+            '--once', action='store_true', help='Drain due emails and exit.'
+        )
+
+    def handle(self, *args, **options):
+        connection = get_connection(fail_silently=False)
+        try:
+            while True:
+                try:
+                    processed = deliver_batch(connection, options['batch_size'])
+                except OSError as exc:
+                    # The batch was given back, retry once the server is back.
+                    self.stderr.write(f'Mail server unavailable: {exc!r}')
+                    processed = 0
+                    if options['once']:
+                        break
+                if processed:
+                    self.stdout.write(f'Processed {processed} emails.')
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
@@ -0,0 +1,106 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from authentication.bulk import (
+    build_users,
+    bulk_insert_users,
+    chunked,
+    hash_passwords,
+    hashing_pool,
+)
+
+FIRST_NAMES = [
+    'Ana', 'Bruno', 'Carla', 'Daniel', 'Elena', 'Felipe', 'Grace', 'Hugo',
+    'Isabel', 'João', 'Karen', 'Lucas', 'Maria', 'Noah', 'Olivia', 'Pedro',
+    'Quentin', 'Rafaela', 'Sofia', 'Thiago', 'Ursula', 'Victor', 'Wen', 'Yara',
+]
+LAST_NAMES = [
+    'Almeida', 'Brown', 'Costa', 'Dubois', 'Evans', 'Ferreira', 'García',
+    'Huang', 'Ivanova', 'Johnson', 'Kim', 'Lima', 'Müller', 'Nguyen', 'Oliveira',
+    'Pereira', 'Rossi', 'Silva', 'Smith', 'Tanaka', 'Souza', 'Wójcik',
+]
+DOMAINS = ['example.com', 'example.org', 'example.net', 'mail.example.com']
+
+
+def synthetic_rows(count: int, start: int, passwords: int, rng: random.Random):
+    """
+    Yield sign up like rows, user `i` has the password `seed-password-<i % passwords>`.
+    """
+    now = timezone.now()
+    for i in range(start, start + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            'email': f'{first}.{last}.{i}@{rng.choice(DOMAINS)}'.lower(),
+            'password': f'seed-password-{i % passwords if passwords else i}',
+            'first_name': first,
+            'last_name': last,
+            'email_verified': rng.random() < 0.9,
+            'is_active': rng.random() < 0.98,
+            'date_joined': now - timedelta(seconds=rng.randrange(3 * 365 * 86400)),
+        }
+
+
+class Command(BaseCommand):
+    help = (
+        'Insert synthetic users for load tests. User <n> signs in with the '
+        'password `seed-password-<n % passwords>`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, required=True)
+        parser.add_argument(
+            '--start',
+            type=int,
+            default=0,
+            help='Number of the first user, to add users to a seeded database.',
+        )
+        parser.add_argument(
+            '--passwords',
+            type=int,
+            default=10,
+            help='Distinct passwords hashed and shared by the users, '
+            '0 hashes one per user (slow).',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--workers', type=int, default=None, help='Hashing processes.'
+        )
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        count, passwords = options['count'], options['passwords']
+        if count < 1 or passwords < 0:
+            raise CommandError('--count must be positive and --passwords not negative.')
+
+        rng = random.Random(options['seed'])
+        rows = synthetic_rows(count, options['start'], passwords, rng)
+        started = time.perf_counter()
+        inserted = 0
+
+        with hashing_pool(options['workers']) as pool:
+            if passwords:
+                # Hash each distinct password once, rows reuse the hashes.
+                plain = [f'seed-password-{i}' for i in range(passwords)]
+                hashed = dict(zip(plain, hash_passwords(pool, plain)))
+
+            for chunk in chunked(rows, options['batch_size']):
+                plain = [row['password'] for row in chunk]
+                if passwords:
+                    hashing = [hashed[password] for password in plain]
+                else:
+                    hashing = hash_passwords(pool, plain)
+                with transaction.atomic(using=options['database']):
+                    inserted += bulk_insert_users(
+                        build_users(chunk, hashing), using=options['database']
+                    )
+
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f'{inserted} users ({inserted / elapsed:,.0f}/s)')
+
+        self.stdout.write(self.style.SUCCESS(f'Seeded {inserted} users.'))
@@ -1,27 +1,67 @@
+from functools import lru_cache
+
+from django.conf import settings
 from django.contrib import auth
 from django.contrib.auth.models import BaseUserManager
+from django.db import models
+
+from .hashing import amake_password
+
 
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    # Backends are stateless, import and instantiate each one once.
+    return auth.load_backend(path)
 
-class UserManager(BaseUserManager):
+
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """
+        `update` dropping the cached users it changes, it sends no signals.
+        """
+        # Like saves, last_login alone doesn't invalidate cached users.
+        if set(kwargs) == {'last_login'}:
+            return super().update(**kwargs)
+        from .user_cache import invalidate_users
+
+        user_ids = list(self.values_list('pk', flat=True))
+        rows = super().update(**kwargs)
+        invalidate_users(user_ids)
+        return rows
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     use_in_migrations = True
 
+    def _build_user(self, email, **extra_fields):
+        extra_fields.setdefault("is_staff", False)
+        extra_fields.setdefault("is_superuser", False)
+
+        return self.model(email=self.normalize_email(email), **extra_fields)
+
     def _create_user(self, email, password, **extra_fields):
         """
         Create and save a user with the given email and password.
         """
-        email = self.normalize_email(email)
-        user = self.model(email=email, **extra_fields)
+        user = self._build_user(email, **extra_fields)
         user.set_password(password)
         user.save(using=self._db)
 
         return user
 
     def create_user(self, email, password, **extra_fields):
-        extra_fields.setdefault("is_staff", False)
-        extra_fields.setdefault("is_superuser", False)
-
         return self._create_user(email, password, **extra_fields)
 
+    async def acreate_user(self, email, password, **extra_fields):
+        """
+        `create_user` hashing the password off the event loop.
+        """
+        user = self._build_user(email, **extra_fields)
+        user.password = await amake_password(password)
+        await user.asave(using=self._db)
+
+        return user
+
     def create_superuser(self, email, password, **extra_fields):
         extra_fields.setdefault("is_staff", True)
         extra_fields.setdefault("is_superuser", True)
@@ -37,9 +77,8 @@ class UserManager(BaseUserManager):
         self, perm, is_active=True, include_superusers=True, backend=None, obj=None
     ):
         if backend is None:
-            backends = auth._get_backends(return_tuples=True)
-            if len(backends) == 1:
-                backend, _ = backends[0]
+            if len(settings.AUTHENTICATION_BACKENDS) == 1:
+                backend = _load_backend(settings.AUTHENTICATION_BACKENDS[0])
             else:
                 raise ValueError(
                     "You have multiple authentication backends configured and "
@@ -50,7 +89,7 @@ class UserManager(BaseUserManager):
                 f"backend must be a dotted import path string (got {backend})."
             )
         else:
-            backend = auth.load_backend(backend)
+            backend = _load_backend(backend)
         if hasattr(backend, "with_perm"):
             return backend.with_perm(
                 perm,
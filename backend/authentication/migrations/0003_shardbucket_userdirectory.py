@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_outboxemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShardBucket',
+            fields=[
+                ('bucket', models.CharField(max_length=1, primary_key=True, serialize=False)),
+                ('database', models.CharField(max_length=64)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserDirectory',
+            fields=[
+                ('email', models.EmailField(max_length=254, primary_key=True, serialize=False)),
+                ('user_id', models.CharField(max_length=11, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'user directory',
+            },
+        ),
+    ]
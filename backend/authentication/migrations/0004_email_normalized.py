@@ -0,0 +1,57 @@
+from django.db import migrations, models
+
+import utils.models
+
+BATCH_SIZE = 1000
+
+
+def fill_email_normalized(apps, schema_editor):
+    # Same key as the application computes, SQL LOWER() differs outside ASCII.
+    User = apps.get_model('authentication', 'User')
+    users = User.objects.using(schema_editor.connection.alias).order_by('pk')
+
+    seen, duplicates = set(), set()
+    last = ''
+    while batch := list(users.filter(pk__gt=last).only('email')[:BATCH_SIZE]):
+        for user in batch:
+            user.email_normalized = utils.models.normalize_email(user.email)
+            if user.email_normalized in seen:
+                duplicates.add(user.email_normalized)
+            seen.add(user.email_normalized)
+        users.bulk_update(batch, ['email_normalized'], batch_size=BATCH_SIZE)
+        last = batch[-1].pk
+
+    if duplicates:
+        raise RuntimeError(
+            'Merge or rename the accounts sharing these emails (ignoring case) '
+            f'before migrating: {", ".join(sorted(duplicates))}'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_shardbucket_userdirectory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='email_normalized',
+            field=utils.models.NormalizedEmailField(max_length=254, null=True, source='email'),
+        ),
+        migrations.RunPython(fill_email_normalized, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='user',
+            name='email_normalized',
+            field=utils.models.NormalizedEmailField(max_length=254, source='email', unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['email_normalized', 'email_verified'], name='authenticat_email_n_7a859c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['date_joined', 'id'], name='authenticat_date_jo_a810b1_idx'),
+        ),
+    ]
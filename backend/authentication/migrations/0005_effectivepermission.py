@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def index_permissions(apps, schema_editor):
+    User = apps.get_model('authentication', 'User')
+    EffectivePermission = apps.get_model('authentication', 'EffectivePermission')
+    using = schema_editor.connection.alias
+
+    rows = set(
+        User.user_permissions.through.objects.using(using).values_list(
+            'user_id', 'permission_id'
+        )
+    )
+    rows.update(
+        User.groups.through.objects.using(using)
+        .filter(group__permissions__isnull=False)
+        .values_list('user_id', 'group__permissions')
+    )
+    EffectivePermission.objects.using(using).bulk_create(
+        [EffectivePermission(user_id=user, permission_id=perm) for user, perm in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('authentication', '0004_email_normalized'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EffectivePermission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.CharField(db_index=True, max_length=11)),
+                ('permission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='auth.permission')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='effectivepermission',
+            constraint=models.UniqueConstraint(fields=('permission', 'user_id'), name='unique_effective_permission'),
+        ),
+        migrations.RunPython(index_permissions, migrations.RunPython.noop),
+    ]
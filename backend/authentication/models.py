@@ -1,16 +1,21 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
-from utils.models import generate_pk_base_64
+from utils.models import (
+    NormalizedEmailField,
+    RetryPkCollisionMixin,
+    get_pk_generator,
+)
 
 from .managers import UserManager
 
 
 def user_pk():
-    return generate_pk_base_64(User)
+    return get_pk_generator()()
 
 
-class User(AbstractUser):
+class User(RetryPkCollisionMixin, AbstractUser):
     """
     Overide default User model.
     """
@@ -31,6 +36,20 @@ class User(AbstractUser):
 
     # New fields
     email_verified = models.BooleanField(default=False)
+    # Lookup key, so emails differing by case can't make two accounts.
+    email_normalized = NormalizedEmailField(source='email', unique=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Keep the loaded email so caches keyed by it can be invalidated.
+        instance._loaded_email = instance.__dict__.get('email')
+        return instance
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is not None and 'email' in update_fields:
+            update_fields = {*update_fields, 'email_normalized'}
+        return super().save(*args, update_fields=update_fields, **kwargs)
 
     def __str__(self) -> str:
         full_name = self.first_name
@@ -40,3 +59,132 @@ class User(AbstractUser):
 
     class Meta:
         ordering = ['date_joined']
+        indexes = [
+            models.Index(fields=['email_normalized', 'email_verified']),
+            # Serves the default ordering and keyset pagination.
+            models.Index(fields=['date_joined', 'id']),
+        ]
+
+
+class OutboxEmail(models.Model):
+    """
+    Email waiting to be delivered by `manage.py run_mail_worker`.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending'
+        SENT = 'sent'
+        DEAD = 'dead'
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True, null=True)
+    recipients = models.JSONField(default=list)
+
+    status = models.CharField(
+        max_length=7, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self) -> str:
+        return f'{self.subject} to {", ".join(self.recipients)}'
+
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+
+class ShardBucket(models.Model):
+    """
+    Database holding the users whose id starts with `bucket`, buckets without
+    a row live in `default`. Only used when `USER_SHARDS` is set.
+    """
+
+    bucket = models.CharField(primary_key=True, max_length=1)
+    database = models.CharField(max_length=64)
+
+    def __str__(self) -> str:
+        return f'{self.bucket} -> {self.database}'
+
+
+class UserDirectory(models.Model):
+    """
+    Normalized email to user id index kept in `default`, so email lookups
+    know the shard to query. Only used when `USER_SHARDS` is set.
+    """
+
+    email = models.EmailField(primary_key=True)
+    user_id = models.CharField(max_length=11, unique=True)
+
+    def __str__(self) -> str:
+        return self.email
+
+    class Meta:
+        verbose_name_plural = 'user directory'
+
+
+class EffectivePermission(models.Model):
+    """
+    Permission a user has directly or through a group, kept up to date by
+    signals (see authentication.permissions) so `with_perm` reads one index.
+    """
+
+    user_id = models.CharField(max_length=11, db_index=True)
+    permission = models.ForeignKey(
+        'auth.Permission', on_delete=models.CASCADE, related_name='+'
+    )
+
+    def __str__(self) -> str:
+        return f'{self.user_id}: {self.permission_id}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['permission', 'user_id'], name='unique_effective_permission'
+            )
+        ]
+
+
+class RevokedToken(models.Model):
+    """
+    Refresh token or token family that can't be used anymore, see
+    authentication.access_tokens.
+    """
+
+    id = models.CharField(primary_key=True, max_length=16)
+    revoked_at = models.DateTimeField(default=timezone.now, db_index=True)
+    # Past it, the token would be rejected anyway and the row can go.
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:
+        return self.id
+
+
+class AuthEvent(models.Model):
+    """
+    Audit trail of sign ins, sign outs, failed sign ins and password resets,
+    written in batches by authentication.audit.
+    """
+
+    class Kind(models.TextChoices):
+        LOGIN = 'login'
+        LOGOUT = 'logout'
+        LOGIN_FAILED = 'login_failed'
+        PASSWORD_RESET = 'password_reset'
+
+    kind = models.CharField(max_length=14, choices=Kind.choices)
+    user_id = models.CharField(max_length=11, blank=True, null=True)
+    email = models.EmailField(blank=True)
+    ip = models.GenericIPAddressField(blank=True, null=True)
+    # When it happened, not when the batch was written.
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self) -> str:
+        return f'{self.kind} {self.email or self.user_id}'
+
+    class Meta:
+        indexes = [models.Index(fields=['user_id', 'created_at'])]
@@ -0,0 +1,128 @@
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+def enqueue(subject, message, from_email, recipient_list) -> OutboxEmail:
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email,
+        recipients=list(recipient_list),
+    )
+
+
+def backoff(attempts: int) -> timedelta:
+    """
+    Exponential delay before the next delivery attempt.
+    """
+    seconds = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.EMAIL_OUTBOX_MAX_RETRY_DELAY))
+
+
+def claim(batch_size: int) -> list[OutboxEmail]:
+    """
+    Lease due emails for `EMAIL_OUTBOX_LEASE` seconds, so other workers skip
+    them while they are sent, and return them.
+
+    The rows are only locked for this short transaction, with SKIP LOCKED
+    when the database supports it so several workers can drain the outbox
+    together.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = OutboxEmail.objects.filter(
+            status=OutboxEmail.Status.PENDING, next_attempt_at__lte=now
+        )
+        db = router.db_for_write(OutboxEmail)
+        if connections[db].features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        emails = list(queryset[:batch_size])
+        OutboxEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+            next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+        )
+    return emails
+
+
+def release(emails: list[OutboxEmail]):
+    """
+    End the lease of emails left unsent.
+    """
+    OutboxEmail.objects.filter(
+        pk__in=[email.pk for email in emails], status=OutboxEmail.Status.PENDING
+    ).update(next_attempt_at=timezone.now())
+
+
+def is_message_error(exc: Exception) -> bool:
+    """
+    Whether `exc` is about the message (rejected by the server, invalid),
+    other errors mean the connection is unusable.
+    """
+    return not isinstance(exc, OSError) or isinstance(
+        exc, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)
+    )
+
+
+def deliver_batch(connection, batch_size: int) -> int:
+    """
+    Send one batch of due emails over `connection`, a mail backend, each
+    marked sent as soon as it is.
+
+    Return the number of emails processed. Connection failures end the batch
+    without counting as delivery attempts, and are raised.
+    """
+    emails = claim(batch_size)
+    if not emails:
+        return 0
+    try:
+        connection.open()
+    except Exception:
+        release(emails)
+        raise
+
+    for index, email in enumerate(emails):
+        message = EmailMessage(
+            subject=email.subject,
+            body=email.body,
+            from_email=email.from_email,
+            to=email.recipients,
+            connection=connection,
+        )
+        try:
+            connection.send_messages([message])
+        except Exception as exc:  # pylint: disable=broad-except
+            connection.close()
+            if not is_message_error(exc):
+                release(emails[index:])
+                raise
+            failed(email, exc)
+            # The server may have dropped the session after an error.
+            try:
+                connection.open()
+            except Exception:
+                release(emails[index + 1 :])
+                raise
+        else:
+            OutboxEmail.objects.filter(pk=email.pk).update(
+                status=OutboxEmail.Status.SENT,
+                sent_at=timezone.now(),
+                attempts=F('attempts') + 1,
+            )
+    return len(emails)
+
+
+def failed(email: OutboxEmail, exc: Exception):
+    email.attempts += 1
+    email.last_error = repr(exc)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboxEmail.Status.DEAD
+    else:
+        email.next_attempt_at = timezone.now() + backoff(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
@@ -0,0 +1,215 @@
+"""
+Permissions shared across requests and workers.
+
+`AUTH_PERMISSION_CACHE` keeps users' and groups' permission sets, each tagged
+with the version tokens it was computed under. Changing a user, group or
+permission replaces its token, which invalidates everything derived from it
+without knowing the cached keys.
+
+`EffectivePermission` rows index the permissions every user has, directly or
+through groups, for `with_perm`. They live on the shard of their user.
+"""
+import secrets
+from itertools import chain
+
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .bulk import chunked
+from .models import EffectivePermission, User
+from .sharding import pk_shard
+
+PREFIX = 'auth:perms'
+GLOBAL_VERSION = f'{PREFIX}:version'
+
+
+def _cache():
+    alias = getattr(settings, 'AUTH_PERMISSION_CACHE', None)
+    return caches[alias] if alias else None
+
+
+def _user_version(pk) -> str:
+    return f'{GLOBAL_VERSION}:user:{pk}'
+
+
+def _group_version(pk) -> str:
+    return f'{GLOBAL_VERSION}:group:{pk}'
+
+
+def _names(permissions) -> frozenset:
+    rows = permissions.values_list('content_type__app_label', 'codename').order_by()
+    return frozenset(f'{app_label}.{codename}' for app_label, codename in rows)
+
+
+def _versions(cache, keys, found) -> dict:
+    """
+    Tokens of version `keys`, starting the missing ones.
+    """
+    versions = {}
+    for key in keys:
+        if (version := found.get(key)) is None:
+            cache.add(key, secrets.token_hex(8), None)
+            version = cache.get(key)
+        versions[key] = version
+    return versions
+
+
+def cached_permissions(user) -> tuple[frozenset, frozenset] | None:
+    """
+    Return `(user permissions, group permissions)` of an active user, None
+    when the cache is disabled.
+    """
+    cache = _cache()
+    if cache is None:
+        return None
+    timeout = settings.AUTH_PERMISSION_CACHE_TIMEOUT
+
+    if user.is_superuser:
+        found = cache.get_many([GLOBAL_VERSION, f'{PREFIX}:all'])
+        version = _versions(cache, [GLOBAL_VERSION], found)[GLOBAL_VERSION]
+        entry = found.get(f'{PREFIX}:all')
+        if entry is None or entry[0] != version:
+            entry = (version, _names(Permission.objects.all()))
+            cache.set(f'{PREFIX}:all', entry, timeout)
+        return entry[1], entry[1]
+
+    # Read versions before the database, so a change committed meanwhile
+    # leaves the entry stale instead of hiding it.
+    entry_key = f'{PREFIX}:user:{user.pk}'
+    version_keys = [GLOBAL_VERSION, _user_version(user.pk)]
+    found = cache.get_many([*version_keys, entry_key])
+    versions = tuple(_versions(cache, version_keys, found).values())
+    entry = found.get(entry_key)
+    if entry is None or entry[0] != versions:
+        entry = (
+            versions,
+            _names(Permission.objects.filter(user=user)),
+            tuple(user.groups.values_list('pk', flat=True)),
+        )
+        cache.set(entry_key, entry, timeout)
+    _, user_permissions, group_ids = entry
+    return user_permissions, _group_permissions(cache, group_ids, versions[0])
+
+
+def _group_permissions(cache, group_ids, global_version) -> frozenset:
+    if not group_ids:
+        return frozenset()
+
+    keys = {pk: (_group_version(pk), f'{PREFIX}:group:{pk}') for pk in group_ids}
+    found = cache.get_many(list(chain.from_iterable(keys.values())))
+    versions = _versions(cache, [version for version, _ in keys.values()], found)
+
+    entries, stale = {}, {}
+    for pk, (version_key, entry_key) in keys.items():
+        current = (global_version, versions[version_key])
+        entry = found.get(entry_key)
+        if entry is None or entry[0] != current:
+            stale[pk] = current
+        else:
+            entries[pk] = entry
+
+    if stale:
+        names = _group_names(stale)
+        fresh = {pk: (stale[pk], names[pk]) for pk in stale}
+        cache.set_many(
+            {keys[pk][1]: entry for pk, entry in fresh.items()},
+            settings.AUTH_PERMISSION_CACHE_TIMEOUT,
+        )
+        entries.update(fresh)
+
+    return frozenset().union(*(entry[1] for entry in entries.values()))
+
+
+def _group_names(group_ids) -> dict:
+    names = {pk: set() for pk in group_ids}
+    rows = Permission.objects.filter(group__in=group_ids).values_list(
+        'group', 'content_type__app_label', 'codename'
+    )
+    for pk, app_label, codename in rows.order_by():
+        names[pk].add(f'{app_label}.{codename}')
+    return {pk: frozenset(group) for pk, group in names.items()}
+
+
+def _bump(keys):
+    cache = _cache()
+    if cache is None or not keys:
+        return
+    cache.set_many({key: secrets.token_hex(8) for key in keys}, None)
+    # Again on commit, a request may have cached the old rows meanwhile.
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(keys))
+
+
+def reindex_users(user_ids):
+    """
+    Rebuild the `EffectivePermission` rows of `user_ids`, on their shards.
+    """
+    shards = {}
+    for user_id in user_ids:
+        shards.setdefault(pk_shard(user_id), []).append(user_id)
+    for using, ids in shards.items():
+        for chunk in chunked(ids, 1000):
+            _reindex(chunk, using)
+
+
+def _reindex(user_ids, using):
+    through = User.user_permissions.through
+    memberships = User.groups.through
+    rows = set(
+        through.objects.using(using)
+        .filter(user_id__in=user_ids)
+        .values_list('user_id', 'permission_id')
+    )
+    rows.update(
+        memberships.objects.using(using)
+        .filter(user_id__in=user_ids, group__permissions__isnull=False)
+        .values_list('user_id', 'group__permissions')
+    )
+    index = EffectivePermission.objects.using(using)
+    with transaction.atomic(using=using):
+        index.filter(user_id__in=user_ids).delete()
+        index.bulk_create(
+            [
+                EffectivePermission(user_id=user_id, permission_id=permission_id)
+                for user_id, permission_id in rows
+            ]
+        )
+
+
+def group_members(group_ids) -> list:
+    members = set()
+    for using in settings.USER_SHARDS or [DEFAULT_DB_ALIAS]:
+        members.update(
+            User.groups.through.objects.using(using)
+            .filter(group_id__in=group_ids)
+            .values_list('user_id', flat=True)
+        )
+    return list(members)
+
+
+def users_changed(user_ids):
+    """
+    Refresh what derives from the permissions or groups of `user_ids`.
+    """
+    user_ids = list(user_ids)
+    reindex_users(user_ids)
+    _bump([_user_version(pk) for pk in user_ids])
+
+
+def groups_changed(group_ids, member_ids=None):
+    """
+    Refresh what derives from the permissions of `group_ids`, `member_ids`
+    overrides the members whose index is rebuilt (e.g. of deleted groups).
+    """
+    group_ids = list(group_ids)
+    reindex_users(group_members(group_ids) if member_ids is None else member_ids)
+    _bump([_group_version(pk) for pk in group_ids])
+
+
+def permissions_changed():
+    """
+    Invalidate every cached permission set, e.g. after a permission rename.
+    """
+    _bump([GLOBAL_VERSION])
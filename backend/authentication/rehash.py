@@ -0,0 +1,86 @@
+"""
+Password hash upgrades deferred out of the sign in request.
+
+`verify_password` hashes the password anew in the background when the stored
+hash is outdated, so the raw password is only kept until it's hashed. Once the
+user is logged in, the new hash is queued with the session that triggered it
+and written by a background thread, unless the password changed meanwhile.
+"""
+import logging
+from functools import lru_cache, partial
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import HASH_SESSION_KEY
+from django.db import transaction
+
+from utils.background import BackgroundQueue
+
+from .models import User
+from .sharding import pk_shard
+from .user_cache import invalidate_user
+
+logger = logging.getLogger(__name__)
+
+
+def rehash(items):
+    engine = import_module(settings.SESSION_ENGINE)
+    for pk, old_password, new_password, session_key in items:
+        shard = pk_shard(pk)
+        with transaction.atomic(using=shard):
+            # Drop the upgrade when the password changed in the meantime, the
+            # session must not follow a password someone else set.
+            users = User._default_manager.using(shard)
+            if not users.filter(pk=pk, password=old_password).update(
+                password=new_password
+            ):
+                continue
+
+            # Keep the session that triggered the upgrade signed in.
+            session = engine.SessionStore(session_key)
+            old_hash = User(password=old_password).get_session_auth_hash()
+            if session.get(HASH_SESSION_KEY) == old_hash:
+                session[HASH_SESSION_KEY] = User(
+                    password=new_password
+                ).get_session_auth_hash()
+                session.save()
+        invalidate_user(pk)
+
+
+@lru_cache(maxsize=None)
+def rehash_queue() -> BackgroundQueue:
+    return BackgroundQueue(
+        rehash,
+        interval=0.2,
+        max_size=settings.PASSWORD_REHASH_QUEUE_SIZE,
+        name='password-rehash',
+    )
+
+
+def queue_rehash(pk, old_password, session_key, future):
+    try:
+        new_password = future.result()
+    except Exception:  # pylint: disable=broad-except
+        logger.exception('Password rehash of user %s failed', pk)
+        return
+    rehash_queue().put((pk, old_password, new_password, session_key), key=pk)
+
+
+def upgrade_password(request, user: User):
+    """
+    Queue the upgrade of a hash found outdated while authenticating `user`.
+    """
+    future = user.__dict__.pop('_upgraded_password', None)
+    if future is None:
+        return
+
+    session_key = request.session.session_key
+    if HASH_SESSION_KEY not in request.session or session_key is None:
+        # Tokens carry the session auth hash they're issued with, upgrading it
+        # would revoke them: leave it to a sign in with a session.
+        future.cancel()
+        return
+
+    future.add_done_callback(
+        partial(queue_rehash, user.pk, user.password, session_key)
+    )
@@ -1,10 +1,13 @@
 from collections import OrderedDict
 from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
+from utils.metrics import TimedSerializerMixin
+from utils.serializers import FlatListSerializer, FlatReadMixin, SparseFieldsMixin
 from . import models
+from .sharding import users_by_email
 
 
-class User(serializers.ModelSerializer):
+class User(FlatReadMixin, TimedSerializerMixin, serializers.ModelSerializer):
     "Serializer account profile model basic fields."
 
     name = serializers.SerializerMethodField('get_name')
@@ -15,12 +18,29 @@ class User(serializers.ModelSerializer):
             'name',
             'email',
         ]
+        list_serializer_class = FlatListSerializer
 
     def get_name(self, instance) -> str:
         return str(instance)
 
 
-class UserUp(serializers.ModelSerializer):
+class UserDetail(SparseFieldsMixin, User):
+    "Serialize account fields for support listings, `?fields=` picks some."
+
+    class Meta(User.Meta):
+        fields = [
+            'id',
+            'name',
+            'email',
+            'email_verified',
+            'is_active',
+            'date_joined',
+            'last_login',
+        ]
+        field_sources = {'name': ['first_name', 'last_name']}
+
+
+class UserUp(TimedSerializerMixin, serializers.ModelSerializer):
     """Serialize user sing up credentials."""
 
     password2 = serializers.CharField(required=True)
@@ -39,6 +59,12 @@ class UserUp(serializers.ModelSerializer):
             'agreement',
         ]
 
+    def validate_email(self, attrs):
+        # The model's unique check is case sensitive and only sees `default`.
+        if users_by_email(attrs).exists():
+            raise serializers.ValidationError('user with this email already exists.')
+        return attrs
+
     def validate_password(self, attrs):
         validate_password(attrs)
         return attrs
@@ -53,39 +79,88 @@ class UserUp(serializers.ModelSerializer):
             raise serializers.ValidationError("This field is required.")
         return attrs
 
-    def create(self, validated_data: OrderedDict):
+    @staticmethod
+    def user_fields(validated_data: OrderedDict) -> dict:
         validated_data.pop('password2')
         validated_data.pop('agreement')
+        return validated_data
 
-        return models.User.objects.create_user(**validated_data)
+    def create(self, validated_data: OrderedDict):
+        return models.User.objects.create_user(**self.user_fields(validated_data))
+
+    async def acreate(self, validated_data: OrderedDict):
+        """Create the user hashing the password off the event loop."""
+        return await models.User.objects.acreate_user(
+            **self.user_fields(validated_data)
+        )
 
 
-class UserIn(serializers.ModelSerializer):
+class UserIn(TimedSerializerMixin, serializers.ModelSerializer):
     """Serialize user sing in credentials."""
 
     email = serializers.EmailField(required=True)
     remember_me = serializers.BooleanField(default=False)
+    tokens = serializers.BooleanField(
+        default=False, help_text='Issue access tokens instead of a session.'
+    )
 
     class Meta:
         """Config metadata."""
 
         model = models.User
-        fields = ['email', 'password', 'remember_me']
+        fields = ['email', 'password', 'remember_me', 'tokens']
+
+
+class TokenPair(serializers.Serializer):
+    """Serialize signed access and refresh tokens."""
+
+    token_type = serializers.CharField()
+    access = serializers.CharField()
+    refresh = serializers.CharField()
+    expires_in = serializers.IntegerField(help_text='Access token lifetime (s).')
+
+    def create(self, validated_data):
+        # Token pairs are plain dicts, as `issue_tokens` returns them.
+        return dict(validated_data)
+
+    def update(self, instance: dict, validated_data):
+        return {**instance, **validated_data}
+
+
+class SignedIn(User):
+    "Serialize the signed in user, with tokens when requested."
+
+    tokens = TokenPair(required=False)
+
+    class Meta(User.Meta):
+        fields = [*User.Meta.fields, 'tokens']
+
+
+class RefreshToken(serializers.Serializer):
+    """Serialize a refresh token."""
+
+    refresh = serializers.CharField()
+
+    def create(self, validated_data):
+        return dict(validated_data)
+
+    def update(self, instance: dict, validated_data):
+        return {**instance, **validated_data}
 
 
-class Validated(serializers.ModelSerializer):
+class Validated(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = models.User
         fields = ['email', 'email_verified']
 
 
-class SendEmail(serializers.Serializer):
+class SendEmail(TimedSerializerMixin, serializers.Serializer):
     """Serialize email."""
 
     email = serializers.EmailField(required=True)
 
 
-class ChangePassord(serializers.ModelSerializer):
+class ChangePassord(TimedSerializerMixin, serializers.ModelSerializer):
     """Serialize user password."""
 
     password2 = serializers.CharField(required=True)
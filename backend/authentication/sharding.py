@@ -0,0 +1,153 @@
+"""
+Users spread over the `USER_SHARDS` databases by the first character of
+their id (the bucket, see `ShardedTimeOrderedBase64Generator`).
+
+Buckets live in `default` until `manage.py rebalance_shards` moves them,
+the bucket map and the email directory are kept in `default`. Everything
+here is a no-op while `USER_SHARDS` is empty.
+
+Groups and permissions are not sharded: every shard needs them migrated.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models.functions import Substr
+
+from utils.cache import LRUCache
+from utils.models import normalize_email
+
+from .models import ShardBucket, User, UserDirectory
+
+# Models only stored in `default`.
+DIRECTORY_MODELS = {'shardbucket', 'userdirectory'}
+
+
+@lru_cache(maxsize=None)
+def _bucket_cache() -> LRUCache:
+    return LRUCache(maxsize=1, ttl=settings.SHARD_MAP_TTL)
+
+
+def bucket_map(cached=True) -> dict[str, str]:
+    """
+    Return `{bucket: database}` for the buckets moved out of `default`.
+    """
+    buckets = _bucket_cache().get('map') if cached else None
+    if buckets is None:
+        buckets = dict(
+            ShardBucket.objects.using(DEFAULT_DB_ALIAS).values_list(
+                'bucket', 'database'
+            )
+        )
+        _bucket_cache().set('map', buckets)
+    return buckets
+
+
+def pk_shard(pk: str) -> str:
+    if not settings.USER_SHARDS or not pk:
+        return DEFAULT_DB_ALIAS
+    return bucket_map().get(pk[0], DEFAULT_DB_ALIAS)
+
+
+def email_shard(email: str) -> str | None:
+    """
+    Database of the user owning `email`, None when there is no such user.
+    """
+    if not settings.USER_SHARDS:
+        return DEFAULT_DB_ALIAS
+    user_id = (
+        UserDirectory.objects.using(DEFAULT_DB_ALIAS)
+        .filter(email=normalize_email(email))
+        .values_list('user_id', flat=True)
+        .first()
+    )
+    return None if user_id is None else pk_shard(user_id)
+
+
+def users_by_email(email: str):
+    """
+    Queryset of the user owning `email`, run on its shard.
+    """
+    shard = email_shard(email)
+    if shard is None:
+        return User._default_manager.none()
+    return User._default_manager.using(shard).filter(
+        email_normalized=normalize_email(email)
+    )
+
+
+def users_in_bucket(bucket: str, using: str):
+    # A case sensitive comparison, unlike `startswith` on SQLite.
+    return (
+        User._default_manager.using(using)
+        .alias(bucket=Substr('id', 1, 1))
+        .filter(bucket=bucket)
+    )
+
+
+def claim_email(user: User):
+    """
+    Point the email directory at `user` before it's saved, raising
+    IntegrityError when another user owns the email.
+    """
+    if not settings.USER_SHARDS:
+        return
+    if not user._state.adding and getattr(user, '_loaded_email', None) == user.email:
+        return
+
+    email = normalize_email(user.email)
+    directory = UserDirectory.objects.using(DEFAULT_DB_ALIAS)
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        entry = directory.select_for_update().filter(email=email).first()
+        if entry is not None and entry.user_id != user.pk:
+            owner = User._default_manager.using(pk_shard(entry.user_id))
+            # Entries left by failed inserts are taken over.
+            if owner.filter(pk=entry.user_id, email_normalized=email).exists():
+                raise IntegrityError(f'{user.email} is already used.')
+        directory.filter(user_id=user.pk).exclude(email=email).delete()
+        directory.update_or_create(email=email, defaults={'user_id': user.pk})
+
+
+def is_moved_copy(user: User) -> bool:
+    """
+    Whether `user` was loaded from a shard its bucket moved away from, e.g.
+    deleted there by `manage.py rebalance_shards`.
+    """
+    return bool(settings.USER_SHARDS) and user._state.db != pk_shard(user.pk)
+
+
+def release_email(user: User):
+    if settings.USER_SHARDS and not is_moved_copy(user):
+        UserDirectory.objects.using(DEFAULT_DB_ALIAS).filter(user_id=user.pk).delete()
+
+
+class UserShardRouter:
+    """
+    Route users, and their many to many rows, to the shard of their id.
+
+    Routers only see instances, so queries by email or id go through
+    `users_by_email` and `pk_shard`.
+    """
+
+    def _shard(self, model, instance):
+        if not settings.USER_SHARDS or instance is None:
+            return None
+        if model is User:
+            return pk_shard(instance.pk)
+        if model._meta.auto_created is User and isinstance(instance, User):
+            return pk_shard(instance.pk)
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._shard(model, hints.get('instance'))
+
+    def db_for_write(self, model, **hints):
+        return self._shard(model, hints.get('instance'))
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == 'authentication' and model_name in DIRECTORY_MODELS:
+            return db == DEFAULT_DB_ALIAS
+        return None
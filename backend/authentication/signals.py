@@ -1,16 +1,160 @@
-from django.db.models.signals import post_save
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, identify_hasher
+from django.contrib.auth.signals import (
+    user_logged_in,
+    user_logged_out,
+    user_login_failed,
+)
+from django.contrib.auth.models import Group, Permission
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 from django.dispatch import receiver
 
-from .models import User
+from utils.models import normalize_email
+
+from .backends import invalidate_email_lookup
+from . import audit, permissions
+from .models import AuthEvent, EffectivePermission, User
+from .rehash import upgrade_password
+from .sharding import claim_email, release_email
+from .user_cache import invalidate_user
+
+
+def is_password_hashed(password: str) -> bool:
+    if password.startswith(UNUSABLE_PASSWORD_PREFIX):
+        return True
+    try:
+        identify_hasher(password)
+    except ValueError:
+        return False
+    return True
+
+
+@receiver(pre_save, sender=User)
+def prepare_fixture_user(instance: User, raw, **kwargs):
+    """
+    Hash the plain passwords of users loaded from fixtures, before their only
+    write.
+    """
+    # "raw" param means "saved with manage.py loaddata", which stores fields
+    # as given and skips their `pre_save`.
+    if not raw:
+        return
+    if instance.password and not is_password_hashed(instance.password):
+        instance.set_password(instance.password)
+    instance.email_normalized = normalize_email(instance.email)
 
 
 @receiver(post_save, sender=User)
-def create_user_profile(instance: User, created, raw, **kwargs):
+@receiver(post_delete, sender=User)
+def invalidate_user_lookups(instance: User, update_fields=None, **kwargs):
+    """
+    Drop cached email lookups of the saved or deleted user.
+    """
+    # `login()` only bumps last_login, which cached lookups don't rely on.
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    invalidate_email_lookup(instance.email, getattr(instance, '_loaded_email', None))
+    invalidate_user(instance.pk)
+
+
+@receiver(pre_save, sender=User)
+def update_user_directory(instance: User, **kwargs):
     """
-    Create the User related Profile.
+    Record new and changed emails in the directory of sharded users.
     """
-    if created:
-        # "raw" param means "created with manage.py loaddata"
-        if raw:
-            instance.set_password(instance.password)
-            instance.save()
+    claim_email(instance)
+
+
+@receiver(post_delete, sender=User)
+def remove_from_user_directory(instance: User, **kwargs):
+    release_email(instance)
+
+
+@receiver(user_logged_in)
+def upgrade_password_hash(request, user, **kwargs):
+    """
+    Persist a password hash upgrade detected while authenticating.
+    """
+    upgrade_password(request, user)
+
+
+@receiver(user_logged_in)
+def record_login(request, user, **kwargs):
+    audit.record_login(request, user)
+
+
+@receiver(user_logged_out)
+def record_logout(request, user, **kwargs):
+    audit.record(AuthEvent.Kind.LOGOUT, request, user)
+
+
+@receiver(user_login_failed)
+def record_login_failure(credentials, request=None, **kwargs):
+    audit.record(
+        AuthEvent.Kind.LOGIN_FAILED, request, email=credentials.get('email', '')
+    )
+
+
+def m2m_owner_ids(instance, action, reverse, pk_set, reverse_accessor):
+    """
+    Ids of the objects whose m2m field changed (e.g. users for `User.groups`),
+    None until the change is done.
+    """
+    if action == 'pre_clear' and reverse:
+        # The cleared rows are gone by `post_clear`.
+        manager = getattr(instance, reverse_accessor)
+        instance._m2m_cleared = list(manager.values_list('pk', flat=True))
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return None
+    if not reverse:
+        return [instance.pk]
+    if action == 'post_clear':
+        return instance.__dict__.pop('_m2m_cleared', [])
+    return list(pk_set)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_permissions_changed(instance, action, reverse, pk_set, **kwargs):
+    """
+    Refresh the permissions of users added to groups or given permissions.
+    """
+    user_ids = m2m_owner_ids(instance, action, reverse, pk_set, 'user_set')
+    if user_ids:
+        permissions.users_changed(user_ids)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(instance, action, reverse, pk_set, **kwargs):
+    group_ids = m2m_owner_ids(instance, action, reverse, pk_set, 'group_set')
+    if group_ids:
+        permissions.groups_changed(group_ids)
+
+
+@receiver(pre_delete, sender=Group)
+def remember_group_members(instance: Group, **kwargs):
+    instance._member_ids = permissions.group_members([instance.pk])
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(instance: Group, **kwargs):
+    permissions.groups_changed([instance.pk], getattr(instance, '_member_ids', []))
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_save, sender=ContentType)
+@receiver(post_delete, sender=ContentType)
+def permission_names_changed(**kwargs):
+    permissions.permissions_changed()
+
+
+@receiver(post_delete, sender=User)
+def remove_effective_permissions(instance: User, using, **kwargs):
+    EffectivePermission.objects.using(using).filter(user_id=instance.pk).delete()
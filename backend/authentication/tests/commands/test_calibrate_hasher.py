@@ -0,0 +1,30 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+
+class CalibrateHasher(SimpleTestCase):
+    def test_settings_are_written(self):
+        """
+        Ensure the calibrated costs end up in the env file.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / '.env'
+            call_command(
+                'calibrate_hasher',
+                target_ms=5,
+                hasher=['pbkdf2', 'scrypt'],
+                use='pbkdf2',
+                output=output,
+                stdout=StringIO(),
+            )
+            env = output.read_text()
+
+        self.assertIn('PBKDF2_ITERATIONS=', env)
+        self.assertIn('SCRYPT_WORK_FACTOR=', env)
+        self.assertIn(
+            'PASSWORD_HASHER="authentication.hashers.TunedPBKDF2PasswordHasher"', env
+        )
@@ -0,0 +1,77 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from authentication import models
+from authentication.bulk import build_users, bulk_insert_users
+
+ROWS = [
+    {'email': 'foo@example.com', 'password': 'supersecret', 'first_name': 'Foo'},
+    {'email': 'bar@example.com', 'password': 'supersecret', 'first_name': 'Bar'},
+    {'email': 'baz@example.com', 'password': 'supersecret', 'first_name': 'Baz'},
+]
+
+
+class ImportUsers(TestCase):
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.dir.name) / 'users.ndjson'
+        self.path.write_text('\n'.join(json.dumps(row) for row in ROWS))
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+
+    def test_users_are_imported_with_hashed_passwords(self):
+        """
+        Ensure every row is inserted and can authenticate.
+        """
+        call_command(
+            'import_users', self.path, batch_size=2, workers=2, stdout=StringIO()
+        )
+
+        self.assertEqual(models.User.objects.count(), 3)
+        user = models.User.objects.get(email='bar@example.com')
+        self.assertTrue(user.check_password('supersecret'))
+        self.assertFalse(self.path.with_name('users.ndjson.progress').exists())
+
+    def test_import_resumes_after_last_committed_row(self):
+        """
+        Ensure rows recorded in the progress file are skipped.
+        """
+        progress = self.path.with_name('users.ndjson.progress')
+        progress.write_text(json.dumps({'rows': 2}))
+
+        call_command('import_users', self.path, workers=1, stdout=StringIO())
+
+        self.assertEqual(
+            list(models.User.objects.values_list('email', flat=True)),
+            ['baz@example.com'],
+        )
+
+    def test_existing_emails_are_not_counted(self):
+        """
+        Ensure rows skipped for an existing email aren't reported as imported.
+        """
+        models.User.objects.create(email='FOO@example.com', password='x')
+        stdout = StringIO()
+        call_command('import_users', self.path, workers=1, stdout=stdout)
+
+        self.assertEqual(models.User.objects.count(), 3)
+        self.assertIn('Imported 2 rows, skipped 1 existing emails.', stdout.getvalue())
+
+    def test_pk_collisions_are_retried(self):
+        """
+        Ensure rows whose generated id is taken are inserted with a new one.
+        """
+        taken = models.User.objects.create(email='qux@example.com', password='x')
+        users = build_users(ROWS, ['!'] * len(ROWS))
+        users[0].pk = taken.pk
+
+        self.assertEqual(bulk_insert_users(users), 3)
+        self.assertEqual(models.User.objects.count(), 4)
+        foo = models.User.objects.get(email='foo@example.com')
+        self.assertNotEqual(foo.pk, taken.pk)
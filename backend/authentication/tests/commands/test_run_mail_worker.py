@@ -0,0 +1,169 @@
+import socketserver
+import threading
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from authentication import models, outbox
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept messages from smtplib."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost')
+        data = None
+        for raw in self.rfile:
+            line = raw.decode().rstrip('\r\n')
+            if data is not None:
+                if line == '.':
+                    self.server.received += 1
+                    if self.server.received in self.server.reject:
+                        self.reply('554 Rejected')
+                    else:
+                        self.server.messages.append('\n'.join(data))
+                        self.reply('250 OK')
+                    data = None
+                else:
+                    data.append(line)
+            elif line.upper() == 'DATA':
+                data = []
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+            elif line.upper() == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, reject=()):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.connections = 0
+        self.received = 0
+        # Numbers of the messages answered with a permanent error.
+        self.reject = set(reject)
+        self.messages = []
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+
+SIGN_UP = {
+    'first_name': 'foo',
+    'last_name': 'qux',
+    'password': 'supersecret',
+    'password2': 'supersecret',
+    'agreement': True,
+}
+
+
+@override_settings(
+    EMAIL_USE_OUTBOX=True,
+    EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+    EMAIL_HOST='127.0.0.1',
+    EMAIL_USE_TLS=False,
+    EMAIL_USE_SSL=False,
+)
+class RunMailWorker(TestCase):
+    def setUp(self) -> None:
+        for i in range(3):
+            self.client.post('/account/sign-up/', {**SIGN_UP, 'email': f'{i}@a.com'})
+
+    def test_sign_up_only_queues_the_email(self):
+        """
+        Ensure the view writes to the outbox instead of sending.
+        """
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            models.OutboxEmail.objects.filter(status='pending').count(), 3
+        )
+
+    def test_worker_drains_outbox_over_one_connection(self):
+        """
+        Ensure the worker sends every queued email reusing the connection.
+        """
+        with SMTPStandIn() as server, self.settings(
+            EMAIL_PORT=server.server_address[1]
+        ):
+            call_command('run_mail_worker', once=True, stdout=StringIO())
+
+        self.assertEqual(len(server.messages), 3)
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(models.OutboxEmail.objects.filter(status='sent').count(), 3)
+
+    def test_unreachable_server_gives_the_batch_back(self):
+        """
+        Ensure connection failures neither count as attempts nor keep emails.
+        """
+        with SMTPStandIn() as server:
+            port = server.server_address[1]
+
+        stderr = StringIO()
+        with self.settings(EMAIL_PORT=port):
+            call_command('run_mail_worker', once=True, stdout=StringIO(), stderr=stderr)
+
+        self.assertIn('Mail server unavailable', stderr.getvalue())
+        for email in models.OutboxEmail.objects.all():
+            self.assertEqual((email.status, email.attempts), ('pending', 0))
+            self.assertLessEqual(email.next_attempt_at, timezone.now())
+
+    def test_each_email_is_marked_as_it_is_sent(self):
+        """
+        Ensure a rejected email doesn't hold back the rest of its batch.
+        """
+        with SMTPStandIn(reject=[2]) as server, self.settings(
+            EMAIL_PORT=server.server_address[1]
+        ):
+            call_command('run_mail_worker', once=True, stdout=StringIO())
+
+        self.assertEqual(len(server.messages), 2)
+        rejected = models.OutboxEmail.objects.get(status='pending')
+        self.assertEqual(rejected.attempts, 1)
+        self.assertIn('Rejected', rejected.last_error)
+        self.assertEqual(models.OutboxEmail.objects.filter(status='sent').count(), 2)
+
+    def test_claimed_emails_are_leased(self):
+        """
+        Ensure claimed emails aren't due for other workers until their lease
+        ends, so a dead worker's emails are retried.
+        """
+        emails = outbox.claim(10)
+
+        self.assertEqual(len(emails), 3)
+        self.assertEqual(outbox.claim(10), [])
+        models.OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(len(outbox.claim(10)), 3)
+
+    def test_rejected_delivery_is_retried_then_dead_lettered(self):
+        """
+        Ensure rejections back off and end up dead after the last attempt.
+        """
+        with SMTPStandIn(reject=range(1, 7)) as server, self.settings(
+            EMAIL_PORT=server.server_address[1], EMAIL_OUTBOX_MAX_ATTEMPTS=2
+        ):
+            call_command('run_mail_worker', once=True, stdout=StringIO())
+            email = models.OutboxEmail.objects.first()
+            self.assertEqual(email.status, 'pending')
+            self.assertEqual(email.attempts, 1)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+
+            models.OutboxEmail.objects.update(next_attempt_at=timezone.now())
+            call_command('run_mail_worker', once=True, stdout=StringIO())
+
+        self.assertEqual(models.OutboxEmail.objects.filter(status='dead').count(), 3)
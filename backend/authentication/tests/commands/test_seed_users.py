@@ -0,0 +1,67 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from authentication import models
+
+
+class SeedUsers(TestCase):
+    def test_users_are_seeded_with_shared_passwords(self):
+        """
+        Ensure every user is inserted, in batches, and signs in with its
+        documented password.
+        """
+        call_command(
+            'seed_users',
+            count=25,
+            passwords=3,
+            batch_size=10,
+            workers=1,
+            seed=1,
+            stdout=StringIO(),
+        )
+
+        users = models.User.objects.order_by('email')
+        self.assertEqual(users.count(), 25)
+        self.assertEqual(len({user.date_joined for user in users}), 25)
+
+        user = models.User.objects.get(email__contains='.7@')
+        self.assertTrue(user.check_password('seed-password-1'))
+        self.assertEqual(user.email_normalized, user.email)
+
+    def test_seeding_continues_numbering(self):
+        """
+        Ensure `--start` adds users next to previously seeded ones.
+        """
+        options = {'count': 5, 'passwords': 1, 'workers': 1, 'stdout': StringIO()}
+        call_command('seed_users', **options)
+        call_command('seed_users', start=5, **options)
+
+        self.assertEqual(models.User.objects.count(), 10)
+
+
+class LoadFixture(TestCase):
+    def test_fixture_users_are_written_once(self):
+        """
+        Ensure loading fixtures hashes plain passwords before a single insert
+        per user.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            call_command('loaddata', 'user', verbosity=0)
+
+        written = [
+            query['sql'].split()[0]
+            for query in queries
+            if query['sql'].startswith(
+                ('INSERT INTO "authentication_user"', 'UPDATE "authentication_user"')
+            )
+        ]
+        # Rows with a primary key are first tried as an update.
+        self.assertEqual(written, ['UPDATE', 'INSERT'] * 7)
+
+        user = models.User.objects.get(email='foo@example.com')
+        self.assertTrue(user.check_password('supersecret'))
+        self.assertEqual(user.email_normalized, 'foo@example.com')
@@ -0,0 +1,125 @@
+from unittest import mock
+
+from django.contrib.auth.signals import user_logged_in
+from django.db import OperationalError
+from django.db.models import QuerySet
+from django.test import TestCase
+
+from authentication import audit, models
+from authentication.audit import event_queue, login_queue
+from authentication.tokens import encode_uid, password_reset_token_generator
+
+Kind = models.AuthEvent.Kind
+
+
+class BufferedEvents(TestCase):
+    fixtures = ['user']
+
+    def setUp(self) -> None:
+        # Flush by hand, the test transaction is invisible to other threads.
+        for queue in (event_queue(), login_queue()):
+            self.addCleanup(setattr, queue, 'interval', queue.interval)
+            queue.interval = 3600
+            queue.flush()
+            # Within the test transaction, nothing leaks into the next test.
+            self.addCleanup(queue.flush)
+        self.user = models.User.objects.get(email='foo@example.com')
+
+    def sign_in(self, password='supersecret'):
+        return self.client.post(
+            '/account/sign-in/', {'email': self.user.email, 'password': password}
+        )
+
+    def test_last_login_is_written_once_per_flush(self):
+        """
+        Ensure sign ins don't write last_login in the request, and repeated
+        ones are coalesced.
+        """
+        self.assertFalse(user_logged_in.disconnect(dispatch_uid='update_last_login'))
+        self.sign_in()
+        response = self.sign_in()
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_login)
+        self.assertFalse(models.AuthEvent.objects.exists())
+
+        # One statement each, in a savepoint of the test transaction.
+        with self.assertNumQueries(3):
+            login_queue().flush()
+        with self.assertNumQueries(3):
+            event_queue().flush()
+
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+        events = models.AuthEvent.objects.filter(user_id=self.user.pk)
+        first, second = events.order_by('created_at')
+        self.assertEqual((first.kind, second.kind), (Kind.LOGIN, Kind.LOGIN))
+        self.assertEqual(first.ip, '127.0.0.1')
+        # The latest sign in wins.
+        self.assertGreater(self.user.last_login, first.created_at)
+
+    def test_failures_sign_outs_and_resets_are_recorded(self):
+        """
+        Ensure every kind of event ends up in the audit trail.
+        """
+        self.assertEqual(self.sign_in('wrong password').status_code, 404)
+        self.sign_in()
+        self.client.post('/account/sign-out/')
+        token = password_reset_token_generator.make_token(self.user)
+        response = self.client.put(
+            f'/account/password/reset/{encode_uid(self.user)}/{token}/',
+            {'password': 'new supersecret', 'password2': 'new supersecret'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 204)
+
+        event_queue().flush()
+        self.assertEqual(
+            list(
+                models.AuthEvent.objects.order_by('created_at').values_list(
+                    'kind', 'user_id', 'email'
+                )
+            ),
+            [
+                (Kind.LOGIN_FAILED, None, self.user.email),
+                (Kind.LOGIN, self.user.pk, self.user.email),
+                (Kind.LOGOUT, self.user.pk, self.user.email),
+                (Kind.PASSWORD_RESET, self.user.pk, self.user.email),
+            ],
+        )
+
+    def test_rejected_rows_dont_drop_the_batch(self):
+        """
+        Ensure oversized emails are truncated and rows the database rejects
+        are dropped alone.
+        """
+        audit.record(Kind.LOGIN_FAILED, email='a' * 300 + '@example.com')
+        event_queue().put(models.AuthEvent(kind=Kind.LOGIN, created_at=None))
+        audit.record(Kind.LOGOUT, user=self.user)
+
+        with self.assertLogs('authentication.audit', 'ERROR'):
+            event_queue().flush()
+
+        events = models.AuthEvent.objects.order_by('created_at')
+        self.assertEqual(
+            [event.kind for event in events], [Kind.LOGIN_FAILED, Kind.LOGOUT]
+        )
+        self.assertEqual(len(events[0].email), 254)
+        self.assertEqual(len(event_queue()), 0)
+
+    def test_failed_last_login_writes_are_retried(self):
+        """
+        Ensure last_login failures neither lose events nor their own writes.
+        """
+        self.sign_in()
+        with mock.patch.object(
+            QuerySet, 'bulk_update', side_effect=OperationalError
+        ), self.assertLogs('utils.background', 'ERROR'):
+            login_queue().flush()
+        event_queue().flush()
+
+        self.assertTrue(models.AuthEvent.objects.filter(kind=Kind.LOGIN).exists())
+        self.assertEqual(len(login_queue()), 1)
+        login_queue().flush()
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
@@ -0,0 +1,100 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from authentication import models
+from authentication.backends import AuthOutcome, EmailBackend, _email_cache_key
+from authentication.bulk import bulk_insert_users
+
+
+class AuthenticateOutcome(TestCase):
+    fixtures = ['user']
+
+    def test_outcomes_use_a_single_query(self):
+        """
+        Ensure every outcome is resolved with one lookup.
+        """
+        cases = [
+            ('foo@example.com', 'supersecret', AuthOutcome.OK),
+            ('foo@example.com', 'littlesecret', AuthOutcome.UNKNOWN),
+            ('unverified@example.com', 'supersecret', AuthOutcome.UNVERIFIED),
+            ('no.register@example.com', 'supersecret', AuthOutcome.UNKNOWN),
+        ]
+        for email, password, expected in cases:
+            with self.subTest(email=email), self.assertNumQueries(1):
+                outcome, _ = EmailBackend().authenticate_outcome(
+                    None, email=email, password=password
+                )
+            self.assertEqual(outcome, expected)
+
+    def test_inactive_user(self):
+        """
+        Ensure inactive users get their own outcome.
+        """
+        models.User.objects.filter(email='foo@example.com').update(is_active=False)
+
+        outcome, _ = EmailBackend().authenticate_outcome(
+            None, email='foo@example.com', password='supersecret'
+        )
+        self.assertEqual(outcome, AuthOutcome.INACTIVE)
+
+
+@override_settings(AUTH_EMAIL_LOOKUP_CACHE='default')
+class CachedEmailLookup(TestCase):
+    fixtures = ['user']
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_repeated_failures_skip_the_database(self):
+        """
+        Ensure failed sign ins are served from the cache after the first one.
+        """
+        data = {'email': 'no.register@example.com', 'password': 'supersecret'}
+        self.client.post('/account/sign-in/', data)
+
+        with self.assertNumQueries(0):
+            response = self.client.post('/account/sign-in/', data)
+        self.assertEqual(response.status_code, 404)
+
+    def test_cache_is_invalidated_on_save(self):
+        """
+        Ensure a cached miss doesn't hide a newly created account.
+        """
+        backend = EmailBackend()
+        credentials = {'email': 'new@example.com', 'password': 'supersecret'}
+        backend.authenticate_outcome(None, **credentials)
+
+        models.User.objects.create_user(email_verified=True, **credentials)
+
+        outcome, _ = backend.authenticate_outcome(None, **credentials)
+        self.assertEqual(outcome, AuthOutcome.OK)
+
+    def test_cache_holds_no_user_data(self):
+        """
+        Ensure only the user id is cached, so `.update()`s are never hidden.
+        """
+        backend = EmailBackend()
+        credentials = {'email': 'foo@example.com', 'password': 'supersecret'}
+        backend.authenticate_outcome(None, **credentials)
+
+        user = models.User.objects.get(email='foo@example.com')
+        self.assertEqual(cache.get(_email_cache_key(user.email)), user.pk)
+        models.User.objects.filter(pk=user.pk).update(is_active=False)
+
+        outcome, _ = backend.authenticate_outcome(None, **credentials)
+        self.assertEqual(outcome, AuthOutcome.INACTIVE)
+
+    def test_cache_is_invalidated_on_bulk_insert(self):
+        """
+        Ensure a cached miss doesn't hide an imported account.
+        """
+        backend = EmailBackend()
+        credentials = {'email': 'new@example.com', 'password': 'supersecret'}
+        backend.authenticate_outcome(None, **credentials)
+
+        user = models.User(email='new@example.com', email_verified=True)
+        user.set_password('supersecret')
+        bulk_insert_users([user])
+
+        outcome, _ = backend.authenticate_outcome(None, **credentials)
+        self.assertEqual(outcome, AuthOutcome.OK)
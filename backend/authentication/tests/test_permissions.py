@@ -0,0 +1,120 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from authentication import models
+
+
+def fresh(user):
+    # A new instance, as the next request would load.
+    return models.User.objects.get(pk=user.pk)
+
+
+@override_settings(AUTH_PERMISSION_CACHE='default')
+class PermissionCache(TestCase):
+    fixtures = ['user']
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = models.User.objects.get(email='foo@example.com')
+        self.group = Group.objects.create(name='support')
+        self.view = Permission.objects.get(codename='view_user')
+        self.change = Permission.objects.get(codename='change_user')
+
+    def test_permissions_are_shared_across_requests(self):
+        """
+        Ensure a later request checks permissions without queries.
+        """
+        self.group.permissions.add(self.view)
+        self.user.groups.add(self.group)
+        self.user.user_permissions.add(self.change)
+
+        self.assertEqual(
+            fresh(self.user).get_all_permissions(),
+            {'authentication.view_user', 'authentication.change_user'},
+        )
+        user = fresh(self.user)
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm('authentication.view_user'))
+            self.assertEqual(
+                user.get_group_permissions(), {'authentication.view_user'}
+            )
+
+        admin = models.User.objects.get(email='admin@example.com')
+        self.assertTrue(fresh(admin).has_perm('authentication.delete_user'))
+
+    def test_changes_invalidate_cached_permissions(self):
+        """
+        Ensure every kind of m2m change, from either side, is seen.
+        """
+        self.group.permissions.add(self.view)
+        self.user.groups.add(self.group)
+        perm = 'authentication.view_user'
+        self.assertTrue(fresh(self.user).has_perm(perm))
+
+        changes = [
+            (lambda: self.group.permissions.remove(self.view), False),
+            (lambda: self.view.group_set.add(self.group), True),
+            (lambda: self.group.user_set.clear(), False),
+            (lambda: self.group.user_set.add(self.user), True),
+            (lambda: self.view.group_set.clear(), False),
+            (lambda: self.view.user_set.add(self.user), True),
+            (lambda: self.user.user_permissions.clear(), False),
+            (lambda: self.user.user_permissions.add(self.view), True),
+            (lambda: self.view.user_set.remove(self.user), False),
+        ]
+        for change, expected in changes:
+            change()
+            self.assertIs(fresh(self.user).has_perm(perm), expected)
+
+        self.group.permissions.add(self.change)
+        self.assertTrue(fresh(self.user).has_perm('authentication.change_user'))
+        self.group.delete()
+        self.assertFalse(fresh(self.user).has_perm('authentication.change_user'))
+
+
+class WithPerm(TestCase):
+    fixtures = ['user']
+
+    def test_with_perm_matches_model_backend(self):
+        """
+        Ensure the indexed lookup returns the users of the join based one.
+        """
+        view = Permission.objects.get(codename='view_user')
+        change = Permission.objects.get(codename='change_user')
+        group = Group.objects.create(name='support')
+        group.permissions.add(view)
+        group.user_set.add(*models.User.objects.filter(pk__in=['2', '3']))
+        models.User.objects.get(pk='4').user_permissions.add(view, change)
+        models.User.objects.filter(pk='3').update(is_active=False)
+
+        cases = [
+            ('authentication.view_user', {}),
+            (view, {'include_superusers': False}),
+            ('authentication.change_user', {'is_active': None}),
+            ('authentication.view_user', {'is_active': False}),
+        ]
+        for perm, options in cases:
+            with self.subTest(perm=perm, **options):
+                self.assertQuerySetEqual(
+                    models.User.objects.with_perm(perm, **options),
+                    ModelBackend().with_perm(perm, **options),
+                    ordered=False,
+                )
+
+        group.delete()
+        self.assertEqual(
+            set(models.User.objects.with_perm(view, include_superusers=False)),
+            {models.User.objects.get(pk='4')},
+        )
+
+    def test_with_perm_reads_the_index(self):
+        """
+        Ensure `with_perm` doesn't join groups.
+        """
+        sql = str(models.User.objects.with_perm('authentication.view_user').query)
+
+        self.assertIn('effectivepermission', sql)
+        self.assertNotIn('auth_group', sql)
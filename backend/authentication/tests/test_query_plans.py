@@ -0,0 +1,47 @@
+from django.db import connection
+from django.test import TestCase
+
+from authentication.models import User
+from authentication.sharding import users_by_email
+
+
+class QueryPlans(TestCase):
+    fixtures = ['user']
+
+    def setUp(self) -> None:
+        if connection.vendor == 'postgresql':
+            # Tiny test tables are cheaper to scan, ask for the index plan.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        if connection.vendor == 'postgresql':
+            self.assertNotIn('Seq Scan', plan)
+            self.assertNotIn('Sort', plan)
+            self.assertIn('Index', plan)
+        else:
+            self.assertRegex(plan, r'USING (COVERING )?INDEX')
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_email_lookups_use_an_index(self):
+        """
+        Ensure email lookups, whatever the case, search an index.
+        """
+        self.assertUsesIndex(users_by_email('Foo@Example.com'))
+        self.assertUsesIndex(
+            User.objects.filter(email_normalized='foo@example.com', email_verified=True)
+        )
+
+    def test_ordered_pages_use_an_index(self):
+        """
+        Ensure the default ordering and keyset pages don't sort.
+        """
+        first = User.objects.order_by('date_joined', 'id').first()
+
+        self.assertUsesIndex(User.objects.all()[:20])
+        self.assertUsesIndex(
+            User.objects.order_by('date_joined', 'id').filter(
+                date_joined__gte=first.date_joined
+            )[:20]
+        )
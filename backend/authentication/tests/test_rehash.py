@@ -0,0 +1,73 @@
+from django.contrib.auth import HASH_SESSION_KEY, get_user
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase
+
+from authentication import models
+from authentication.hashing import get_rehash_executor, verify_password
+from authentication.rehash import rehash_queue
+
+
+class PasswordUpgrade(TestCase):
+    def setUp(self) -> None:
+        self.outdated = make_password('supersecret', hasher='pbkdf2_sha1')
+        self.user = models.User.objects.create(
+            email='foo@example.com', email_verified=True, password=self.outdated
+        )
+        queue = rehash_queue()
+        self.addCleanup(setattr, queue, 'interval', queue.interval)
+        queue.interval = 3600
+        queue.flush()
+
+    def sign_in(self):
+        response = self.client.post(
+            '/account/sign-in/', {'email': self.user.email, 'password': 'supersecret'}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def rehash(self):
+        # The single hashing thread runs the upgrades queued before this.
+        get_rehash_executor().submit(int).result()
+        rehash_queue().flush()
+
+    def test_sign_in_upgrades_the_hash_and_keeps_the_session(self):
+        """
+        Ensure the upgraded hash is stored in the background without signing
+        the session out.
+        """
+        self.sign_in()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, self.outdated)
+
+        self.rehash()
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+        self.assertTrue(self.user.check_password('supersecret'))
+        self.assertEqual(get_user(self.client), self.user)
+
+    def test_raw_password_is_not_kept(self):
+        """
+        Ensure only the future of the new hash is left on the user.
+        """
+        verify_password(self.user, 'supersecret')
+
+        self.assertNotIn('supersecret', vars(self.user).values())
+        new_password = self.user._upgraded_password.result()
+        self.assertTrue(new_password.startswith('pbkdf2_sha256$'))
+
+    def test_password_changed_meanwhile_drops_the_upgrade(self):
+        """
+        Ensure a password set meanwhile is kept and the session doesn't
+        follow it.
+        """
+        self.sign_in()
+        session_hash = self.client.session[HASH_SESSION_KEY]
+        current = make_password('changed')
+        models.User.objects.filter(pk=self.user.pk).update(password=current)
+
+        self.rehash()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, current)
+        self.assertEqual(self.client.session[HASH_SESSION_KEY], session_hash)
+        self.assertFalse(get_user(self.client).is_authenticated)
@@ -0,0 +1,215 @@
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from authentication.backends import EmailBackend, get_user_by_email
+from authentication.models import (
+    EffectivePermission,
+    ShardBucket,
+    User,
+    UserDirectory,
+)
+from authentication.sharding import (
+    _bucket_cache,
+    bucket_map,
+    email_shard,
+    pk_shard,
+    users_in_bucket,
+)
+
+
+@override_settings(USER_SHARDS=['default'])
+class Directory(TestCase):
+    def setUp(self) -> None:
+        self.addCleanup(_bucket_cache().clear)
+        self.user = User.objects.create_user(
+            email='test@example.com', email_verified=True, password='supersecret'
+        )
+
+    def test_directory_follows_users(self):
+        """
+        Ensure created, renamed and deleted users are kept in the directory.
+        """
+        self.assertEqual(UserDirectory.objects.get().user_id, self.user.pk)
+
+        self.user.email = 'new@example.com'
+        self.user.save()
+        self.assertEqual(UserDirectory.objects.get().email, 'new@example.com')
+        self.assertEqual(get_user_by_email('new@example.com'), self.user)
+        self.assertIsNone(email_shard('test@example.com'))
+
+        self.user.delete()
+        self.assertFalse(UserDirectory.objects.exists())
+
+    def test_buckets_are_mapped_to_databases(self):
+        """
+        Ensure ids are routed by their first character.
+        """
+        ShardBucket.objects.create(bucket=self.user.pk[0], database='elsewhere')
+        bucket_map(cached=False)
+
+        self.assertEqual(pk_shard(self.user.pk), 'elsewhere')
+        self.assertEqual(pk_shard('!' + self.user.pk[1:]), 'default')
+
+    def test_sign_up_rejects_a_used_email(self):
+        """
+        Ensure emails stay unique across shards.
+        """
+        data = {
+            'first_name': 'First',
+            'last_name': 'Last',
+            'email': 'test@example.com',
+            'password': 'supersecret',
+            'password2': 'supersecret',
+            'agreement': True,
+        }
+        response = self.client.post('/account/sign-up/', data)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.json())
+
+
+@skipUnless('shard_1' in settings.DATABASES, 'Set USER_SHARD_URLS to test moves.')
+class Rebalance(TestCase):
+    databases = '__all__'
+
+    def test_bucket_moves_to_another_shard(self):
+        """
+        Ensure a moved bucket's users are served from the target shard.
+        """
+        self.addCleanup(_bucket_cache().clear)
+        user = User.objects.create_user(
+            email='test@example.com', email_verified=True, password='supersecret'
+        )
+        bucket_map(cached=False)
+
+        call_command(
+            'rebalance_shards',
+            bucket=[user.pk[0]],
+            target='shard_1',
+            settle=0,
+            stdout=StringIO(),
+        )
+        bucket_map(cached=False)
+
+        self.assertEqual(pk_shard(user.pk), 'shard_1')
+        self.assertFalse(User.objects.using('default').filter(pk=user.pk).exists())
+        self.assertEqual(get_user_by_email('test@example.com').pk, user.pk)
+        response = self.client.post(
+            '/account/sign-in/',
+            {'email': 'test@example.com', 'password': 'supersecret'},
+        )
+        self.assertEqual(response.status_code, 200)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics/').status_code, 200)
+
+    def test_writes_during_the_move_are_replayed(self):
+        """
+        Ensure updates, deletions and group changes made on the source by
+        processes yet to see the move are replayed, unless the target
+        changed the same user since.
+        """
+        self.addCleanup(_bucket_cache().clear)
+        ids = ['A' + str(i) * 10 for i in range(4)]
+        users = [
+            User.objects.create_user(
+                id=pk, email=f'{pk}@example.com', password='supersecret'
+            )
+            for pk in ids
+        ]
+        group = Group.objects.create(name='staff')
+        Group.objects.using('shard_1').create(pk=group.pk, name='staff')
+        bucket_map(cached=False)
+
+        def writes_meanwhile(seconds):
+            # As done by processes still routing the bucket to `default`.
+            with mock.patch('authentication.sharding.bucket_map', return_value={}):
+                source = User.objects.using('default')
+                source.get(pk=ids[0]).groups.add(group)
+                source.filter(pk=ids[1]).delete()
+                source.filter(pk__in=ids[2:]).update(first_name='source')
+            User.objects.using('shard_1').filter(pk=ids[3]).update(first_name='target')
+
+        with mock.patch('time.sleep', writes_meanwhile):
+            call_command(
+                'rebalance_shards', bucket=['A'], target='shard_1', stdout=StringIO()
+            )
+
+        moved = User.objects.using('shard_1')
+        self.assertEqual(list(moved.get(pk=ids[0]).groups.all()), [group])
+        self.assertFalse(moved.filter(pk=ids[1]).exists())
+        self.assertEqual(moved.get(pk=ids[2]).first_name, 'source')
+        self.assertEqual(moved.get(pk=ids[3]).first_name, 'target')
+        self.assertFalse(users_in_bucket('A', 'default').exists())
+        self.assertEqual(
+            set(UserDirectory.objects.values_list('user_id', flat=True)),
+            {users[0].pk, users[2].pk, users[3].pk},
+        )
+
+    def test_staff_list_users_of_every_shard(self):
+        """
+        Ensure the users list merges the shards' pages and finds moved users.
+        """
+        self.addCleanup(_bucket_cache().clear)
+        admin = User.objects.create_user(
+            id='C' * 11, email='admin@example.com', password=None, is_staff=True
+        )
+        for pk in ['B' * 11, 'D' * 11]:
+            User.objects.create_user(id=pk, email=f'{pk}@example.com', password=None)
+        bucket_map(cached=False)
+        call_command(
+            'rebalance_shards',
+            bucket=['B'],
+            target='shard_1',
+            settle=0,
+            stdout=StringIO(),
+        )
+        self.client.force_login(admin)
+
+        emails, url = [], '/account/users/?page_size=1'
+        while url:
+            response = self.client.get(url)
+            emails += [user['email'] for user in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(
+            emails,
+            ['admin@example.com', 'BBBBBBBBBBB@example.com', 'DDDDDDDDDDD@example.com'],
+        )
+        response = self.client.get('/account/users/BBBBBBBBBBB/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_effective_permissions_follow_their_users(self):
+        """
+        Ensure permissions are indexed on the shard of their user, moves
+        included.
+        """
+        self.addCleanup(_bucket_cache().clear)
+        permission = Permission.objects.get(codename='view_user')
+        user = User.objects.create_user(
+            id='E' * 11, email='test@example.com', password=None
+        )
+        user.user_permissions.add(permission)
+        bucket_map(cached=False)
+        call_command(
+            'rebalance_shards',
+            bucket=['E'],
+            target='shard_1',
+            settle=0,
+            stdout=StringIO(),
+        )
+
+        index = EffectivePermission.objects.filter(user_id=user.pk)
+        self.assertFalse(index.using('default').exists())
+        self.assertTrue(index.using('shard_1').exists())
+        moved = User.objects.using('shard_1').get(pk=user.pk)
+        moved.user_permissions.remove(permission.pk)
+        self.assertFalse(index.using('shard_1').exists())
+        moved.user_permissions.add(permission.pk)
+
+        users = EmailBackend().with_perm('authentication.view_user')
+        self.assertEqual(list(users.using('shard_1')), [moved])
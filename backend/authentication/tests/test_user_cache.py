@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from authentication import models, user_cache
+
+URL = '/account/users/?fields=id&page_size=1'
+
+
+class UserCache(TestCase):
+    fixtures = ['user']
+
+    def setUp(self) -> None:
+        user_cache.local_cache().clear()
+        self.addCleanup(user_cache.local_cache().clear)
+        self.admin = models.User.objects.get(email='admin@example.com')
+        self.client.force_login(self.admin)
+
+    def user_queries(self) -> int:
+        """
+        Request the users list, returning how many times the session user was
+        loaded.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(URL)
+        self.assertEqual(response.status_code, 200)
+        return sum(
+            '"authentication_user"."id" =' in query['sql']
+            for query in context.captured_queries
+        )
+
+    def test_session_user_is_cached(self):
+        """
+        Ensure the session user is loaded once, then served from the cache.
+        """
+        self.assertEqual(self.user_queries(), 1)
+        self.assertEqual(self.user_queries(), 0)
+
+        # Logging in again only bumps last_login.
+        self.client.force_login(self.admin)
+        self.assertEqual(self.user_queries(), 0)
+
+    @override_settings(AUTH_USER_CACHE='default')
+    def test_shared_cache(self):
+        """
+        Ensure processes with an empty local cache share the loaded user.
+        """
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.assertEqual(self.user_queries(), 1)
+        user_cache.local_cache().clear()
+        self.assertEqual(self.user_queries(), 0)
+
+    def test_changes_invalidate_cached_user(self):
+        """
+        Ensure saved changes are seen by the next request.
+        """
+        self.user_queries()
+        self.admin.is_staff = False
+        self.admin.save()
+        self.assertEqual(self.client.get(URL).status_code, 403)
+
+    def test_password_change_ends_other_sessions(self):
+        """
+        Ensure a cached user doesn't outlive the password of the session.
+        """
+        self.user_queries()
+        other = self.client_class()
+        other.force_login(self.admin)
+
+        self.admin.set_password('new password')
+        self.admin.save()
+        self.client.force_login(self.admin)
+        self.assertEqual(self.user_queries(), 1)
+        self.assertEqual(other.get(URL).status_code, 401)
+
+    def test_stale_fingerprint_is_a_miss(self):
+        """
+        Ensure an entry is only served to sessions carrying its hash.
+        """
+        user_cache.cache_user(self.admin)
+        self.assertIsNotNone(
+            user_cache.cached_user(self.admin.pk, self.admin.get_session_auth_hash())
+        )
+        self.assertIsNone(user_cache.cached_user(self.admin.pk, 'other'))
+
+    def test_updates_invalidate_cached_user(self):
+        """
+        Ensure `.update()`, which sends no signals, is seen by the next request.
+        """
+        self.user_queries()
+        models.User.objects.filter(pk=self.admin.pk).update(is_staff=False)
+        self.assertEqual(self.client.get(URL).status_code, 403)
+
+    def test_password_hash_is_not_cached(self):
+        """
+        Ensure entries leave the password hash out, loaded when it's read.
+        """
+        user_cache.cache_user(self.admin)
+        entry = user_cache.local_cache().get(f'auth:user:{self.admin.pk}')
+        self.assertNotIn(self.admin.password, entry[2])
+
+        user = user_cache.cached_user(self.admin.pk, self.admin.get_session_auth_hash())
+        self.assertEqual(user.get_deferred_fields(), {'password'})
+        self.assertEqual(user.password, self.admin.password)
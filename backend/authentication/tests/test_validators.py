@@ -0,0 +1,105 @@
+import hashlib
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from authentication.validators import HEADER, get_breached_passwords
+
+BREACHED = ['password1', 'qwerty123', 'letmein!', 'dragon2000']
+
+
+def sha1(password):
+    return hashlib.sha1(password.encode()).hexdigest().upper()
+
+
+class BreachedPasswords(SimpleTestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = Path(directory.name)
+        self.output = self.dir / 'breached.bin'
+
+        dump = self.dir / 'dump.txt'
+        lines = [f'{sha1(password)}:{i + 2}' for i, password in enumerate(BREACHED)]
+        lines += [f'{sha1("seen once")}:1', 'not a hash', lines[0]]
+        dump.write_text('\n'.join(reversed(lines)))
+        self.dump = dump
+
+    def build(self, *dumps, **options):
+        call_command(
+            'build_breached_passwords',
+            *(dumps or [self.dump]),
+            output=self.output,
+            stdout=StringIO(),
+            **options,
+        )
+        return get_breached_passwords(self.output)
+
+    def test_file_is_sorted_and_compact(self):
+        """
+        Ensure the file keeps distinct sorted prefixes of the kept hashes.
+        """
+        corpus = self.build(min_count=2, run_size=2)
+
+        self.assertEqual(len(corpus), len(BREACHED))
+        self.assertEqual(self.output.stat().st_size, HEADER.size + 8 * len(BREACHED))
+        records = self.output.read_bytes()[HEADER.size :]
+        keys = [records[i : i + 8] for i in range(0, len(records), 8)]
+        self.assertEqual(keys, sorted(set(keys)))
+
+    def test_breached_passwords_are_found(self):
+        """
+        Ensure every kept password is found and others are not.
+        """
+        corpus = self.build(min_count=2)
+
+        for password in BREACHED:
+            self.assertIn(password, corpus)
+        for password in ('seen once', 'correct horse battery staple', ''):
+            self.assertNotIn(password, corpus)
+
+        plain = self.dir / 'plain.txt'
+        plain.write_text('seen once\nhunter2\n')
+        corpus = self.build(plain, plaintext=True, width=4)
+        self.assertIn('hunter2', corpus)
+        self.assertNotIn('password1', corpus)
+
+    def test_validator_rejects_breached_passwords(self):
+        """
+        Ensure the validator rejects breached passwords, and sees a rebuilt file.
+        """
+        self.build()
+        validators = [
+            {
+                'NAME': 'authentication.validators.BreachedPasswordValidator',
+                'OPTIONS': {'path': self.output},
+            }
+        ]
+
+        with override_settings(AUTH_PASSWORD_VALIDATORS=validators):
+            with self.assertRaises(ValidationError) as raised:
+                validate_password('qwerty123')
+            self.assertEqual(raised.exception.error_list[0].code, 'password_breached')
+            validate_password('correct horse battery staple')
+
+            self.dump.write_text(sha1('correct horse battery staple'))
+            self.build()
+            with self.assertRaises(ValidationError):
+                validate_password('correct horse battery staple')
+
+    def test_rebuilt_file_closes_the_old_map(self):
+        """
+        Ensure the mapping of a replaced file is closed once it's remapped.
+        """
+        old = self.build()
+        self.dump.write_text(sha1('correct horse battery staple'))
+        new = self.build()
+
+        self.assertIsNot(new, old)
+        self.assertTrue(old.map.closed)
+        self.assertIn('correct horse battery staple', new)
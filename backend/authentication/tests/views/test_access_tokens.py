@@ -0,0 +1,162 @@
+from django.contrib.auth.hashers import make_password
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
+
+from authentication import access_tokens, models, user_cache, views
+from authentication.hashing import get_rehash_executor
+from authentication.rehash import rehash_queue
+
+view = views.AuthViewSet(basename='auth', request=None)
+
+USERS_URL = '/account/users/?fields=id&page_size=1'
+
+
+class AccessTokens(APITestCase):
+    fixtures = ['user']
+
+    sign_in_url = view.reverse_action(view.sign_in.url_name)
+    refresh_url = view.reverse_action(view.refresh_token.url_name)
+    revoke_url = view.reverse_action(view.revoke_token.url_name)
+    sign_out_url = view.reverse_action(view.sign_out.url_name)
+
+    def setUp(self) -> None:
+        for cache in (access_tokens.denylist, user_cache.local_cache()):
+            cache.clear()
+            self.addCleanup(cache.clear)
+
+    def sign_in(self) -> dict:
+        data = {'email': 'admin@example.com', 'password': 'adminadmin', 'tokens': True}
+        response = self.client.post(self.sign_in_url, data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], 'admin@example.com')
+        self.assertNotIn('sessionid', response.cookies)
+        return response.data['tokens']
+
+    def get_users(self, access: str) -> int:
+        client = APIClient(enforce_csrf_checks=True)
+        return client.get(USERS_URL, HTTP_AUTHORIZATION=f'Bearer {access}').status_code
+
+    def test_access_token_authenticates_without_queries(self):
+        """
+        Ensure access tokens are checked in process once the user is cached.
+        """
+        tokens = self.sign_in()
+        self.assertEqual(self.get_users(tokens['access']), status.HTTP_200_OK)
+
+        header = f'Bearer {tokens["access"]}'
+        request = Request(APIRequestFactory().get('/', HTTP_AUTHORIZATION=header))
+        with self.assertNumQueries(0):
+            user, claims = access_tokens.AccessTokenAuthentication().authenticate(
+                request
+            )
+        self.assertEqual(user.email, 'admin@example.com')
+        self.assertEqual(claims['u'], user.pk)
+
+    def test_invalid_tokens_are_rejected(self):
+        """
+        Ensure tampered, expired and refresh tokens don't authenticate.
+        """
+        tokens = self.sign_in()
+        for token in [tokens['access'][:-1], tokens['refresh'], 'foo']:
+            with self.subTest(token=token):
+                self.assertEqual(self.get_users(token), status.HTTP_401_UNAUTHORIZED)
+
+        with override_settings(ACCESS_TOKEN_LIFETIME=-1):
+            self.assertEqual(
+                self.get_users(tokens['access']), status.HTTP_401_UNAUTHORIZED
+            )
+
+    def test_refresh_rotates_tokens(self):
+        """
+        Ensure refresh tokens are single use, and reusing one ends its family.
+        """
+        tokens = self.sign_in()
+        response = self.client.post(self.refresh_url, {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        refreshed = response.data
+        self.assertEqual(self.get_users(refreshed['access']), status.HTTP_200_OK)
+
+        response = self.client.post(self.refresh_url, {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(
+            self.get_users(refreshed['access']), status.HTTP_401_UNAUTHORIZED
+        )
+        response = self.client.post(self.refresh_url, {'refresh': refreshed['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoke_ends_the_family(self):
+        """
+        Ensure revoking a refresh token also rejects its access tokens.
+        """
+        tokens, other = self.sign_in(), self.sign_in()
+        response = self.client.post(self.revoke_url, {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertEqual(self.get_users(tokens['access']), status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post(self.refresh_url, {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.get_users(other['access']), status.HTTP_200_OK)
+
+    def test_other_processes_see_revocations(self):
+        """
+        Ensure the denylist is reloaded from the database.
+        """
+        tokens = self.sign_in()
+        self.assertEqual(self.get_users(tokens['access']), status.HTTP_200_OK)
+        self.client.post(self.revoke_url, {'refresh': tokens['refresh']})
+
+        # As a process that didn't revoke it and loaded the denylist before.
+        access_tokens.denylist.ids = frozenset()
+        self.assertEqual(self.get_users(tokens['access']), status.HTTP_200_OK)
+        with override_settings(ACCESS_TOKEN_DENYLIST_INTERVAL=0):
+            self.assertEqual(
+                self.get_users(tokens['access']), status.HTTP_401_UNAUTHORIZED
+            )
+
+    def test_sign_out_revokes_the_tokens(self):
+        """
+        Ensure signing out with an access token, without CSRF token, revokes it.
+        """
+        tokens = self.sign_in()
+        client = APIClient(enforce_csrf_checks=True)
+        response = client.post(
+            self.sign_out_url, HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.get_users(tokens['access']), status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_invalidates_tokens(self):
+        """
+        Ensure tokens don't outlive the password they were issued with.
+        """
+        tokens = self.sign_in()
+        self.assertEqual(self.get_users(tokens['access']), status.HTTP_200_OK)
+
+        user = models.User.objects.get(email='admin@example.com')
+        user.set_password('new password')
+        user.save()
+        self.assertEqual(self.get_users(tokens['access']), status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post(self.refresh_url, {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_sign_in_keeps_an_outdated_password_hash(self):
+        """
+        Ensure a token sign in leaves an outdated hash to a session sign in,
+        upgrading it would revoke the tokens.
+        """
+        outdated = make_password('adminadmin', hasher='pbkdf2_sha1')
+        models.User.objects.filter(email='admin@example.com').update(
+            password=outdated
+        )
+
+        tokens = self.sign_in()
+        get_rehash_executor().submit(int).result()
+        rehash_queue().flush()
+
+        user = models.User.objects.get(email='admin@example.com')
+        self.assertEqual(user.password, outdated)
+        self.assertEqual(self.get_users(tokens['access']), status.HTTP_200_OK)
+        response = self.client.post(self.refresh_url, {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
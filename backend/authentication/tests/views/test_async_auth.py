@@ -0,0 +1,65 @@
+from django.test import TestCase, override_settings
+from django.urls import include, path
+from rest_framework import status
+from rest_framework.routers import SimpleRouter
+
+from authentication import models, views
+
+router = SimpleRouter()
+router.register('', views.AsyncAuthViewSet, basename='auth')
+router.register('', views.AsyncAuthTokenViewset, basename='token')
+
+urlpatterns = [path('account/', include(router.urls))]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncSignIn(TestCase):
+    fixtures = ['user']
+
+    async def test_user_can_sign_in(self):
+        """
+        Ensure user can sign in through the async viewset.
+        """
+        data = {'email': 'foo@example.com', 'password': 'supersecret'}
+        response = await self.async_client.post('/account/sign-in/', data)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    async def test_user_cannot_sign_in_with_wrong_creds(self):
+        """
+        Ensure wrong creds are rejected through the async viewset.
+        """
+        data = {'email': 'foo@example.com', 'password': 'littlesecret'}
+        response = await self.async_client.post('/account/sign-in/', data)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_when_user_sign_in_with_unverified_email(self):
+        """
+        Ensure unverified users are told to confirm their email.
+        """
+        data = {'email': 'unverified@example.com', 'password': 'supersecret'}
+        response = await self.async_client.post('/account/sign-in/', data)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncSignUp(TestCase):
+    async def test_user_can_sign_up(self):
+        """
+        Ensure user can sign up through the async viewset.
+        """
+        data = {
+            'first_name': 'foo',
+            'last_name': 'qux',
+            'email': 'example@example.com',
+            'password': 'supersecret',
+            'password2': 'supersecret',
+            'agreement': True,
+        }
+        response = await self.async_client.post('/account/sign-up/', data)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = await models.User.objects.aget(email='example@example.com')
+        self.assertTrue(user.check_password('supersecret'))
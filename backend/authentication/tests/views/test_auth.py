@@ -74,6 +74,25 @@ class SignUp(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_emails_differing_by_case_are_one_account(self):
+        """
+        Ensure user can't sign up again with a near-duplicate email.
+        """
+
+        data = {
+            'first_name': 'foo',
+            'last_name': 'qux',
+            'email': 'example@example.com',
+            'password': 'supersecret',
+            'password2': 'supersecret',
+            'agreement': True,
+        }
+        self.client.post(self.url, data)
+        response = self.client.post(self.url, {**data, 'email': ' EXAMPLE@example.com'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', response.json())
+
 
 class SingIn(APITestCase):
     fixtures = ['user']
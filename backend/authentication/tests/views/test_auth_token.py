@@ -73,6 +73,31 @@ class ConfirmEmail(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertFalse(user.email_verified)
 
+    def test_user_can_resend_confirmation_email(self):
+        """
+        Ensure user can ask for a new confirmation email.
+        """
+        url = view.reverse_action(view.resend_confirmation_email.url_name)
+        response = self.client.post(url, {'email': 'test@example.com'})
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[1].subject, 'Please, confirm your email')
+
+    def test_invalid_link_does_not_query_database(self):
+        """
+        Ensure forged links are rejected before looking the user up.
+        """
+        *_, uidb64, token, _ = self.body.split('/')
+        for link in [
+            self.body.replace(token, 'random'),
+            self.body.replace(token, token[:-1] + ('0' if token[-1] != '0' else '1')),
+            self.body.replace(uidb64, 'cmFuZG9t'),
+        ]:
+            with self.assertNumQueries(0):
+                response = self.client.get(link)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class ResetPassword(APITestCase):
     def setUp(self) -> None:
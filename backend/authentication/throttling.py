@@ -0,0 +1,39 @@
+from utils.models import normalize_email
+from utils.throttling import SlidingWindowThrottle
+
+
+class ClientIPThrottle(SlidingWindowThrottle):
+    """Throttle by client IP address."""
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class TargetEmailThrottle(SlidingWindowThrottle):
+    """
+    Throttle by the email the request targets, whatever the client address:
+    clients are limited by `ClientIPThrottle`.
+    """
+
+    def get_key(self, request, view):
+        data = request.data
+        email = data.get('email') if hasattr(data, 'get') else None
+        if not isinstance(email, str) or not email:
+            return None
+        return normalize_email(email)
+
+
+class SignInThrottle(ClientIPThrottle):
+    scope = 'sign_in'
+
+
+class SignInEmailThrottle(TargetEmailThrottle):
+    scope = 'sign_in_email'
+
+
+class AccountMailThrottle(ClientIPThrottle):
+    scope = 'account_mail'
+
+
+class AccountMailEmailThrottle(TargetEmailThrottle):
+    scope = 'account_mail_email'
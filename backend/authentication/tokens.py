@@ -1,9 +1,74 @@
+from django.conf import settings
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.encoding import force_bytes
+from django.utils.http import base36_to_int, urlsafe_base64_encode
 
 
-class ConfirmEmailTokenGenerator(PasswordResetTokenGenerator):
+def encode_uid(user) -> str:
+    return urlsafe_base64_encode(force_bytes(user.email))
+
+
+class SignedTokenMixin:
+    """
+    Append a signature over the uid and the token, so malformed, forged or
+    expired links are rejected by `check_signature` before any DB lookup.
+
+    Tokens look like `<timestamp>-<user state hash>-<signature>`.
+    """
+
+    signature_salt = 'authentication.tokens.SignedTokenMixin'
+
+    def _signature(self, uidb64, token, secret) -> str:
+        return salted_hmac(
+            self.signature_salt,
+            f'{uidb64}/{token}',
+            secret=secret,
+            algorithm=self.algorithm,
+        ).hexdigest()[::2]
+
+    def make_token(self, user):
+        token = super().make_token(user)
+        return f'{token}-{self._signature(encode_uid(user), token, self.secret)}'
+
+    def check_signature(self, uidb64, token) -> bool:
+        """
+        Stateless check of the signature and expiry of `token`.
+        """
+        if not (uidb64 and token):
+            return False
+        try:
+            ts_b36, _, signature = token.split('-')
+            ts = base36_to_int(ts_b36)
+        except ValueError:
+            return False
+
+        if (self._num_seconds(self._now()) - ts) > settings.PASSWORD_RESET_TIMEOUT:
+            return False
+
+        inner = token.rpartition('-')[0]
+        return any(
+            constant_time_compare(signature, self._signature(uidb64, inner, secret))
+            for secret in [self.secret, *self.secret_fallbacks]
+        )
+
+    def check_token(self, user, token):
+        if user is None or not self.check_signature(encode_uid(user), token):
+            return False
+        return super().check_token(user, token.rpartition('-')[0])
+
+
+class ConfirmEmailTokenGenerator(SignedTokenMixin, PasswordResetTokenGenerator):
     def _make_hash_value(self, user, timestamp):
         return f'{user.email}{timestamp}{user.email_verified}'
 
 
+class SignedPasswordResetTokenGenerator(
+    SignedTokenMixin, PasswordResetTokenGenerator
+):
+    signature_salt = 'authentication.tokens.SignedPasswordResetTokenGenerator'
+
+
 confirm_email_token_generator = ConfirmEmailTokenGenerator()
+
+password_reset_token_generator = SignedPasswordResetTokenGenerator()
@@ -1,10 +1,16 @@
-from django.db import router
+from django.conf import settings
 from rest_framework.routers import SimpleRouter
 
 from . import views
 
 router = SimpleRouter()
-router.register('', views.AuthViewSet, basename='auth')
-router.register('', views.AuthTokenViewset, basename='token')
+if settings.ASYNC_AUTH_VIEWS:
+    router.register('', views.AsyncAuthViewSet, basename='auth')
+    router.register('', views.AsyncAuthTokenViewset, basename='token')
+else:
+    router.register('', views.AuthViewSet, basename='auth')
+    router.register('', views.AuthTokenViewset, basename='token')
+
+router.register('users', views.UserViewSet, basename='user')
 
 urlpatterns = router.urls
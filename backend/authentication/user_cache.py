@@ -0,0 +1,131 @@
+"""
+Read-through cache of authenticated users: an in-process LRU with a short
+time to live in front of the `AUTH_USER_CACHE` shared cache.
+
+Entries hold the user's fields but its password hash, loaded on access,
+with its session auth hash (derived from the password hash). They only serve
+sessions or tokens carrying that same hash, so a password change still signs
+other sessions out.
+
+Saves, deletions and `.update()` of users invalidate their entries.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib import auth
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare
+
+from utils.cache import LRUCache
+
+from .models import User
+
+
+@lru_cache(maxsize=None)
+def local_cache() -> LRUCache:
+    return LRUCache(
+        maxsize=settings.AUTH_USER_CACHE_SIZE, ttl=settings.AUTH_USER_CACHE_TTL
+    )
+
+
+def _shared_cache():
+    alias = getattr(settings, 'AUTH_USER_CACHE', None)
+    return caches[alias] if alias else None
+
+
+def _key(user_id) -> str:
+    return f'auth:user:{user_id}'
+
+
+def fingerprint(user: User) -> str:
+    return user.get_session_auth_hash()
+
+
+@lru_cache(maxsize=None)
+def cached_fields() -> tuple:
+    return tuple(
+        field.attname
+        for field in User._meta.concrete_fields
+        if field.attname != 'password'
+    )
+
+
+def cached_user(user_id, user_fingerprint: str) -> User | None:
+    """
+    Return the cached user `user_id` when its fingerprint matches, None
+    otherwise. Each call returns a new instance, requests annotate their user
+    (backend, permission caches...).
+    """
+    key = _key(user_id)
+    entry = local_cache().get(key)
+    if entry is None and (shared := _shared_cache()) is not None:
+        entry = shared.get(key)
+        if entry is not None:
+            local_cache().set(key, entry)
+    if entry is None or not constant_time_compare(entry[0], user_fingerprint):
+        return None
+    _, database, values = entry
+    return User.from_db(database, cached_fields(), values)
+
+
+def cache_user(user: User):
+    values = tuple(getattr(user, field) for field in cached_fields())
+    entry = (fingerprint(user), user._state.db, values)
+    local_cache().set(_key(user.pk), entry)
+    if (shared := _shared_cache()) is not None:
+        shared.set(_key(user.pk), entry, settings.AUTH_USER_CACHE_TIMEOUT)
+
+
+def invalidate_user(user_id):
+    invalidate_users([user_id])
+
+
+def invalidate_users(user_ids):
+    keys = [_key(user_id) for user_id in user_ids]
+    for key in keys:
+        local_cache().delete(key)
+    if keys and (shared := _shared_cache()) is not None:
+        shared.delete_many(keys)
+
+
+def load_user(user_id, backend_path, user_fingerprint) -> User | None:
+    """
+    Return the user `user_id` if it can still authenticate with
+    `user_fingerprint`, through the caches, as `get_user` does for sessions.
+    """
+    user = cached_user(user_id, user_fingerprint)
+    if user is not None:
+        return user
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return None
+    user = auth.load_backend(backend_path).get_user(user_id)
+    if user is None:
+        return None
+    hashes = [fingerprint(user), *user.get_session_auth_fallback_hash()]
+    if not any(constant_time_compare(user_fingerprint, value) for value in hashes):
+        return None
+    cache_user(user)
+    return user
+
+
+def get_user(request):
+    """
+    `django.contrib.auth.get_user` answering sessions from the cache.
+    """
+    try:
+        user_id = auth._get_user_session_key(request)
+        backend_path = request.session[auth.BACKEND_SESSION_KEY]
+        session_hash = request.session[auth.HASH_SESSION_KEY]
+    except KeyError:
+        return auth.get_user(request)
+
+    if backend_path in settings.AUTHENTICATION_BACKENDS:
+        user = cached_user(user_id, session_hash)
+        if user is not None:
+            return user
+
+    # Misses go through Django's checks, which also handle rotated secrets.
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache_user(user)
+    return user
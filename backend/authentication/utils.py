@@ -1,34 +1,48 @@
 from django.conf import settings
-from django.contrib.auth.tokens import (
-    default_token_generator as password_reset_token_generator,
-)
 from django.core.mail import send_mail
-from django.utils.encoding import force_bytes
-from django.utils.http import urlsafe_base64_encode
-
-from .tokens import confirm_email_token_generator
 
+from utils.metrics import timed
 
-def send_confirmation_email(request, instance):
-    uidb64 = urlsafe_base64_encode(force_bytes(instance.email))
-    token = confirm_email_token_generator.make_token(instance)
+from .outbox import enqueue
+from .tokens import (
+    confirm_email_token_generator,
+    encode_uid,
+    password_reset_token_generator,
+)
 
-    domain = request.build_absolute_uri('/')
 
-    subject = 'Please, confirm your email'
-    message = f'{domain}account/email/confirm/{uidb64}/{token}/'
+@timed('mail')
+def deliver_mail(subject, message, recipient_list):
+    """
+    Send the email now, or leave it in the outbox when it's enabled.
+    """
+    if settings.EMAIL_USE_OUTBOX:
+        enqueue(subject, message, settings.EMAIL_HOST_USER, recipient_list)
+        return
 
     send_mail(
         subject=subject,
         message=message,
         from_email=settings.EMAIL_HOST_USER,
-        recipient_list=[instance.email],
+        recipient_list=recipient_list,
         fail_silently=False,
     )
 
 
+def send_confirmation_email(request, instance):
+    uidb64 = encode_uid(instance)
+    token = confirm_email_token_generator.make_token(instance)
+
+    domain = request.build_absolute_uri('/')
+
+    subject = 'Please, confirm your email'
+    message = f'{domain}account/email/confirm/{uidb64}/{token}/'
+
+    deliver_mail(subject, message, [instance.email])
+
+
 def send_reset_password_email(request, instance):
-    uidb64 = urlsafe_base64_encode(force_bytes(instance.email))
+    uidb64 = encode_uid(instance)
     token = password_reset_token_generator.make_token(instance)
 
     domain = request.build_absolute_uri('/')
@@ -36,10 +50,4 @@ def send_reset_password_email(request, instance):
     subject = 'Please, reset your password'
     message = f'{domain}account/password/reset/{uidb64}/{token}/'
 
-    send_mail(
-        subject=subject,
-        message=message,
-        from_email=settings.EMAIL_HOST_USER,
-        recipient_list=[instance.email],
-        fail_silently=False,
-    )
+    deliver_mail(subject, message, [instance.email])
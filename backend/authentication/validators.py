@@ -0,0 +1,128 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.utils.translation import gettext as _
+
+# File layout: header, then sorted and distinct SHA-1 prefixes of `width` bytes.
+MAGIC = b'BREACHED'
+HEADER = struct.Struct('>8sI4x')
+
+
+def password_key(password: str, width: int) -> bytes:
+    return hashlib.sha1(password.encode()).digest()[:width]
+
+
+class BreachedPasswords:
+    """
+    Membership test over a breached passwords file, memory mapped so lookups
+    only page in the few blocks a binary search touches.
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        invalid = ImproperlyConfigured(f'{self.path} is not a breached passwords file.')
+        with open(self.path, 'rb') as file:
+            self.identity = os.fstat(file.fileno())
+            if self.identity.st_size < HEADER.size:
+                raise invalid
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self.map, 'madvise'):
+            self.map.madvise(mmap.MADV_RANDOM)
+
+        magic, self.width = HEADER.unpack_from(self.map)
+        size = len(self.map) - HEADER.size
+        if magic != MAGIC or not self.width or size % self.width:
+            raise invalid
+        self.count = size // self.width
+
+    def __contains__(self, password: str) -> bool:
+        key = password_key(password, self.width)
+        width, data = self.width, self.map
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            start = HEADER.size + middle * width
+            if data[start : start + width] < key:
+                low = middle + 1
+            else:
+                high = middle
+        start = HEADER.size + low * width
+        return low < self.count and data[start : start + width] == key
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        self.map.close()
+
+    def is_current(self) -> bool:
+        """
+        Whether the file wasn't replaced since it was mapped.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size) == (
+            self.identity.st_ino,
+            self.identity.st_mtime_ns,
+            self.identity.st_size,
+        )
+
+
+_opened = {}
+_lock = threading.Lock()
+
+
+def get_breached_passwords(path) -> BreachedPasswords:
+    """
+    Return the process wide mapping of `path`, remapped when it's rebuilt.
+    """
+    path = os.fspath(path)
+    corpus = _opened.get(path)
+    if corpus is None or not corpus.is_current():
+        with _lock:
+            corpus = _opened.get(path)
+            if corpus is None or not corpus.is_current():
+                try:
+                    replaced, corpus = corpus, BreachedPasswords(path)
+                except FileNotFoundError as error:
+                    raise ImproperlyConfigured(
+                        f'Breached passwords file {path} not found, build it with '
+                        '`manage.py build_breached_passwords`.'
+                    ) from error
+                _opened[path] = corpus
+                if replaced is not None:
+                    replaced.close()
+    return corpus
+
+
+class BreachedPasswordValidator:
+    """
+    Validate that the password isn't in the breached passwords file, by
+    default `BREACHED_PASSWORDS_FILE`.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+
+    def validate(self, password, user=None):
+        path = self.path or settings.BREACHED_PASSWORDS_FILE
+        try:
+            breached = password in get_breached_passwords(path)
+        except ValueError:
+            # Its map was closed meanwhile, when another thread remapped it.
+            breached = password in get_breached_passwords(path)
+        if breached:
+            raise ValidationError(
+                _('This password has appeared in a data breach.'),
+                code='password_breached',
+            )
+
+    def get_help_text(self):
+        return _('Your password can’t be one found in a known data breach.')
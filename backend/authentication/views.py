@@ -1,75 +1,159 @@
-from django.contrib.auth import authenticate, login, logout
-from django.contrib.auth.tokens import (
-    default_token_generator as password_reset_token_generator,
-)
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import login, logout, user_logged_in
 from django.http import Http404
 from django.utils.encoding import force_str
 from django.utils.http import urlsafe_base64_decode
 from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 from rest_framework import status
+from rest_framework.permissions import IsAdminUser
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.viewsets import GenericViewSet
+from rest_framework.viewsets import GenericViewSet, ReadOnlyModelViewSet
+
+from utils.pagination import KeysetPagination
+from utils.viewsets import AsyncViewSetMixin
 
-from . import serializers
-from .models import User
-from .tokens import confirm_email_token_generator
+from . import audit, serializers
+from .access_tokens import (
+    AccessTokenAuthentication,
+    issue_tokens,
+    refresh_tokens,
+    revoke,
+    revoke_tokens,
+)
+from .backends import AuthOutcome, aauthenticate_outcome, authenticate_outcome
+from .hashing import limit_hashing
+from .models import AuthEvent, User
+from .sharding import pk_shard, users_by_email
+from .throttling import (
+    AccountMailEmailThrottle,
+    AccountMailThrottle,
+    SignInEmailThrottle,
+    SignInThrottle,
+)
+from .tokens import confirm_email_token_generator, password_reset_token_generator
 from .utils import send_confirmation_email, send_reset_password_email
 
 
-@extend_schema_view(
-    sign_in=extend_schema(
+AUTH_SCHEMAS = {
+    'sign_in': extend_schema(
         summary='Sign in user',
         request=serializers.UserIn,
-        responses=serializers.User,
+        responses=serializers.SignedIn,
         tags=['authentication'],
     ),
-    sign_out=extend_schema(
+    'sign_out': extend_schema(
         summary='Sign out user',
         request=None,
         responses={status.HTTP_204_NO_CONTENT: None},
         tags=['authentication'],
     ),
-    sign_up=extend_schema(
+    'refresh_token': extend_schema(
+        summary='Exchange a refresh token for new tokens',
+        request=serializers.RefreshToken,
+        responses={
+            status.HTTP_200_OK: serializers.TokenPair,
+            status.HTTP_401_UNAUTHORIZED: None,
+        },
+        tags=['authentication'],
+    ),
+    'revoke_token': extend_schema(
+        summary='Revoke a refresh token and its access tokens',
+        request=serializers.RefreshToken,
+        responses={
+            status.HTTP_204_NO_CONTENT: None,
+            status.HTTP_401_UNAUTHORIZED: None,
+        },
+        tags=['authentication'],
+    ),
+    'sign_up': extend_schema(
         summary='Sign up user',
         request=serializers.UserUp,
         responses={status.HTTP_201_CREATED: serializers.User},
         tags=['authentication'],
     ),
-)
+}
+
+auth_schema = extend_schema_view(**AUTH_SCHEMAS)
+
+
+@auth_schema
 class AuthViewSet(GenericViewSet):
     """Viewset with services to authentication and user session control."""
 
     serializer_class = serializers.User
 
-    @action(['POST'], detail=False, url_path='sign-in')
+    @action(
+        ['POST'],
+        detail=False,
+        url_path='sign-in',
+        throttle_classes=[SignInThrottle, SignInEmailThrottle],
+    )
+    @limit_hashing
     def sign_in(self, request):
         """Sign user in session."""
         serializer = serializers.UserIn(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.data
-        user = authenticate(**data)
-        if user is not None:
-            login(request, user)
-            if not data.get('remember_me'):
-                request.session.set_expiry(0)
-            serializer = self.get_serializer(user)
-            return Response(data, status=status.HTTP_200_OK)
+        outcome, user = authenticate_outcome(request, **data)
+        return self.sign_in_response(request, data, outcome, user)
 
-        # Verify if user exists and not confirmed your email
-        try:
-            user: User = User.objects.get(email=data['email'], email_verified=False)
-            return Response('User email not confirmed', status.HTTP_403_FORBIDDEN)
-        except User.DoesNotExist:
-            return Response('User not found.', status=status.HTTP_404_NOT_FOUND)
+    def sign_in_response(self, request, data, outcome, user):
+        match outcome:
+            case AuthOutcome.OK if data.get('tokens'):
+                # Token clients keep no session, only the login is recorded.
+                user_logged_in.send(sender=user.__class__, request=request, user=user)
+                data = {**self.get_serializer(user).data, 'tokens': issue_tokens(user)}
+                return Response(data, status=status.HTTP_200_OK)
+            case AuthOutcome.OK:
+                login(request, user)
+                if not data.get('remember_me'):
+                    request.session.set_expiry(0)
+                serializer = self.get_serializer(user)
+                return Response(serializer.data, status=status.HTTP_200_OK)
+            case AuthOutcome.UNVERIFIED:
+                return Response('User email not confirmed', status.HTTP_403_FORBIDDEN)
+            case _:
+                return Response('User not found.', status=status.HTTP_404_NOT_FOUND)
 
     @action(['POST'], detail=False, url_path='sign-out')
     def sign_out(self, request):
         """Sign user out in session."""
+        self.end_session(request)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def end_session(self, request):
+        if isinstance(request.successful_authenticator, AccessTokenAuthentication):
+            revoke(request.auth['f'])
         logout(request)
+
+    # Without authentication, an expired access token can't get in the way.
+    @action(
+        ['POST'], detail=False, url_path='token/refresh', authentication_classes=[]
+    )
+    def refresh_token(self, request):
+        """Exchange a refresh token for new tokens."""
+        serializer = serializers.RefreshToken(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        tokens = refresh_tokens(serializer.validated_data['refresh'])
+        if tokens is None:
+            return Response('Invalid or expired token.', status.HTTP_401_UNAUTHORIZED)
+        return Response(tokens, status=status.HTTP_200_OK)
+
+    @action(
+        ['POST'], detail=False, url_path='token/revoke', authentication_classes=[]
+    )
+    def revoke_token(self, request):
+        """Revoke a refresh token and the access tokens of its sign in."""
+        serializer = serializers.RefreshToken(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if not revoke_tokens(serializer.validated_data['refresh']):
+            return Response('Invalid or expired token.', status.HTTP_401_UNAUTHORIZED)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(['POST'], detail=False, url_path='sign-up')
+    @limit_hashing
     def sign_up(self, request):
         """Sign user up in DB."""
         serializer = serializers.UserUp(data=request.data)
@@ -82,7 +166,7 @@ class AuthViewSet(GenericViewSet):
         return Response(data, status=status.HTTP_201_CREATED)
 
 
-@extend_schema_view(
+auth_token_schema = extend_schema_view(
     resend_confirmation_email=extend_schema(
         summary='Resend confirmation email if account exists',
         request=serializers.SendEmail,
@@ -125,14 +209,22 @@ class AuthViewSet(GenericViewSet):
         tags=['authentication'],
     ),
 )
+
+
+@auth_token_schema
 class AuthTokenViewset(GenericViewSet):
     def get_serializer_class(self):
         match self.action:
-            case 'resend_confirmation_mail' | 'send_reset_password_email':
+            case 'resend_confirmation_email' | 'send_reset_password_email':
                 self.serializer_class = serializers.SendEmail
         return super().get_serializer_class()
 
-    @action(['POST'], detail=False, url_path=r'email/resend-confirmation-email')
+    @action(
+        ['POST'],
+        detail=False,
+        url_path=r'email/resend-confirmation-email',
+        throttle_classes=[AccountMailThrottle, AccountMailEmailThrottle],
+    )
     def resend_confirmation_email(self, request, *args, **kwargs):
         """
         An endpoint for resend confirmation email if account exists.
@@ -142,7 +234,7 @@ class AuthTokenViewset(GenericViewSet):
         data = serializer.data
 
         try:
-            user = User.objects.get(email=data['email'])
+            user = users_by_email(data['email']).get()
         except User.DoesNotExist:
             pass
         else:
@@ -159,9 +251,12 @@ class AuthTokenViewset(GenericViewSet):
         """
         Use identifiers to validate the email confirmed by the user.
         """
+        if not confirm_email_token_generator.check_signature(uidb64, token):
+            raise Http404('Activation link is invalid.')
+
         try:
             uid = force_str(urlsafe_base64_decode(uidb64))
-            user: User = User.objects.get(email=uid)
+            user: User = users_by_email(uid).get()
         except (TypeError, ValueError, OverflowError, User.DoesNotExist):
             user = None
 
@@ -173,7 +268,12 @@ class AuthTokenViewset(GenericViewSet):
             return Response(None, status.HTTP_204_NO_CONTENT)
         raise Http404('Activation link is invalid.')
 
-    @action(['POST'], detail=False, url_path=r'password/send-reset-email')
+    @action(
+        ['POST'],
+        detail=False,
+        url_path=r'password/send-reset-email',
+        throttle_classes=[AccountMailThrottle, AccountMailEmailThrottle],
+    )
     def send_reset_password_email(self, request, *args, **kwargs):
         """
         An endpoint for send reset email if account exists.
@@ -183,7 +283,7 @@ class AuthTokenViewset(GenericViewSet):
         data = serializer.data
 
         try:
-            user = User.objects.get(email=data['email'])
+            user = users_by_email(data['email']).get()
         except User.DoesNotExist:
             pass
         else:
@@ -196,15 +296,19 @@ class AuthTokenViewset(GenericViewSet):
         detail=False,
         url_path=r'password/reset/(?P<uidb64>[^/.]+)/(?P<token>[^/.]+)',
     )
+    @limit_hashing
     def reset_password(self, request, uidb64, token, *args, **kwargs):
         """
         An endpoint for changing account passowrd.
         """
         serializer_class = serializers.ChangePassord
 
+        if not password_reset_token_generator.check_signature(uidb64, token):
+            raise Http404('Activation link is invalid.')
+
         try:
             uid = force_str(urlsafe_base64_decode(uidb64))
-            user: User = User.objects.get(email=uid)
+            user: User = users_by_email(uid).get()
         except (TypeError, ValueError, OverflowError, User.DoesNotExist):
             user = None
 
@@ -212,6 +316,107 @@ class AuthTokenViewset(GenericViewSet):
             serializer = serializer_class(user, data=request.data)
             serializer.is_valid(raise_exception=True)
             serializer.save()
+            audit.record(AuthEvent.Kind.PASSWORD_RESET, request, user)
 
             return Response(None, status.HTTP_204_NO_CONTENT)
         raise Http404('Activation link is invalid.')
+
+
+@extend_schema_view(
+    **{f'a{name}': AUTH_SCHEMAS[name] for name in ('sign_in', 'sign_out', 'sign_up')}
+)
+class AsyncAuthViewSet(AsyncViewSetMixin, AuthViewSet):
+    """
+    Async `AuthViewSet` for ASGI deployments, password hashing never runs on
+    the event loop.
+    """
+
+    # Served by the coroutine actions below, on the same routes.
+    sign_in = sign_out = sign_up = None
+
+    @action(
+        ['POST'],
+        detail=False,
+        url_path='sign-in',
+        url_name='sign-in',
+        throttle_classes=[SignInThrottle, SignInEmailThrottle],
+    )
+    @limit_hashing
+    async def asign_in(self, request):
+        """Sign user in session."""
+        serializer = serializers.UserIn(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.data
+        outcome, user = await aauthenticate_outcome(request, **data)
+        # Logging in writes the session and last_login.
+        return await sync_to_async(self.sign_in_response)(request, data, outcome, user)
+
+    @action(['POST'], detail=False, url_path='sign-out', url_name='sign-out')
+    async def asign_out(self, request):
+        """Sign user out in session."""
+        await sync_to_async(self.end_session)(request)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(['POST'], detail=False, url_path='sign-up', url_name='sign-up')
+    @limit_hashing
+    async def asign_up(self, request):
+        """Sign user up in DB."""
+        serializer = serializers.UserUp(data=request.data)
+        # Validation queries the DB for email uniqueness.
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        user = await serializer.acreate(serializer.validated_data)
+        data = self.get_serializer(user).data
+
+        await sync_to_async(send_confirmation_email)(request, user)
+
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+@auth_token_schema
+class AsyncAuthTokenViewset(AsyncViewSetMixin, AuthTokenViewset):
+    """
+    Async `AuthTokenViewset`, its actions run in a worker thread.
+    """
+
+
+@extend_schema_view(
+    list=extend_schema(
+        summary='List users',
+        parameters=[
+            OpenApiParameter(
+                name='fields',
+                type=str,
+                location=OpenApiParameter.QUERY,
+                description='Comma separated fields to return.',
+            ),
+        ],
+        tags=['users'],
+    ),
+    retrieve=extend_schema(summary='Retrieve a user', tags=['users']),
+)
+class UserViewSet(ReadOnlyModelViewSet):
+    """
+    Read only users for support tooling, paginated by `(date_joined, id)`
+    across the user shards.
+    """
+
+    serializer_class = serializers.UserDetail
+    pagination_class = KeysetPagination
+    permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        # Only load the columns serialized, plus the pagination keys.
+        columns = {
+            *self.serializer_class.columns(self.request),
+            *KeysetPagination.ordering,
+        }
+        queryset = User.objects.only(*columns)
+        if self.lookup_field in self.kwargs:
+            return queryset.using(pk_shard(self.kwargs[self.lookup_field]))
+        return queryset
+
+    def get_querysets(self, queryset):
+        """
+        One queryset per database holding users, for `KeysetPagination`.
+        """
+        return [queryset.using(shard) for shard in settings.USER_SHARDS] or [queryset]
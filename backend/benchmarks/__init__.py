@@ -0,0 +1,87 @@
+"""
+Benchmarks for the backend.
+
+Run them from the `backend` directory, e.g. `python -m benchmarks.pk_generation`.
+Each one runs against a throwaway test database.
+"""
+import contextlib
+import os
+import statistics
+import tempfile
+import time
+
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'admin.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+    import django
+
+    django.setup()
+
+
+@contextlib.contextmanager
+def test_database(on_disk=False):
+    """
+    Create a test database for the duration of the block.
+
+    SQLite test databases live in memory, use `on_disk` when several threads
+    must share it.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    if on_disk and connection.vendor == 'sqlite':
+        directory = tempfile.mkdtemp()
+        connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'bench.db')
+        connection.settings_dict['OPTIONS']['timeout'] = 30
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def bench_user(i: int, **fields):
+    """
+    Unsaved user number `i`, with `fields` set.
+    """
+    from authentication.models import User
+
+    return User(
+        email=f'user{i}@example.com', first_name='Bench', last_name=str(i), **fields
+    )
+
+
+def median_ms(func, repeat: int) -> float:
+    """
+    Median time of `repeat` calls to `func`, in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+@contextlib.contextmanager
+def stopwatch(results: dict, name: str):
+    start = time.perf_counter()
+    yield
+    results[name] = time.perf_counter() - start
+
+
+def no_throttling():
+    """
+    Settings override disabling the account throttles for load generation.
+    """
+    from django.conf import settings
+    from django.test.utils import override_settings
+
+    return override_settings(
+        REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
+    )
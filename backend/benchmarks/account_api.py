@@ -0,0 +1,279 @@
+"""
+Benchmark every account API action in-process against a seeded database.
+
+Reports p50/p95/p99 latency, requests per second, SQL queries and hashing
+time per action, and stores them in a JSON baseline to compare later runs:
+
+    python -m benchmarks.account_api --users 10000 --output baseline.json
+    python -m benchmarks.account_api --users 10000 --compare baseline.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+from . import bench_user, no_throttling, setup, test_database
+
+# Relative change tolerated before `--compare` reports a regression.
+DEFAULT_THRESHOLD = 0.2
+
+
+class HashTimer:  # pylint: disable=too-few-public-methods
+    """
+    Accumulate the time spent in password hashers' `encode` (which `verify`
+    also goes through).
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    @contextmanager
+    def patch(self):
+        from django.contrib.auth.hashers import get_hashers
+
+        timer = self
+        patches = []
+        for hasher in {type(hasher) for hasher in get_hashers()}:
+            original = hasher.encode
+
+            def encode(self, *args, original=original, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return original(self, *args, **kwargs)
+                finally:
+                    timer.seconds += time.perf_counter() - start
+
+            patches.append(mock.patch.object(hasher, 'encode', encode))
+        for patch in patches:
+            patch.start()
+        try:
+            yield
+        finally:
+            for patch in patches:
+                patch.stop()
+
+
+def seed(users: int, password: str):
+    from django.contrib.auth.hashers import make_password
+
+    from authentication.models import User
+
+    encoded = make_password(password)
+    User.objects.bulk_create(
+        (
+            bench_user(i, email_verified=True, password=encoded)
+            for i in range(users)
+        ),
+        batch_size=5000,
+    )
+
+
+def scenarios(users: int, password: str):
+    """
+    Return `{action: prepare}`, `prepare(i)` runs untimed and returns the
+    timed request as `(client, method, path, data)`.
+    """
+    from django.test import Client
+
+    from authentication.models import User
+    from authentication.tokens import (
+        confirm_email_token_generator,
+        encode_uid,
+        password_reset_token_generator,
+    )
+
+    def user(i):
+        return User.objects.get(email=f'user{i % users}@example.com')
+
+    def sign_in(i):
+        data = {'email': f'user{i % users}@example.com', 'password': password}
+        return Client(), 'post', '/account/sign-in/', data
+
+    def sign_out(i):
+        client = Client()
+        client.force_login(user(i))
+        return client, 'post', '/account/sign-out/', None
+
+    def sign_up(i):
+        data = {
+            'first_name': 'Bench',
+            'last_name': 'Up',
+            'email': f'new{i}@example.com',
+            'password': password,
+            'password2': password,
+            'agreement': True,
+        }
+        return Client(), 'post', '/account/sign-up/', data
+
+    def resend_confirmation_email(i):
+        data = {'email': f'user{i % users}@example.com'}
+        return Client(), 'post', '/account/email/resend-confirmation-email/', data
+
+    def confirm_email(i):
+        instance = User.objects.create(
+            email=f'unverified{i}@example.com', password='!'
+        )
+        token = confirm_email_token_generator.make_token(instance)
+        path = f'/account/email/confirm/{encode_uid(instance)}/{token}/'
+        return Client(), 'get', path, None
+
+    def send_reset_password_email(i):
+        data = {'email': f'user{i % users}@example.com'}
+        return Client(), 'post', '/account/password/send-reset-email/', data
+
+    def reset_password(i):
+        instance = user(i)
+        token = password_reset_token_generator.make_token(instance)
+        path = f'/account/password/reset/{encode_uid(instance)}/{token}/'
+        data = {'password': password, 'password2': password}
+        return Client(), 'put', path, data
+
+    return {
+        'sign_in': sign_in,
+        'sign_out': sign_out,
+        'sign_up': sign_up,
+        'resend_confirmation_email': resend_confirmation_email,
+        'confirm_email': confirm_email,
+        'send_reset_password_email': send_reset_password_email,
+        'reset_password': reset_password,
+    }
+
+
+def send(client, method: str, path: str, data):
+    """
+    Send one request, return its duration and how many queries it ran.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as captured:
+        start = time.perf_counter()
+        if method == 'put':
+            response = client.put(path, data, content_type='application/json')
+        else:
+            response = getattr(client, method)(path, data)
+        elapsed = time.perf_counter() - start
+    assert response.status_code < 400, (path, response.status_code)
+    return elapsed, len(captured)
+
+
+def run_action(prepare, iterations: int) -> dict:
+    timer = HashTimer()
+    timings, queries, hashing = [], [], 0.0
+    with timer.patch():
+        for i in range(iterations):
+            request = prepare(i)
+            # Hashing done by `prepare` is not part of the request.
+            hashed_before = timer.seconds
+            elapsed, count = send(*request)
+            timings.append(elapsed)
+            queries.append(count)
+            hashing += timer.seconds - hashed_before
+
+    percentiles = statistics.quantiles(timings, n=100, method='inclusive')
+    return {
+        'p50_ms': percentiles[49] * 1000,
+        'p95_ms': percentiles[94] * 1000,
+        'p99_ms': percentiles[98] * 1000,
+        'rps': len(timings) / sum(timings),
+        'queries': statistics.mean(queries),
+        'hash_ms': hashing / iterations * 1000,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Return the regressions of `results` against `baseline`.
+    """
+    regressions = []
+    for action, current in results.items():
+        previous = baseline['results'].get(action)
+        if previous is None:
+            continue
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+            if current[metric] > previous[metric] * (1 + threshold):
+                regressions.append(
+                    f'{action}.{metric}: '
+                    f'{previous[metric]:.2f} -> {current[metric]:.2f}'
+                )
+        if current['queries'] > previous['queries']:
+            regressions.append(
+                f"{action}.queries: {previous['queries']} -> {current['queries']}"
+            )
+    return regressions
+
+
+def run_actions(args) -> dict:
+    """
+    Run the selected actions against a seeded test database, printing each.
+    """
+    from django.test.utils import override_settings
+
+    hashers = {}
+    if args.fast_hasher:
+        hashers['PASSWORD_HASHERS'] = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    password = 'bench.password'
+    results = {}
+    with test_database(), no_throttling(), override_settings(**hashers):
+        seed(args.users, password)
+        for action, prepare in scenarios(args.users, password).items():
+            if args.action and action not in args.action:
+                continue
+            results[action] = row = run_action(prepare, args.iterations)
+            print(
+                f"{action:<26} p50 {row['p50_ms']:8.2f}  p95 {row['p95_ms']:8.2f}"
+                f"  p99 {row['p99_ms']:8.2f} ms  {row['rps']:8.1f} req/s"
+                f"  {row['queries']:5.1f} queries  {row['hash_ms']:8.2f} ms hashing"
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--action', action='append', help='Only run these actions.')
+    parser.add_argument(
+        '--fast-hasher',
+        action='store_true',
+        help='Hash with MD5 to measure everything but password hashing.',
+    )
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    parser.add_argument('--compare', help='Baseline JSON file to compare with.')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    setup()
+    import django
+
+    results = run_actions(args)
+    report = {
+        'meta': {
+            'users': args.users,
+            'iterations': args.iterations,
+            'fast_hasher': args.fast_hasher,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Compare Django's `AuthenticationMiddleware` with the cached one, and with
+signed access tokens, on an authenticated request: latency, how many requests
+load the user, and queries spent on authentication (session and user):
+
+    python -m benchmarks.authenticated_requests --requests 500
+"""
+import argparse
+import statistics
+import time
+
+from . import setup, test_database
+
+URL = '/account/users/?fields=id&page_size=1'
+STOCK = 'django.contrib.auth.middleware.AuthenticationMiddleware'
+CACHED = 'authentication.middleware.CachedAuthenticationMiddleware'
+
+
+def run(client, requests: int):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings, user_queries, auth_queries = [], 0, 0
+    for _ in range(requests):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = client.get(URL)
+            timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.status_code
+        for query in context.captured_queries:
+            by_id = '"authentication_user"."id" =' in query['sql']
+            user_queries += by_id
+            auth_queries += by_id or '"django_session"' in query['sql']
+    return statistics.median(timings) * 1000, user_queries, auth_queries
+
+
+def measure(admin, middleware: str, access: str | None, requests: int):
+    """
+    Run `requests` with `middleware`, signed in with `access` or a session.
+    """
+    from django.conf import settings
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    from authentication.user_cache import local_cache
+
+    local_cache().clear()
+    stack = [middleware if path == CACHED else path for path in settings.MIDDLEWARE]
+    with override_settings(MIDDLEWARE=stack):
+        if access:
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {access}')
+        else:
+            client = Client()
+            client.force_login(admin)
+        return run(client, requests)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    setup()
+    from authentication.access_tokens import issue_tokens
+    from authentication.models import User
+
+    with test_database():
+        admin = User.objects.create_superuser(
+            email='admin@example.com', password='!', first_name='Admin', last_name='A'
+        )
+        access = issue_tokens(admin)['access']
+        print(f'{"":>14} {"median":>10} {"user loads":>12} {"auth queries":>14}')
+        for name, middleware, token in (
+            ('stock', STOCK, None),
+            ('cached', CACHED, None),
+            ('access token', CACHED, access),
+        ):
+            median, users, queries = measure(admin, middleware, token, args.requests)
+            print(f'{name:>14} {median:8.2f}ms {users:>12} {queries:>14}')
+        print(f'over {args.requests} requests')
+
+
+if __name__ == '__main__':
+    main()
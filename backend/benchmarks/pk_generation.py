@@ -0,0 +1,65 @@
+"""
+Compare User inserts per second with the legacy and time ordered pk generators.
+
+    python -m benchmarks.pk_generation --count 5000
+"""
+import argparse
+
+from . import setup, stopwatch, test_database
+
+
+def run(count: int) -> dict:
+    from django.contrib.auth.hashers import make_password
+
+    from authentication.models import User
+    from utils.models import generate_pk_base_64, get_pk_generator
+
+    password = make_password('benchmark')
+    generator = get_pk_generator()
+    results = {}
+
+    def users(prefix, ids=None):
+        return [
+            User(
+                id=ids[i] if ids else None,
+                email=f'{prefix}{i}@example.com',
+                first_name='Bench',
+                last_name=str(i),
+                password=password,
+            )
+            for i in range(count)
+        ]
+
+    with stopwatch(results, 'legacy save()'):
+        for user in users('legacy'):
+            user.id = generate_pk_base_64(User)
+            user.save()
+
+    with stopwatch(results, 'time ordered save()'):
+        for user in users('ordered'):
+            user.id = generator()
+            user.save()
+
+    with stopwatch(results, 'time ordered batch + bulk_create()'):
+        User.objects.bulk_create(
+            users('bulk', generator.generate_batch(count)), batch_size=1000
+        )
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup()
+    with test_database():
+        results = run(args.count)
+
+    for name, seconds in results.items():
+        print(f'{name:<40} {args.count / seconds:>12,.0f} inserts/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Compare serializing and rendering 1 and 10,000 users with DRF's field walk and
+`JSONRenderer` against the flat read path and `ORJSONRenderer`.
+
+    python -m benchmarks.serialization --repeat 20
+"""
+import argparse
+from datetime import timedelta
+from functools import partial
+
+from . import bench_user, median_ms, setup
+
+
+def serialize(serializer_class, instance, many):
+    return serializer_class(instance, many=many).data
+
+
+def paths() -> dict:
+    """
+    Return `{name: (serializer class, renderer)}` for each compared path.
+    """
+    from rest_framework import serializers
+    from rest_framework.renderers import JSONRenderer
+
+    from authentication import serializers as account_serializers
+    from authentication.models import User
+    from utils.renderers import ORJSONRenderer
+
+    class Reference(serializers.ModelSerializer):
+        name = serializers.SerializerMethodField()
+
+        class Meta:  # pylint: disable=too-few-public-methods
+            model = User
+            fields = account_serializers.UserDetail.Meta.fields
+
+        def get_name(self, instance) -> str:
+            return str(instance)
+
+    return {
+        'DRF fields + json': (Reference, JSONRenderer()),
+        'DRF fields + orjson': (Reference, ORJSONRenderer()),
+        'flat read + orjson': (account_serializers.UserDetail, ORJSONRenderer()),
+    }
+
+
+def run(count: int, repeat: int):
+    from django.utils import timezone
+
+    now = timezone.now()
+    users = [
+        bench_user(
+            i,
+            id=f'{i:011d}',
+            date_joined=now - timedelta(seconds=i),
+            last_login=now,
+        )
+        for i in range(count)
+    ]
+    instance = users[0] if count == 1 else users
+    many = count != 1
+    for name, (serializer_class, renderer) in paths().items():
+        data = serialize(serializer_class, instance, many)
+        serializing = median_ms(
+            partial(serialize, serializer_class, instance, many), repeat
+        )
+        rendering = median_ms(partial(renderer.render, data), repeat)
+        print(
+            f'{count:>6} {name:<22} {serializing:9.3f}ms {rendering:9.3f}ms'
+            f' {serializing + rendering:9.3f}ms'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--counts', type=int, nargs='+', default=[1, 10_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    print(f'{"users":>6} {"path":<22} {"serialize":>11} {"render":>11} {"total":>11}')
+    for count in args.counts:
+        run(count, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Latency of a session authenticated API request for each session engine.
+
+    python -m benchmarks.session_engines --requests 500
+"""
+import argparse
+import statistics
+import time
+
+from . import setup, test_database
+
+ENGINES = [
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'utils.sessions',
+]
+
+urlpatterns = []
+
+
+def build_urls():
+    from django.urls import path
+    from rest_framework.decorators import api_view, permission_classes
+    from rest_framework.permissions import IsAuthenticated
+    from rest_framework.response import Response
+
+    @api_view(['GET'])
+    @permission_classes([IsAuthenticated])
+    def whoami(request):
+        return Response({'id': request.user.pk})
+
+    urlpatterns.append(path('whoami/', whoami))
+
+
+def measure(engine: str, requests: int) -> list[float]:
+    from django.core.cache import cache
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    from authentication.models import User
+
+    cache.clear()
+    with override_settings(SESSION_ENGINE=engine, ROOT_URLCONF=__name__):
+        client = Client()
+        client.force_login(User.objects.get())
+        timings = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = client.get('/whoami/')
+            timings.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.content
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+
+    setup()
+    build_urls()
+    with test_database():
+        from authentication.models import User
+
+        User.objects.create_user(email='bench@example.com', password='supersecret')
+        for engine in ENGINES:
+            timings = measure(engine, args.requests)
+            print(
+                f'{engine:<45} mean {statistics.mean(timings) * 1000:6.2f} ms'
+                f'  p95 {statistics.quantiles(timings, n=20)[-1] * 1000:6.2f} ms'
+            )
+
+
+if __name__ == '__main__':
+    main()
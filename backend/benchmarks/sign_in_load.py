@@ -0,0 +1,108 @@
+"""
+Sign-in throughput of the sync and async authentication viewsets over ASGI.
+
+    python -m benchmarks.sign_in_load --concurrency 16 --requests 20
+"""
+import argparse
+import asyncio
+import time
+
+from . import no_throttling, setup, test_database
+
+urlpatterns = []
+
+
+def build_urls():
+    from django.urls import include, path
+    from rest_framework.routers import SimpleRouter
+
+    from authentication import views
+
+    sync_router, async_router = SimpleRouter(), SimpleRouter()
+    sync_router.register('', views.AuthViewSet, basename='auth')
+    async_router.register('', views.AsyncAuthViewSet, basename='async-auth')
+    urlpatterns.extend(
+        [
+            path('sync/', include(sync_router.urls)),
+            path('async/', include(async_router.urls)),
+        ]
+    )
+
+
+def seed(users: int):
+    from django.contrib.auth.hashers import make_password
+
+    from authentication.models import User
+
+    password = make_password('supersecret')
+    User.objects.bulk_create(
+        User(
+            email=f'user{i}@example.com',
+            first_name='Bench',
+            email_verified=True,
+            password=password,
+        )
+        for i in range(users)
+    )
+
+
+async def load(prefix: str, users: int, concurrency: int, requests: int) -> dict:
+    from collections import Counter
+
+    from asgiref.sync import ThreadSensitiveContext
+    from django.test import AsyncClient
+
+    statuses = Counter()
+
+    async def worker(index):
+        client = AsyncClient()
+        for i in range(requests):
+            # Mirror an ASGI server, each request gets its own sync thread.
+            async with ThreadSensitiveContext():
+                response = await client.post(
+                    f'/{prefix}/sign-in/',
+                    {
+                        'email': f'user{(index + i) % users}@example.com',
+                        'password': 'supersecret',
+                    },
+                )
+            statuses[response.status_code] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        'ok/s': statuses[200] / elapsed,
+        # 503s come from the hashing concurrency limiter shedding load.
+        'shed': statuses[503],
+        'other': sum(statuses.values()) - statuses[200] - statuses[503],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=10)
+    args = parser.parse_args()
+
+    setup()
+    from django.test.utils import override_settings
+
+    build_urls()
+    with test_database(on_disk=True), no_throttling(), override_settings(
+        ROOT_URLCONF=__name__
+    ):
+        seed(args.users)
+        for prefix in ('sync', 'async'):
+            result = asyncio.run(
+                load(prefix, args.users, args.concurrency, args.requests)
+            )
+            print(
+                f"{prefix:<6} sign-in {result['ok/s']:>10,.1f} req/s"
+                f"  shed {result['shed']}  other {result['other']}"
+            )
+
+
+if __name__ == '__main__':
+    main()
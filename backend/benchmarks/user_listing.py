@@ -0,0 +1,84 @@
+"""
+Compare keyset pages of `/account/users/` with OFFSET pages on the same
+ordering, from the first page to deep ones. Keyset pages should stay flat
+while OFFSET grows with the number of skipped rows:
+
+    python -m benchmarks.user_listing --users 250000 --pages 1 100 10000
+"""
+import argparse
+from datetime import timedelta
+
+from . import bench_user, median_ms, setup, test_database
+
+
+def seed(users: int):
+    from django.utils import timezone
+
+    from authentication.models import User
+
+    start = timezone.now() - timedelta(days=365)
+    User.objects.bulk_create(
+        (
+            bench_user(i, password='!', date_joined=start + timedelta(seconds=i))
+            for i in range(users)
+        ),
+        batch_size=5000,
+    )
+    return User.objects.create_superuser(
+        email='admin@example.com', password='!', first_name='Admin', last_name='A'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--users', type=int, default=250_000)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 100, 10_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    from django.test import Client
+
+    from authentication.models import User
+    from utils.pagination import KeysetPagination
+
+    with test_database():
+        client = Client()
+        client.force_login(seed(args.users))
+        ordered = User.objects.order_by(*KeysetPagination.ordering)
+        size = args.page_size
+
+        print(f'{"page":>8} {"keyset API":>12} {"OFFSET SQL":>12}')
+        for page in args.pages:
+            offset = (page - 1) * size
+            if offset >= args.users:
+                print(f'{page:>8} {"past the last user":>25}')
+                continue
+
+            url = f'/account/users/?page_size={size}'
+            if offset:
+                # The cursor the previous page would link to, built untimed.
+                last = ordered[offset - 1]
+                cursor = KeysetPagination.encode_cursor(
+                    [getattr(last, field) for field in KeysetPagination.ordering]
+                )
+                url += f'&cursor={cursor}'
+
+            def keyset_api(url=url):
+                response = client.get(url)
+                assert response.status_code == 200, response.status_code
+
+            def offset_sql(offset=offset):
+                list(ordered[offset : offset + size])
+
+            print(
+                f'{page:>8} {median_ms(keyset_api, args.repeat):10.2f}ms'
+                f' {median_ms(offset_sql, args.repeat):10.2f}ms'
+            )
+
+
+if __name__ == '__main__':
+    main()
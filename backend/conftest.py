@@ -0,0 +1,14 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def throttle_windows():
+    """
+    Start every test with empty throttle windows: email throttles count across
+    clients, earlier tests signing in as the same user would throttle it.
+    """
+    from utils.throttling import get_window_store
+
+    get_window_store.cache_clear()
+    yield
+    get_window_store.cache_clear()
@@ -0,0 +1,92 @@
+import atexit
+import logging
+import os
+import threading
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundQueue:  # pylint: disable=too-many-instance-attributes
+    """
+    Buffer items in memory and hand them to `flush` from a daemon thread.
+
+    Items put with the same `key` are coalesced, only the latest one is kept.
+    The buffer is flushed every `interval` seconds, as soon as it holds
+    `max_size` items, and once more when the process exits. A failed flush is
+    logged and its items are put back, up to `retries` flushes in a row, after
+    which they are dropped with an error.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self, flush, interval=1.0, max_size=1000, name='background-queue', *, retries=0
+    ):
+        self._flush = flush
+        self.interval = interval
+        self.max_size = max_size
+        self.name = name
+        self.retries = retries
+        self._failures = 0
+        self._keyed = {}
+        self._items = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pid = None
+        atexit.register(self.flush)
+
+    def __len__(self):
+        return len(self._keyed) + len(self._items)
+
+    def put(self, item, key=None):
+        with self._lock:
+            if key is None:
+                self._items.append(item)
+            else:
+                self._keyed[key] = item
+            full = len(self) >= self.max_size
+        self._ensure_thread()
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        with self._lock:
+            keyed, items = self._keyed, self._items
+            self._keyed, self._items = {}, []
+        if not keyed and not items:
+            return
+        try:
+            self._flush(list(keyed.values()) + items)
+        except Exception:  # pylint: disable=broad-except
+            count = len(keyed) + len(items)
+            logger.exception('%s failed to flush %d items', self.name, count)
+            self._failures += 1
+            if self._failures > self.retries:
+                logger.error('%s dropped %d items', self.name, count)
+                self._failures = 0
+                return
+            with self._lock:
+                # Items put meanwhile are newer than the failed ones.
+                self._keyed = {**keyed, **self._keyed}
+                self._items = items + self._items
+        else:
+            self._failures = 0
+
+    def _ensure_thread(self):
+        # Threads don't survive a fork, start one per process lazily.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        threading.Thread(target=self._run, name=self.name, daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+            # This thread never sees request_finished, recycle broken
+            # connections here instead.
+            close_old_connections()
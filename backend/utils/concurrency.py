@@ -0,0 +1,157 @@
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+class Overloaded(APIException):
+    """
+    503 raised when a limiter sheds a request, DRF sets `Retry-After` from `wait`.
+    """
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Server is busy, try again later.'
+    default_code = 'overloaded'
+
+    def __init__(self, wait=1, detail=None, code=None):
+        self.wait = wait
+        super().__init__(detail, code)
+
+
+class HostSlots:
+    """
+    Host wide semaphore made of `limit` lock files, shared by every process
+    using the same `directory`. Locks are released by the OS if a process dies.
+    """
+
+    def __init__(self, name, limit, directory=None):
+        directory = directory or tempfile.gettempdir()
+        self.paths = [
+            os.path.join(directory, f'{name}.{i}.lock') for i in range(limit)
+        ]
+
+    def try_acquire(self):
+        for path in self.paths:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+            else:
+                return fd
+        return None
+
+    def release(self, fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+@dataclass
+class Ticket:
+    # Lock file held in `HostSlots`, if any.
+    fd: int | None = None
+
+
+class ConcurrencyLimiter:  # pylint: disable=too-many-instance-attributes
+    """
+    Cap concurrent work per process and, optionally, per host.
+
+    Up to `queue_size` callers wait at most `queue_timeout` seconds for a
+    slot, any other caller is shed right away.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        name,
+        process_limit,
+        *,
+        host_limit=None,
+        queue_size=0,
+        queue_timeout=0.0,
+        retry_after=1,
+        lock_dir=None,
+    ):
+        self.name = name
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(process_limit)
+        self._host = (
+            HostSlots(name, host_limit, lock_dir) if host_limit and fcntl else None
+        )
+        self._lock = threading.Lock()
+        self.counters = {'admitted': 0, 'queued': 0, 'shed': 0, 'waiting': 0}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counters)
+
+    def _count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def acquire(self):
+        """
+        Return a ticket to pass to `release`, or None when the call is shed.
+        """
+        deadline = time.monotonic() + self.queue_timeout
+        # Slots are held until `release`, past this method.
+        # pylint: disable=consider-using-with
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                if self.counters['waiting'] >= self.queue_size:
+                    self.counters['shed'] += 1
+                    return None
+                self.counters['waiting'] += 1
+                self.counters['queued'] += 1
+            try:
+                acquired = self._slots.acquire(timeout=self.queue_timeout)
+            finally:
+                with self._lock:
+                    self.counters['waiting'] -= 1
+            if not acquired:
+                self._count('shed')
+                return None
+
+        ticket = Ticket()
+        if self._host is not None:
+            ticket.fd = self._acquire_host(deadline)
+            if ticket.fd is None:
+                self._slots.release()
+                self._count('shed')
+                return None
+
+        self._count('admitted')
+        return ticket
+
+    def _acquire_host(self, deadline):
+        while (fd := self._host.try_acquire()) is None:
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.005)
+        return fd
+
+    def release(self, ticket):
+        if ticket.fd is not None:
+            self._host.release(ticket.fd)
+        self._slots.release()
+
+    @contextmanager
+    def slot(self):
+        ticket = self.acquire()
+        if ticket is None:
+            raise Overloaded(wait=self.retry_after)
+        try:
+            yield
+        finally:
+            self.release(ticket)
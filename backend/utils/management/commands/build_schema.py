@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.schema import CachedSchema, build
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate the OpenAPI schema served at /schema/ into SCHEMA_CACHE_DIR, '
+        'so no worker generates it on its first request.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate even when the URLconf did not change.',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.SCHEMA_CACHE_DIR:
+            raise CommandError('SCHEMA_CACHE_DIR is empty, nothing to build into.')
+
+        schema = build(force=options['force'])
+        directory = settings.SCHEMA_CACHE_DIR
+        if CachedSchema.load(directory, schema.key) is None:
+            raise CommandError(f'Could not save the schema in {directory}.')
+        for (fmt, encoding), body in sorted(schema.variants.items()):
+            self.stdout.write(f'{fmt:<5} {encoding:<9} {len(body):>9} bytes')
+        self.stdout.write(
+            self.style.SUCCESS(f'Schema {schema.key} in {settings.SCHEMA_CACHE_DIR}')
+        )
@@ -0,0 +1,82 @@
+import io
+import pstats
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.profiling import sign_request, stored_profiles
+
+
+class Command(BaseCommand):
+    help = 'List and summarize the request profiles, or sign an `X-Profile` header.'
+
+    def add_arguments(self, parser):
+        commands = parser.add_subparsers(dest='command', required=True)
+        commands.add_parser('list', help='List stored profiles, newest last.')
+        show = commands.add_parser('show', help='Summarize one profile.')
+        show.add_argument('name', help='Profile name, as in `X-Profile-Id`.')
+        show.add_argument('--limit', type=int, default=25)
+        show.add_argument(
+            '--sort',
+            default='cumulative',
+            help='pstats sort key for cProfile profiles.',
+        )
+        commands.add_parser('sign', help='Print a value for the `X-Profile` header.')
+
+    def handle(self, *args, **options):
+        match options['command']:
+            case 'list':
+                self.list()
+            case 'show':
+                self.show(options['name'], options['limit'], options['sort'])
+            case 'sign':
+                self.stdout.write(sign_request())
+
+    def list(self):
+        profiles = stored_profiles()
+        for path in profiles:
+            stat = path.stat()
+            modified = datetime.fromtimestamp(stat.st_mtime).isoformat(
+                sep=' ', timespec='seconds'
+            )
+            self.stdout.write(f'{modified}  {stat.st_size:>9}  {path.name}')
+        self.stdout.write(f'{len(profiles)} profiles in {settings.PROFILING_DIR}')
+
+    def show(self, name, limit, sort):
+        path = next((path for path in stored_profiles() if path.name == name), None)
+        if path is None:
+            raise CommandError(f'No profile named {name!r}.')
+
+        if path.suffix == '.prof':
+            stream = io.StringIO()
+            stats = pstats.Stats(str(path), stream=stream)
+            stats.strip_dirs().sort_stats(sort).print_stats(limit)
+            self.stdout.write(stream.getvalue())
+            return
+
+        own, total, samples = rank_frames(path)
+        self.stdout.write(f'{samples} samples')
+        self.stdout.write(f'{"self":>6} {"total":>6}  frame')
+        for frame, count in own.most_common(limit):
+            self.stdout.write(
+                f'{count / samples:6.1%} {total[frame] / samples:6.1%}  {frame}'
+            )
+
+
+def rank_frames(path) -> tuple[Counter, Counter, int]:
+    """
+    Count the samples of collapsed stacks spent in each frame (self) and
+    under it (total), with the number of samples.
+    """
+    own, total, samples = Counter(), Counter(), 0
+    with path.open(encoding='utf-8') as file:
+        for line in file:
+            stack, count = line.rstrip('\n').rsplit(' ', 1)
+            frames = stack.split(';')
+            samples += int(count)
+            own[frames[-1]] += int(count)
+            for frame in set(frames):
+                total[frame] += int(count)
+    return own, total, samples
@@ -0,0 +1,211 @@
+"""
+Per-request timings by phase (database, hashing, mail, serializers),
+aggregated into per-view histograms rendered in the Prometheus text format.
+
+Phases are only measured on sampled requests, see `RequestMetricsMiddleware`.
+"""
+import bisect
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+_current: ContextVar['RequestMetrics | None'] = ContextVar('metrics', default=None)
+
+
+class RequestMetrics:  # pylint: disable=too-few-public-methods
+    """
+    Time spent per phase by the current request.
+    """
+
+    __slots__ = ('durations', 'queries', 'active')
+
+    def __init__(self):
+        self.durations = defaultdict(float)
+        self.queries = 0
+        self.active = set()
+
+    def server_timing(self, total: float) -> str:
+        entries = [
+            f'{phase};dur={seconds * 1000:.1f}'
+            for phase, seconds in self.durations.items()
+        ]
+        if self.queries:
+            entries.append(f'queries;desc="{self.queries}"')
+        entries.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(entries)
+
+
+def start_request():
+    """
+    Start measuring the phases of this context, return a token for `end_request`.
+    """
+    return _current.set(RequestMetrics())
+
+
+def end_request(token) -> RequestMetrics:
+    metrics = _current.get()
+    _current.reset(token)
+    return metrics
+
+
+@contextmanager
+def timed(phase: str):
+    """
+    Add the time spent in the block, or decorated function, to `phase`.
+    Nested blocks of the same phase are only counted once.
+    """
+    metrics = _current.get()
+    if metrics is None or phase in metrics.active:
+        yield
+        return
+    metrics.active.add(phase)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.durations[phase] += time.perf_counter() - start
+        metrics.active.discard(phase)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper timing queries of sampled requests.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.durations['db'] += time.perf_counter() - start
+        metrics.queries += 1
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """
+    `connection_created` receiver, wrappers survive reconnections.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedSerializerMixin:
+    """
+    Count validation and representation as the `serializer` phase.
+    """
+
+    def is_valid(self, *args, **kwargs):
+        with timed('serializer'):
+            return super().is_valid(*args, **kwargs)
+
+    @property
+    def data(self):
+        with timed('serializer'):
+            return super().data
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def render(self, name, labels):
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum}')
+        lines.append(f'{name}_count{{{labels}}} {cumulative}')
+        return lines
+
+
+class Registry:
+    """
+    Process wide histograms, plus the concurrency limiters to report on.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations = {}
+        self.phases = {}
+        self.queries = {}
+        self.limiters = []
+
+    def observe(self, view: str, total: float, metrics: RequestMetrics | None):
+        with self._lock:
+            self._histogram(self.durations, view, DURATION_BUCKETS).observe(total)
+            if metrics is None:
+                return
+            self._histogram(self.queries, view, QUERY_BUCKETS).observe(
+                metrics.queries
+            )
+            for phase, seconds in metrics.durations.items():
+                histogram = self._histogram(
+                    self.phases, (view, phase), DURATION_BUCKETS
+                )
+                histogram.observe(seconds)
+
+    @staticmethod
+    def _histogram(histograms, key, buckets):
+        if (histogram := histograms.get(key)) is None:
+            histogram = histograms[key] = Histogram(buckets)
+        return histogram
+
+    def add_limiter(self, limiter):
+        with self._lock:
+            self.limiters.append(limiter)
+
+    def clear(self):
+        with self._lock:
+            self.durations.clear()
+            self.phases.clear()
+            self.queries.clear()
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            lines.append('# TYPE http_request_duration_seconds histogram')
+            for view, histogram in sorted(self.durations.items()):
+                lines += histogram.render(
+                    'http_request_duration_seconds', f'view="{view}"'
+                )
+            lines.append('# TYPE http_request_phase_seconds histogram')
+            for (view, phase), histogram in sorted(self.phases.items()):
+                lines += histogram.render(
+                    'http_request_phase_seconds', f'view="{view}",phase="{phase}"'
+                )
+            lines.append('# TYPE http_request_db_queries histogram')
+            for view, histogram in sorted(self.queries.items()):
+                lines += histogram.render('http_request_db_queries', f'view="{view}"')
+            limiters = list(self.limiters)
+
+        stats = [(limiter.name, limiter.stats()) for limiter in limiters]
+        lines.append('# TYPE concurrency_limiter_events_total counter')
+        for name, counters in stats:
+            for event in ('admitted', 'queued', 'shed'):
+                lines.append(
+                    'concurrency_limiter_events_total'
+                    f'{{limiter="{name}",event="{event}"}} {counters[event]}'
+                )
+        lines.append('# TYPE concurrency_limiter_waiting gauge')
+        for name, counters in stats:
+            lines.append(
+                f'concurrency_limiter_waiting{{limiter="{name}"}} {counters["waiting"]}'
+            )
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
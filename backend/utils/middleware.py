@@ -0,0 +1,91 @@
+import abc
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics
+
+
+class AroundMiddleware(abc.ABC):
+    """
+    Base of middlewares running code around `get_response`, sync or async
+    alike: `start` runs before it, `stop` after it even when it raises, and
+    `finish` gets the response with what `stop` returned. In async mode
+    `astart` and `astop` run instead, by default the sync hooks.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            state = self.stop(state)
+        return self.finish(request, response, state)
+
+    async def __acall__(self, request):
+        state = await self.astart(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            state = await self.astop(state)
+        return self.finish(request, response, state)
+
+    @abc.abstractmethod
+    def start(self, request):
+        """
+        Return the state handed to `stop`.
+        """
+
+    def stop(self, state):
+        return state
+
+    async def astart(self, request):
+        return self.start(request)
+
+    async def astop(self, state):
+        return self.stop(state)
+
+    def finish(self, request, response, state):  # pylint: disable=unused-argument
+        return response
+
+
+class RequestMetricsMiddleware(AroundMiddleware):
+    """
+    Record the duration of every request per view, and on a sample of
+    `METRICS_SAMPLE_RATE` requests their phases too, answered as `Server-Timing`.
+
+    Keep it first in `MIDDLEWARE` so the total covers the other middlewares.
+    """
+
+    def start(self, request):
+        token = None
+        if random.random() < settings.METRICS_SAMPLE_RATE:
+            token = metrics.start_request()
+        return token, time.perf_counter()
+
+    def stop(self, state):
+        token, start = state
+        request_metrics = metrics.end_request(token) if token else None
+        return request_metrics, time.perf_counter() - start
+
+    def finish(self, request, response, state):
+        request_metrics, total = state
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        metrics.registry.observe(view, total, request_metrics)
+        if request_metrics is not None:
+            response['Server-Timing'] = request_metrics.server_timing(total)
+        return response
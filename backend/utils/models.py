@@ -1,18 +1,30 @@
-import random
+import secrets
 import string
-from django.db import OperationalError, ProgrammingError
+import threading
+import time
+from functools import lru_cache
 
-from django.db.models import Model
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, ProgrammingError
+from django.db import router, transaction
+from django.db.models import EmailField, Model
+from django.utils.module_loading import import_string
 
 BASE_64 = '0123456789' + string.ascii_letters + '-_'
 
+# Same alphabet ordered by code point, so generated ids sort by creation time.
+SORTED_BASE_64 = ''.join(sorted(BASE_64))
+
 
 def generate_pk_base_64(model: Model, size=11) -> str:
     """
     Return a unique base 64 id.
+
+    Legacy generator: it queries the table before every insert. New models
+    should use `get_pk_generator()` instead.
     """
     while True:
-        random_pk = ''.join(random.choices(BASE_64, k=size))
+        random_pk = ''.join(secrets.choice(BASE_64) for _ in range(size))
         try:
             if not model.objects.filter(pk=random_pk).exists():
                 break
@@ -20,3 +32,161 @@ def generate_pk_base_64(model: Model, size=11) -> str:
             break
 
     return random_pk
+
+
+def encode_base_64(number: int, size: int) -> str:
+    chars = []
+    for _ in range(size):
+        number, index = divmod(number, 64)
+        chars.append(SORTED_BASE_64[index])
+    return ''.join(reversed(chars))
+
+
+# Generators are callables keeping a per-process sequence, one method is all
+# they need.
+class TimeOrderedBase64Generator:  # pylint: disable=too-few-public-methods
+    """
+    Generate base 64 ids made of a millisecond timestamp followed by random
+    characters, so ids are roughly time ordered and need no DB round trip.
+
+    Ids created in the same millisecond by the same process are strictly
+    increasing; collisions between processes are left to insert time
+    (see `RetryPkCollisionMixin`).
+
+    With `shard_prefix`, ids start with a random character naming their shard
+    bucket (see `authentication.sharding`) and are only ordered per bucket.
+    """
+
+    # 2022-01-01T00:00:00Z in milliseconds.
+    epoch = 1_640_995_200_000
+
+    def __init__(self, size=11, time_size=7, shard_prefix=False):
+        self.time_size = time_size
+        self.shard_prefix = shard_prefix
+        self.random_bits = (size - time_size - shard_prefix) * 6
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def __call__(self) -> str:
+        return self.generate_batch(1)[0]
+
+    def _now(self) -> int:
+        return time.time_ns() // 1_000_000 - self.epoch
+
+    def _reseed(self):
+        # Start in the lower half so a burst can keep incrementing.
+        self._last_random = secrets.randbits(self.random_bits - 1)
+
+    def generate_batch(self, count: int) -> list[str]:
+        """
+        Return `count` distinct ids in a single call.
+        """
+        ids = []
+        with self._lock:
+            now = self._now()
+            if now > self._last_ms:
+                self._last_ms = now
+                self._reseed()
+            for _ in range(count):
+                self._last_random += secrets.randbelow(256) + 1
+                if self._last_random >= 1 << self.random_bits:
+                    self._last_ms += 1
+                    self._reseed()
+                ids.append(
+                    (secrets.choice(SORTED_BASE_64) if self.shard_prefix else '')
+                    + encode_base_64(self._last_ms, self.time_size)
+                    + encode_base_64(self._last_random, self.random_bits // 6)
+                )
+        return ids
+
+
+# pylint: disable-next=too-few-public-methods
+class ShardedTimeOrderedBase64Generator(TimeOrderedBase64Generator):
+    def __init__(self, size=11, time_size=7):
+        super().__init__(size, time_size, shard_prefix=True)
+
+
+@lru_cache(maxsize=None)
+def get_pk_generator():
+    """
+    Return the generator configured in `settings.PK_BASE_64_GENERATOR`.
+    """
+    path = getattr(
+        settings, 'PK_BASE_64_GENERATOR', 'utils.models.TimeOrderedBase64Generator'
+    )
+    return import_string(path)()
+
+
+# A model mixin, the model brings the rest of the public methods.
+class RetryPkCollisionMixin:  # pylint: disable=too-few-public-methods
+    """
+    Retry inserts with a fresh default pk when the generated one already exists.
+
+    The existence query only runs after an IntegrityError, so the common path
+    costs a single INSERT, wrapped in a savepoint when a transaction is open.
+    Pks given by the caller are never replaced, their collisions are raised.
+    """
+
+    pk_collision_retries = 3
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Only pks from the field default may be replaced, instances loaded
+        # from the database get their values as positional arguments.
+        pk_given = args or 'pk' in kwargs or self._meta.pk.attname in kwargs
+        self._default_pk = None if pk_given else self.pk
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        # Outside a transaction a failed INSERT leaves nothing to roll back.
+        in_transaction = transaction.get_connection(using).in_atomic_block
+        for attempt in range(self.pk_collision_retries + 1):
+            try:
+                if not in_transaction:
+                    return super().save(*args, **kwargs)
+                with transaction.atomic(using=using):
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                rows = type(self)._default_manager.using(using)
+                if (
+                    attempt == self.pk_collision_retries
+                    or self.pk != self._default_pk
+                    or not rows.filter(pk=self.pk).exists()
+                ):
+                    raise
+                self.pk = self._default_pk = self._meta.pk.get_default()
+        return None
+
+
+def normalize_email(email: str | None) -> str | None:
+    """
+    Comparison key of an email: no surrounding spaces, case folded.
+    """
+    return email.strip().lower() if email is not None else None
+
+
+class NormalizedEmailField(EmailField):
+    """
+    Email kept equal to `normalize_email` of the `source` field on every
+    insert, `bulk_create` included, and on saves updating `source`.
+    """
+
+    def __init__(self, *args, source='email', **kwargs):
+        self.source = source
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        kwargs.pop('editable', None)
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = normalize_email(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        return value
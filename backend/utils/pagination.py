@@ -0,0 +1,175 @@
+import base64
+import heapq
+import json
+from itertools import islice
+from operator import attrgetter
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import CharField, Q, TextField
+from django.db.models.functions import Collate
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# Collations comparing strings by code point, as Python does, per vendor.
+BINARY_COLLATIONS = {
+    'postgresql': 'C',
+    'mysql': 'utf8mb4_bin',
+    'sqlite': 'BINARY',
+    'oracle': 'BINARY',
+}
+
+
+def after(fields, values) -> Q:
+    """
+    Rows sorting after `values` on `fields`, written so the first field
+    bounds an index range scan: `a >= x AND (a > x OR b > y)`.
+    """
+    (field, *fields), (value, *values) = fields, values
+    if not fields:
+        return Q(**{f'{field}__gt': value})
+    return Q(**{f'{field}__gte': value}) & (
+        Q(**{f'{field}__gt': value}) | after(fields, values)
+    )
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate on the unique `ordering` columns: every page is an index range
+    scan starting after the last row of the previous page, however deep.
+
+    Views whose rows are spread over several databases return a queryset per
+    database from `get_querysets(queryset)`, their pages are merged in Python.
+    That needs every database to sort rows as Python compares them: string
+    keys are compared with the vendor's `BINARY_COLLATIONS` whatever their
+    column collation, other `ordering` fields must sort alike in SQL and
+    Python.
+    """
+
+    ordering = ('date_joined', 'id')
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+    # No page controls in the browsable API, `next` is in the response.
+    display_page_controls = False
+
+    def __init__(self):
+        self.request = None
+        self.model = None
+        self.next_position = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.model = queryset.model
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        querysets = [queryset]
+        if hasattr(view, 'get_querysets'):
+            querysets = view.get_querysets(queryset)
+        pages = []
+        for part in querysets:
+            part, keys = self.keyset(part)
+            part = part.order_by(*keys)
+            if position is not None:
+                part = part.filter(after(keys, position))
+            pages.append(list(part[: page_size + 1]))
+        merged = heapq.merge(*pages, key=attrgetter(*self.ordering))
+
+        rows = list(islice(merged, page_size + 1))
+        self.next_position = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_position = [getattr(rows[-1], field) for field in self.ordering]
+        return rows
+
+    def keyset(self, queryset):
+        """
+        Return `queryset` and the names its `ordering` fields sort by, string
+        ones aliased with a binary collation.
+        """
+        collation = BINARY_COLLATIONS.get(connections[queryset.db].vendor)
+        keys, aliases = [], {}
+        for name in self.ordering:
+            field = self.model._meta.get_field(name)
+            if collation and isinstance(field, (CharField, TextField)):
+                aliases[f'keyset_{name}'] = Collate(name, collation)
+                name = f'keyset_{name}'
+            keys.append(name)
+        return queryset.alias(**aliases), keys
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            return [
+                self.model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.ordering, values, strict=True)
+            ]
+        except (TypeError, ValueError, ValidationError) as error:
+            raise NotFound(self.invalid_cursor_message) from error
+
+    @staticmethod
+    def encode_cursor(values) -> str:
+        # Full precision isoformat, JSON encoders round microseconds.
+        values = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in values
+        ]
+        raw = json.dumps(values)
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_position)
+        )
+
+    def to_html(self):
+        return ''
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
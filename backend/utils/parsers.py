@@ -0,0 +1,31 @@
+import codecs
+
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class ORJSONParser(parsers.JSONParser):  # pylint: disable=too-few-public-methods
+    """
+    `JSONParser` decoding with orjson when it's installed, which rejects NaN
+    and infinities as `JSONParser` does under `STRICT_JSON`.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read()
+            if codecs.lookup(encoding).name != 'utf-8':
+                data = data.decode(encoding)
+            return orjson.loads(data)  # pylint: disable=no-member
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}') from exc
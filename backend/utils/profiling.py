@@ -0,0 +1,196 @@
+"""
+Profile single live requests, chosen by a signed `X-Profile` header or at
+random for a `PROFILING_SAMPLE_RATE` share of requests.
+
+Profiles are written to `PROFILING_DIR`, keeping the `PROFILING_MAX_FILES`
+most recent, and read back with `manage.py profiles`.
+"""
+import cProfile
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+
+from .middleware import AroundMiddleware
+
+HEADER = 'X-Profile'
+SALT = 'utils.profiling'
+
+
+def sign_request() -> str:
+    """
+    Return an `X-Profile` header value, valid for `PROFILING_SIGNATURE_MAX_AGE`.
+    """
+    return signing.TimestampSigner(salt=SALT).sign('profile')
+
+
+def is_signed(value: str) -> bool:
+    try:
+        signing.TimestampSigner(salt=SALT).unsign(
+            value, max_age=settings.PROFILING_SIGNATURE_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+class DeterministicProfiler:
+    """
+    cProfile of the calling thread, saved as pstats.
+    """
+
+    suffix = '.prof'
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def dump(self, path):
+        self.profile.dump_stats(path)
+
+
+class SamplingProfiler:
+    """
+    Sample the calling thread's stack every `interval` seconds from another
+    thread, saved as collapsed stacks (one `frame;frame;frame count` per line).
+    """
+
+    suffix = '.collapsed'
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._target = None
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(
+            target=self._sample, name='profiler', daemon=True
+        )
+        self._thread.start()
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                location = f'{code.co_filename}:{code.co_firstlineno}'
+                stack.append(f'{code.co_name} ({location})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f'{stack} {count}\n')
+
+
+def get_profiler():
+    match settings.PROFILING_MODE:
+        case 'sampling':
+            return SamplingProfiler(settings.PROFILING_INTERVAL)
+        case 'cprofile':
+            return DeterministicProfiler()
+    raise ValueError(f'Unknown PROFILING_MODE {settings.PROFILING_MODE!r}')
+
+
+def stored_profiles() -> list[Path]:
+    """
+    Stored profiles, oldest first.
+    """
+    directory = Path(settings.PROFILING_DIR)
+    if not directory.is_dir():
+        return []
+    return sorted(
+        path
+        for path in directory.iterdir()
+        if path.suffix in (DeterministicProfiler.suffix, SamplingProfiler.suffix)
+    )
+
+
+def save(profiler, request, elapsed: float) -> str:
+    """
+    Write the profile, drop the oldest beyond `PROFILING_MAX_FILES` and return
+    the profile name.
+    """
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    match = request.resolver_match
+    view = re.sub(r'[^\w.-]', '_', match.view_name if match else 'unmatched')
+    stamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    name = f'{stamp}-{view}-{request.method}-{elapsed * 1000:.0f}ms{profiler.suffix}'
+    profiler.dump(directory / name)
+
+    for path in stored_profiles()[: -settings.PROFILING_MAX_FILES]:
+        path.unlink(missing_ok=True)
+    return name
+
+
+class ProfilingMiddleware(AroundMiddleware):
+    """
+    Profile the requests selected for it and answer the profile name in
+    `X-Profile-Id`.
+
+    Profilers watch the thread running the view. Under ASGI that's the
+    request's thread sensitive `sync_to_async` thread, running sync views and
+    the sync parts of async ones; coroutines on the event loop aren't profiled.
+    """
+
+    def start(self, request):
+        if not self.selected(request):
+            return None
+        profiler = get_profiler()
+        start = time.perf_counter()
+        profiler.start()
+        return profiler, start
+
+    def stop(self, state):
+        if state is not None:
+            state[0].stop()
+        return state
+
+    async def astart(self, request):
+        if not self.selected(request):
+            return None
+        # Profilers watch the calling thread, start and stop them in the
+        # thread the view runs in.
+        return await sync_to_async(self.start)(request)
+
+    async def astop(self, state):
+        return await sync_to_async(self.stop)(state)
+
+    def finish(self, request, response, state):
+        if state is None:
+            return response
+        profiler, start = state
+        name = save(profiler, request, time.perf_counter() - start)
+        response['X-Profile-Id'] = name
+        return response
+
+    @staticmethod
+    def selected(request) -> bool:
+        if (value := request.headers.get(HEADER)) is not None:
+            return is_signed(value)
+        return random.random() < settings.PROFILING_SAMPLE_RATE
@@ -0,0 +1,43 @@
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+    OPTIONS = 0
+else:
+    # Datetimes go through DRF's encoder, for the same output as `JSONRenderer`.
+    OPTIONS = (
+        orjson.OPT_NON_STR_KEYS  # pylint: disable=no-member
+        | orjson.OPT_PASSTHROUGH_DATETIME  # pylint: disable=no-member
+    )
+
+_default = JSONEncoder().default
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """
+    `JSONRenderer` encoding with orjson when it's installed.
+
+    Indented output, as asked by the browsable API or an `indent` media type
+    parameter, still goes through `json`.
+
+    U+2028 and U+2029 are escaped as by `JSONRenderer`. Unlike it, NaN and
+    infinities are written as `null` instead of raising under `STRICT_JSON`.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(
+            accepted_media_type, renderer_context or {}
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        ret = orjson.dumps(  # pylint: disable=no-member
+            data, default=_default, option=OPTIONS
+        )
+        # Valid JSON but not valid JavaScript, see `JSONRenderer.render`.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029'
+        )
@@ -0,0 +1,95 @@
+"""
+Send reads to the `DATABASE_REPLICAS` and writes to `default`.
+
+Reads that follow a write stick to `default` so they never see replication
+lag: for the rest of the context (request, thread), and for
+`REPLICA_PIN_SECONDS` of the client's next requests through a cookie set
+by `ReplicaPinningMiddleware`.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .middleware import AroundMiddleware
+
+COOKIE_NAME = 'primary_pin'
+
+
+class Pin:  # pylint: disable=too-few-public-methods
+    __slots__ = ('pinned', 'wrote')
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_pin: ContextVar[Pin | None] = ContextVar('replica_pin', default=None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        pin = _pin.get()
+        if pin is not None and pin.pinned:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        pin = _pin.get()
+        if pin is None:
+            pin = Pin()
+            _pin.set(pin)
+        pin.pinned = pin.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication.
+        return False if db in settings.DATABASE_REPLICAS else None
+
+
+class ReplicaPinningMiddleware(AroundMiddleware):
+    """
+    Scope pins to the request and carry them over to the client's next
+    requests. Put it before any middleware reading the database.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def start(self, request):
+        pin = Pin(pinned=self.pinned_by_cookie(request))
+        return pin, _pin.set(pin)
+
+    def stop(self, state):
+        pin, token = state
+        _pin.reset(token)
+        return pin
+
+    def finish(self, request, response, state):
+        if state.wrote:
+            response.set_cookie(
+                COOKIE_NAME,
+                str(int(time.time())),
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    @staticmethod
+    def pinned_by_cookie(request) -> bool:
+        try:
+            written = int(request.COOKIES.get(COOKIE_NAME, ''))
+        except ValueError:
+            return False
+        return time.time() - written < settings.REPLICA_PIN_SECONDS
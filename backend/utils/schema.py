@@ -0,0 +1,268 @@
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from importlib import import_module
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from drf_spectacular.generators import EndpointEnumerator
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SpectacularAPIView
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+RENDERERS = {'yaml': OpenApiYamlRenderer, 'json': OpenApiJsonRenderer}
+
+COMPRESSORS = {'gzip': lambda body: gzip.compress(body, 9, mtime=0)}
+if brotli is not None:  # pragma: no branch
+    COMPRESSORS['br'] = brotli.compress
+
+# Preferred first when a client accepts several.
+ENCODINGS = ('br', 'gzip', 'identity')
+EXTENSIONS = {'gzip': '.gz', 'br': '.br', 'identity': ''}
+
+logger = logging.getLogger(__name__)
+
+
+def source_files(urlconf):
+    """
+    Python files the schema is generated from: the URLconf and the project apps.
+    """
+    base_dir = Path(settings.BASE_DIR).resolve()
+    files = {Path(import_module(urlconf).__file__).resolve()}
+    for config in apps.get_app_configs():
+        path = Path(config.path).resolve()
+        if path.is_relative_to(base_dir):
+            files.update(path.rglob('*.py'))
+    return sorted(files)
+
+
+def fingerprint(urlconf=None) -> str:
+    """
+    Identify the schema `urlconf` generates without generating it: its
+    endpoints, the sources behind them and the generator's settings.
+    """
+    urlconf = urlconf or settings.ROOT_URLCONF
+    digest = hashlib.sha256()
+    for path, _, method, callback in EndpointEnumerator(
+        urlconf=urlconf
+    ).get_api_endpoints():
+        view = getattr(callback, 'cls', callback)
+        line = f'{method} {path} {view.__module__}.{view.__qualname__}\n'
+        digest.update(line.encode())
+    for file in source_files(urlconf):
+        digest.update(hashlib.sha256(file.read_bytes()).digest())
+    digest.update(repr(settings.SPECTACULAR_SETTINGS).encode())
+    return digest.hexdigest()[:32]
+
+
+class CachedSchema:
+    """
+    A schema rendered once per format and compressed once per encoding, with
+    a strong ETag per variant.
+
+    `compressed` holds variants already compressed, by `(format, encoding)`.
+    """
+
+    def __init__(self, key: str, bodies: dict, compressed=None):
+        compressed = compressed or {}
+        self.key = key
+        self.variants = {}
+        self.etags = {}
+        for fmt, body in bodies.items():
+            tag = hashlib.sha256(body).hexdigest()[:32]
+            for encoding in ENCODINGS:
+                if encoding == 'identity':
+                    self.variants[fmt, encoding] = body
+                    self.etags[fmt, encoding] = f'"{tag}"'
+                elif encoding in COMPRESSORS:
+                    variant = compressed.get((fmt, encoding))
+                    if variant is None:
+                        variant = COMPRESSORS[encoding](body)
+                    self.variants[fmt, encoding] = variant
+                    self.etags[fmt, encoding] = f'"{tag}-{encoding}"'
+
+    @classmethod
+    def generate(cls, urlconf=None, key=None):
+        generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(urlconf=urlconf)
+        schema = generator.get_schema(request=None, public=True)
+        bodies = {
+            fmt: renderer().render(schema, renderer_context={})
+            for fmt, renderer in RENDERERS.items()
+        }
+        return cls(key or fingerprint(urlconf), bodies)
+
+    @classmethod
+    def load(cls, directory, key):
+        """
+        Read the schema saved under `key` with its compressed variants, None
+        when missing or unreadable.
+        """
+        directory = Path(directory) / key
+        try:
+            bodies = {
+                fmt: (directory / f'schema.{fmt}').read_bytes()
+                for fmt in RENDERERS
+            }
+        except OSError:
+            return None
+        compressed = {}
+        for fmt in RENDERERS:
+            for encoding in COMPRESSORS:
+                path = directory / f'schema.{fmt}{EXTENSIONS[encoding]}'
+                if path.exists():
+                    compressed[fmt, encoding] = path.read_bytes()
+        return cls(key, bodies, compressed)
+
+    def save(self, directory):
+        """
+        Write every variant under `directory/<key>/`, where a web server may
+        also serve them as static files.
+        """
+        directory = Path(directory) / self.key
+        directory.mkdir(parents=True, exist_ok=True)
+        # Identity files last, `load` only looks for them.
+        for (fmt, encoding), body in sorted(
+            self.variants.items(), key=lambda item: item[0][1] == 'identity'
+        ):
+            handle, path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(handle, 'wb') as file:
+                file.write(body)
+            os.replace(path, directory / f'schema.{fmt}{EXTENSIONS[encoding]}')
+
+    def encodings(self, fmt) -> list:
+        return [
+            encoding for encoding in ENCODINGS if (fmt, encoding) in self.variants
+        ]
+
+
+_schemas = {}
+_lock = threading.Lock()
+
+
+def get_schema(urlconf=None) -> CachedSchema:
+    """
+    The schema of `urlconf`, from memory, from `SCHEMA_CACHE_DIR` when its
+    fingerprint matches, or generated and saved there when it's writable.
+
+    A process keeps its schema in memory, the URLconf only changes across
+    restarts.
+    """
+    urlconf = urlconf or settings.ROOT_URLCONF
+    if (schema := _schemas.get(urlconf)) is not None:
+        return schema
+    with _lock:
+        if (schema := _schemas.get(urlconf)) is None:
+            schema = build(urlconf)
+            _schemas[urlconf] = schema
+    return schema
+
+
+def build(urlconf=None, force=False) -> CachedSchema:
+    key = fingerprint(urlconf)
+    directory = settings.SCHEMA_CACHE_DIR
+    schema = None
+    if directory and not force:
+        schema = CachedSchema.load(directory, key)
+    if schema is None:
+        schema = CachedSchema.generate(urlconf, key)
+        if directory:
+            try:
+                schema.save(directory)
+            except OSError:
+                # Served from memory anyway, the next process generates it.
+                logger.exception('Could not save the schema in %s', directory)
+    return schema
+
+
+def clear():
+    _schemas.clear()
+
+
+def accepted_encodings(header: str) -> set:
+    accepted = {'identity'}
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding, params = coding.strip().lower(), params.replace(' ', '')
+        try:
+            if params.startswith('q=') and float(params[2:]) == 0:
+                accepted.discard(coding)
+                continue
+        except ValueError:
+            continue
+        if coding:
+            accepted.add(coding)
+    return accepted
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """
+    `SpectacularAPIView` serving the schema built by `get_schema` instead of
+    generating it per request, with ETags and precompressed variants.
+
+    Requests for another schema than the default one are left to
+    `SpectacularAPIView`.
+    """
+
+    def is_default_schema(self, request) -> bool:
+        customized = [
+            self.urlconf,
+            self.patterns,
+            self.custom_settings,
+            self.api_version,
+            request.version,
+            request.GET.get('lang'),
+            request.GET.get('version'),
+        ]
+        return self.serve_public and not any(customized)
+
+    @extend_schema(
+        exclude=not spectacular_settings.SERVE_INCLUDE_SCHEMA,
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    def get(self, request, *args, **kwargs):
+        if not self.is_default_schema(request):
+            return super().get(request, *args, **kwargs)
+
+        schema = get_schema()
+        fmt = request.accepted_renderer.format
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        encoding = next(
+            (encoding for encoding in schema.encodings(fmt) if encoding in accepted),
+            'identity',
+        )
+
+        # Weak comparison: any encoding of the same content matches.
+        etags = {schema.etags[fmt, variant] for variant in schema.encodings(fmt)}
+        if set(parse_etags(request.headers.get('If-None-Match', ''))) & {*etags, '*'}:
+            response = HttpResponseNotModified()
+        else:
+            renderer = request.accepted_renderer
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type += f'; charset={renderer.charset}'
+            response = HttpResponse(
+                schema.variants[fmt, encoding], content_type=content_type
+            )
+            filename = f'{spectacular_settings.TITLE or "schema"}.{fmt}'
+            response['Content-Disposition'] = f'inline; filename="{filename}"'
+            if encoding != 'identity':
+                response['Content-Encoding'] = encoding
+
+        response['ETag'] = schema.etags[fmt, encoding]
+        response['Cache-Control'] = 'no-cache'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
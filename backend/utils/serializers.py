@@ -0,0 +1,143 @@
+import copy
+from operator import attrgetter
+
+from django.db.models.manager import BaseManager
+from rest_framework import fields as drf_fields
+from rest_framework.exceptions import ValidationError
+from rest_framework.relations import PKOnlyObject
+from rest_framework.serializers import ListSerializer
+
+# Representations returning model attribute values unchanged.
+PLAIN_REPRESENTATIONS = {
+    drf_fields.BooleanField.to_representation,
+    drf_fields.CharField.to_representation,
+    drf_fields.IntegerField.to_representation,
+}
+
+
+class SparseFieldsMixin:
+    """
+    Only serialize the fields listed in the request's `?fields=a,b`.
+
+    `Meta.field_sources` maps fields to the model columns they read, for
+    `columns()` to build the matching `.only()`.
+    """
+
+    fields_query_param = 'fields'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.requested_fields(self.context.get('request'))
+        if requested is not None:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+    @classmethod
+    def requested_fields(cls, request) -> set[str] | None:
+        value = request.query_params.get(cls.fields_query_param) if request else None
+        if not value:
+            return None
+        requested = {name.strip() for name in value.split(',') if name.strip()}
+        if unknown := requested - set(cls.Meta.fields):
+            message = f'Unknown fields: {", ".join(sorted(unknown))}.'
+            raise ValidationError({cls.fields_query_param: message})
+        return requested
+
+    @classmethod
+    def columns(cls, request) -> list[str]:
+        fields = cls.requested_fields(request) or cls.Meta.fields
+        sources = getattr(cls.Meta, 'field_sources', {})
+        return [column for field in fields for column in sources.get(field, [field])]
+
+
+class FlatReadMixin:
+    """
+    Represent instances from a plan built once instead of walking the fields:
+    plain model attributes are copied as they are, method fields are called
+    directly and other fields go through their `to_representation`.
+
+    Until the serializer's fields are built (e.g. to drop some), the plan
+    comes from a context-less instance of the class, so the fields must not
+    depend on the context. Pair with `FlatListSerializer` for lists.
+    """
+
+    def to_representation(self, instance):
+        return {name: get(instance) for name, get in self.read_getters()}
+
+    def read_getters(self) -> list:
+        """
+        Getters of the fields' representations for the current request.
+        """
+        if 'fields' not in self.__dict__:
+            plan = type(self).shared_read_plan()
+        elif (plan := self.__dict__.get('_read_plan')) is None:
+            plan = self._read_plan = self.read_plan()
+
+        getters = []
+        for name, kind, value in plan:
+            match kind:
+                case 'attribute':
+                    getters.append((name, value))
+                case 'method':
+                    getters.append((name, getattr(self, value)))
+                case 'datetime':
+                    # Look the current timezone up once, not per instance.
+                    field = copy.copy(value)
+                    field.timezone = field.default_timezone()
+                    getters.append((name, _field_getter(field)))
+                case _:
+                    getters.append((name, _field_getter(value)))
+        return getters
+
+    @classmethod
+    def shared_read_plan(cls):
+        if (plan := cls.__dict__.get('_shared_read_plan')) is None:
+            plan = cls._shared_read_plan = cls(context={}).read_plan()
+        return plan
+
+    def read_plan(self) -> list:
+        plan = []
+        for field in self._readable_fields:
+            if isinstance(field, drf_fields.SerializerMethodField):
+                plan.append((field.field_name, 'method', field.method_name))
+            elif (
+                type(field).to_representation in PLAIN_REPRESENTATIONS
+                and len(field.source_attrs) == 1
+            ):
+                plan.append(
+                    (field.field_name, 'attribute', attrgetter(field.source_attrs[0]))
+                )
+            elif isinstance(field, drf_fields.DateTimeField) and not hasattr(
+                field, 'timezone'
+            ):
+                plan.append((field.field_name, 'datetime', field))
+            else:
+                plan.append((field.field_name, 'field', field))
+        return plan
+
+
+class FlatListSerializer(ListSerializer):
+    """
+    List serializer sharing the getters of a `FlatReadMixin` child across items.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, BaseManager) else data
+        getters = self.child.read_getters()
+        return [{name: get(item) for name, get in getters} for item in iterable]
+
+    def update(self, instance, validated_data):
+        # Items are matched by position, as they were read.
+        return [
+            self.child.update(item, attrs)
+            for item, attrs in zip(instance, validated_data)
+        ]
+
+
+def _field_getter(field):
+    def get(instance):
+        value = field.get_attribute(instance)
+        check = value.pk if isinstance(value, PKOnlyObject) else value
+        return None if check is None else field.to_representation(value)
+
+    return get
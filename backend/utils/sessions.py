@@ -0,0 +1,92 @@
+"""
+Session engine with an in-process LRU in front of the shared cache and
+write-behind persistence to the database.
+
+Enable it with `SESSION_ENGINE = 'utils.sessions'`. Each process serves its
+LRU hits for up to `SESSION_LOCAL_CACHE_TTL` seconds without checking the
+shared cache: a session deleted (signed out) by another process stays valid
+here for that long. Set it to 0 to disable the LRU.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+from .background import BackgroundQueue
+from .cache import LRUCache
+
+
+@lru_cache(maxsize=None)
+def local_cache() -> LRUCache:
+    return LRUCache(
+        maxsize=settings.SESSION_LOCAL_CACHE_SIZE,
+        ttl=settings.SESSION_LOCAL_CACHE_TTL,
+    )
+
+
+def persist(sessions):
+    """
+    Write buffered sessions, one UPDATE per session key.
+
+    Rows are only updated: new sessions are inserted synchronously, and a
+    session deleted meanwhile (sign out) must not come back.
+    """
+    for session in sessions:
+        type(session).objects.filter(pk=session.pk).update(
+            session_data=session.session_data, expire_date=session.expire_date
+        )
+
+
+@lru_cache(maxsize=None)
+def write_behind() -> BackgroundQueue:
+    return BackgroundQueue(
+        persist,
+        interval=settings.SESSION_WRITE_BEHIND_INTERVAL,
+        name='session-write-behind',
+        retries=settings.SESSION_WRITE_BEHIND_RETRIES,
+    )
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = 'utils.sessions'
+
+    def load(self):
+        data = local_cache().get(self.cache_key)
+        if data is not None:
+            return dict(data)
+
+        data = super().load()
+        if data:
+            self._remember(data)
+        return data
+
+    def exists(self, session_key):
+        if local_cache().get(self.cache_key_prefix + session_key) is not None:
+            return True
+        return super().exists(session_key)
+
+    def save(self, must_create=False):
+        if must_create or self.session_key is None:
+            # New keys must be unique, so they are created synchronously.
+            super().save(must_create=must_create)
+            self._remember(self._session)
+            return
+
+        data = self._get_session(no_load=must_create)
+        self._cache.set(self.cache_key, data, self.get_expiry_age())
+        self._remember(data)
+        write_behind().put(self.create_model_instance(data), key=self.session_key)
+
+    def delete(self, session_key=None):
+        session_key = session_key or self.session_key
+        if session_key is not None:
+            local_cache().delete(self.cache_key_prefix + session_key)
+        super().delete(session_key)
+
+    def _remember(self, data):
+        ttl = min(
+            settings.SESSION_LOCAL_CACHE_TTL,
+            self.get_expiry_age(expiry=data.get('_session_expiry')),
+        )
+        if ttl > 0:
+            local_cache().set(self.cache_key, dict(data), ttl)
@@ -0,0 +1,99 @@
+import tempfile
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework import status
+
+from utils.concurrency import ConcurrencyLimiter
+
+
+class Limiter(TestCase):
+    def test_calls_over_the_cap_are_shed(self):
+        """
+        Ensure a full limiter with a full queue sheds immediately.
+        """
+        limiter = ConcurrencyLimiter('test', process_limit=1)
+        ticket = limiter.acquire()
+
+        self.assertIsNone(limiter.acquire())
+        limiter.release(ticket)
+        self.assertIsNotNone(limiter.acquire())
+        self.assertEqual(limiter.stats()['admitted'], 2)
+        self.assertEqual(limiter.stats()['shed'], 1)
+
+    def test_queued_calls_time_out(self):
+        """
+        Ensure a queued call gives up after the queue timeout.
+        """
+        limiter = ConcurrencyLimiter(
+            'test', process_limit=1, queue_size=1, queue_timeout=0.01
+        )
+        limiter.acquire()
+
+        self.assertIsNone(limiter.acquire())
+        self.assertEqual(limiter.stats()['queued'], 1)
+
+    def test_host_slots_are_shared_between_limiters(self):
+        """
+        Ensure the host cap applies across limiters (i.e. processes).
+        """
+        with tempfile.TemporaryDirectory() as lock_dir:
+            first, second = (
+                ConcurrencyLimiter('test', 2, host_limit=1, lock_dir=lock_dir)
+                for _ in range(2)
+            )
+            ticket = first.acquire()
+
+            self.assertIsNone(second.acquire())
+            first.release(ticket)
+            self.assertIsNotNone(second.acquire())
+
+
+class HashingEndpoints(TestCase):
+    def test_sign_in_is_shed_with_retry_after(self):
+        """
+        Ensure hashing endpoints answer 503 when no slot is available.
+        """
+        limiter = ConcurrencyLimiter('test', process_limit=1, retry_after=3)
+        limiter.acquire()
+
+        with mock.patch(
+            'authentication.hashing.get_hashing_limiter', return_value=limiter
+        ):
+            response = self.client.post(
+                '/account/sign-in/', {'email': 'foo@example.com', 'password': 'x'}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '3')
+
+    def test_slot_is_only_held_while_hashing(self):
+        """
+        Ensure sign up releases its slot before sending the confirmation email.
+        """
+        limiter = ConcurrencyLimiter('test', process_limit=1)
+        tickets = []
+
+        def send_confirmation_email(request, user):
+            tickets.append(limiter.acquire())
+
+        with mock.patch(
+            'authentication.hashing.get_hashing_limiter', return_value=limiter
+        ), mock.patch(
+            'authentication.views.send_confirmation_email', send_confirmation_email
+        ):
+            response = self.client.post(
+                '/account/sign-up/',
+                {
+                    'email': 'new@example.com',
+                    'first_name': 'foo',
+                    'last_name': 'qux',
+                    'password': 'supersecret',
+                    'password2': 'supersecret',
+                    'agreement': True,
+                },
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNotNone(tickets[0])
+        self.assertEqual(limiter.stats()['admitted'], 2)
@@ -0,0 +1,84 @@
+import datetime
+import decimal
+import uuid
+from io import BytesIO
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import renderers, serializers
+from rest_framework.exceptions import ParseError
+
+from authentication import models
+from authentication.serializers import User, UserDetail
+from utils.parsers import ORJSONParser
+from utils.renderers import ORJSONRenderer
+
+
+class FastJSON(SimpleTestCase):
+    def test_renders_like_json_renderer(self):
+        """
+        Ensure orjson output matches DRF's `JSONRenderer` for its special types.
+        """
+        data = {
+            'text': 'ação',
+            'separators': 'line\u2028paragraph\u2029',
+            'lazy': gettext_lazy('This field is required.'),
+            'when': datetime.datetime(2024, 1, 2, 3, 4, 5, 678901, datetime.UTC),
+            'day': datetime.date(2024, 1, 2),
+            'amount': decimal.Decimal('1.50'),
+            'id': uuid.UUID(int=1),
+            1: [None, True, 2.5],
+            'empty': (),
+        }
+
+        self.assertEqual(
+            ORJSONRenderer().render(data), renderers.JSONRenderer().render(data)
+        )
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_parses_json(self):
+        """
+        Ensure orjson parsing returns the payload and rejects invalid JSON.
+        """
+        parsed = ORJSONParser().parse(BytesIO('{"a": ["ç", 1]}'.encode()))
+        self.assertEqual(parsed, {'a': ['ç', 1]})
+
+        latin = {'encoding': 'latin-1'}
+        parsed = ORJSONParser().parse(BytesIO('"ç"'.encode('latin-1')), None, latin)
+        self.assertEqual(parsed, 'ç')
+
+        for invalid in (b'{"a": }', b'NaN', b'\xff'):
+            with self.subTest(invalid=invalid), self.assertRaises(ParseError):
+                ORJSONParser().parse(BytesIO(invalid))
+
+
+class FlatRead(TestCase):
+    def test_represents_like_model_serializer(self):
+        """
+        Ensure the flat read path returns what DRF's field walk returns.
+        """
+
+        class Reference(serializers.ModelSerializer):
+            name = serializers.SerializerMethodField()
+
+            class Meta:
+                model = models.User
+                fields = UserDetail.Meta.fields
+
+            def get_name(self, instance) -> str:
+                return str(instance)
+
+        user = models.User.objects.create_user(
+            email='a@example.com', password='!', first_name='A', last_name='B'
+        )
+        models.User.objects.filter(pk=user.pk).update(last_login=timezone.now())
+        users = models.User.objects.all()
+
+        for zone in ('UTC', 'America/Sao_Paulo'):
+            with self.subTest(zone=zone), timezone.override(zone):
+                self.assertEqual(
+                    UserDetail(users, many=True).data,
+                    Reference(users, many=True).data,
+                )
+        self.assertEqual(User(users[0]).data, {'name': 'A B', 'email': 'a@example.com'})
@@ -0,0 +1,78 @@
+from django.test import TestCase, override_settings
+
+from authentication.hashing import amake_password
+from authentication.models import User
+from utils import metrics
+
+
+@override_settings(METRICS_TOKEN='secret')
+class RequestMetrics(TestCase):
+    def setUp(self) -> None:
+        User.objects.create_user(
+            email='test@example.com', email_verified=True, password='supersecret'
+        )
+        self.credentials = {'email': 'test@example.com', 'password': 'supersecret'}
+        metrics.registry.clear()
+
+    def scrape(self) -> str:
+        response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        return response.content.decode()
+
+    @override_settings(METRICS_SAMPLE_RATE=1)
+    def test_sampled_requests_send_server_timing(self):
+        """
+        Ensure sampled requests report their phases and feed the histograms.
+        """
+        response = self.client.post('/account/sign-in/', self.credentials)
+
+        timing = response['Server-Timing']
+        for entry in ('db;dur=', 'hash;dur=', 'serializer;dur=', 'total;dur='):
+            self.assertIn(entry, timing)
+
+        body = self.scrape()
+        self.assertIn(
+            'http_request_phase_seconds_count{view="auth-sign-in",phase="hash"} 1',
+            body,
+        )
+        self.assertIn('http_request_db_queries_count{view="auth-sign-in"} 1', body)
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_unsampled_requests_only_count_duration(self):
+        """
+        Ensure requests left out of the sample are still counted.
+        """
+        response = self.client.post('/account/sign-in/', self.credentials)
+
+        self.assertNotIn('Server-Timing', response)
+        body = self.scrape()
+        self.assertIn(
+            'http_request_duration_seconds_count{view="auth-sign-in"} 1', body
+        )
+        self.assertNotIn('view="auth-sign-in",phase=', body)
+
+    def test_metrics_require_the_token(self):
+        """
+        Ensure scrapers must send `METRICS_TOKEN`.
+        """
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_without_token_are_only_served_in_debug(self):
+        """
+        Ensure an unset `METRICS_TOKEN` doesn't leave the metrics open.
+        """
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics/').status_code, 200)
+
+    async def test_hashing_executor_keeps_request_metrics(self):
+        """
+        Ensure hashing off the event loop is counted for the request.
+        """
+        token = metrics.start_request()
+        await amake_password('supersecret')
+        request_metrics = metrics.end_request(token)
+
+        self.assertGreater(request_metrics.durations['hash'], 0)
@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import TestCase, TransactionTestCase
+
+from authentication import models
+from utils.models import (
+    BASE_64,
+    ShardedTimeOrderedBase64Generator,
+    TimeOrderedBase64Generator,
+)
+
+
+def generated_pks(*pks):
+    """
+    Make the user pk generator return `pks`.
+    """
+    return mock.patch.object(
+        models, 'get_pk_generator', return_value=mock.Mock(side_effect=pks)
+    )
+
+
+class TimeOrderedGenerator(TestCase):
+    def test_ids_are_base_64_and_sorted(self):
+        """
+        Ensure a batch returns distinct 11 chars ids in creation order.
+        """
+        ids = TimeOrderedBase64Generator().generate_batch(10_000)
+
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids, sorted(ids))
+        self.assertTrue(all(len(pk) == 11 and set(pk) <= set(BASE_64) for pk in ids))
+
+    def test_sharded_ids_start_with_a_bucket(self):
+        """
+        Ensure sharded ids keep their size and are ordered within a bucket.
+        """
+        ids = ShardedTimeOrderedBase64Generator().generate_batch(10_000)
+
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertTrue(all(len(pk) == 11 for pk in ids))
+        self.assertGreater(len({pk[0] for pk in ids}), 32)
+        bucket = [pk for pk in ids if pk[0] == ids[0][0]]
+        self.assertEqual(bucket, sorted(bucket))
+
+    def test_user_insert_does_not_query_pk(self):
+        """
+        Ensure creating a user in a transaction only runs the INSERT and its
+        savepoint.
+        """
+        with self.assertNumQueries(3):
+            models.User.objects.create(email='foo@example.com', password='x')
+
+    def test_pk_collision_is_retried(self):
+        """
+        Ensure a colliding generated pk is replaced with a new one at insert
+        time.
+        """
+        first = models.User.objects.create(email='foo@example.com', password='x')
+        with generated_pks(first.id, 'B' * 11):
+            second = models.User.objects.create(email='bar@example.com', password='x')
+
+        self.assertEqual(second.pk, 'B' * 11)
+        self.assertEqual(models.User.objects.count(), 2)
+
+    def test_given_pk_collision_is_raised(self):
+        """
+        Ensure pks given by the caller are never replaced.
+        """
+        first = models.User.objects.create(email='foo@example.com', password='x')
+
+        with self.assertRaises(IntegrityError):
+            models.User.objects.create(
+                id=first.id, email='bar@example.com', password='x'
+            )
+        self.assertEqual(models.User.objects.count(), 1)
+
+
+class PkCollisionOutsideTransactions(TransactionTestCase):
+    def test_user_insert_is_a_single_query(self):
+        """
+        Ensure creating a user in autocommit mode only runs the INSERT.
+        """
+        with self.assertNumQueries(1):
+            models.User.objects.create(email='foo@example.com', password='x')
+
+    def test_pk_collision_is_retried(self):
+        """
+        Ensure a colliding pk is replaced without a savepoint.
+        """
+        first = models.User.objects.create(email='foo@example.com', password='x')
+        with generated_pks(first.id, 'B' * 11):
+            second = models.User.objects.create(email='bar@example.com', password='x')
+
+        self.assertEqual(second.pk, 'B' * 11)
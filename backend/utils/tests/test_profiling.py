@@ -0,0 +1,80 @@
+import tempfile
+from io import StringIO
+
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from utils.profiling import ProfilingMiddleware, sign_request, stored_profiles
+
+
+def sync_view(request):
+    return HttpResponse()
+
+
+class Profiling(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(PROFILING_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def sign_out(self, **headers):
+        return self.client.post('/account/sign-out/', headers=headers)
+
+    def test_signed_requests_are_profiled(self):
+        """
+        Ensure a request with a signed header is profiled and can be summarized.
+        """
+        for mode in ('sampling', 'cprofile'):
+            with self.subTest(mode=mode), self.settings(PROFILING_MODE=mode):
+                response = self.sign_out(x_profile=sign_request())
+
+                name = response['X-Profile-Id']
+                self.assertEqual(stored_profiles()[-1].name, name)
+
+                out = StringIO()
+                call_command('profiles', 'show', name, stdout=out)
+                self.assertNotEqual(out.getvalue(), '')
+
+    @override_settings(PROFILING_MODE='cprofile')
+    async def test_sync_views_are_profiled_in_their_thread(self):
+        """
+        Ensure an async middleware profiles sync views, run in another thread.
+        """
+
+        async def get_response(request):
+            return await sync_to_async(sync_view)(request)
+
+        request = RequestFactory().get('/', headers={'x-profile': sign_request()})
+        request.resolver_match = None
+        response = await ProfilingMiddleware(get_response)(request)
+
+        out = StringIO()
+        await sync_to_async(call_command)(
+            'profiles', 'show', response['X-Profile-Id'], stdout=out
+        )
+        self.assertIn('(sync_view)', out.getvalue())
+
+    def test_other_requests_are_not_profiled(self):
+        """
+        Ensure forged headers or unsampled requests are not profiled.
+        """
+        self.assertNotIn('X-Profile-Id', self.sign_out())
+        self.assertNotIn('X-Profile-Id', self.sign_out(x_profile='profile:forged'))
+        self.assertEqual(stored_profiles(), [])
+
+    @override_settings(PROFILING_SAMPLE_RATE=1, PROFILING_MAX_FILES=2)
+    def test_oldest_profiles_are_rotated(self):
+        """
+        Ensure only the most recent profiles are kept.
+        """
+        names = [self.sign_out()['X-Profile-Id'] for _ in range(3)]
+
+        self.assertEqual([path.name for path in stored_profiles()], names[1:])
+
+        out = StringIO()
+        call_command('profiles', 'list', stdout=out)
+        self.assertIn('2 profiles in', out.getvalue())
@@ -0,0 +1,137 @@
+from unittest import skipUnless
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+
+from authentication.models import User
+from utils.routers import (
+    COOKIE_NAME,
+    Pin,
+    ReplicaPinningMiddleware,
+    ReplicaRouter,
+    _pin,
+)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'])
+class Routing(SimpleTestCase):
+    def setUp(self) -> None:
+        self.router = ReplicaRouter()
+        token = _pin.set(Pin())
+        self.addCleanup(_pin.reset, token)
+
+    def test_reads_go_to_replicas(self):
+        """
+        Ensure reads are spread on replicas and writes go to the primary.
+        """
+        reads = {self.router.db_for_read(User) for _ in range(50)}
+
+        self.assertEqual(reads, {'replica_1', 'replica_2'})
+        self.assertEqual(self.router.db_for_write(User), 'default')
+
+    def test_reads_after_a_write_stick_to_the_primary(self):
+        """
+        Ensure reads following a write never hit a lagging replica.
+        """
+        self.router.db_for_write(User)
+
+        self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_replicas_are_not_migrated(self):
+        """
+        Ensure migrations only run on the primary.
+        """
+        self.assertIsNone(self.router.allow_migrate('default', 'authentication'))
+        self.assertFalse(self.router.allow_migrate('replica_1', 'authentication'))
+
+    def test_writes_pin_the_next_requests(self):
+        """
+        Ensure a client that wrote reads from the primary on its next request.
+        """
+
+        def write(request):
+            self.router.db_for_write(User)
+            return HttpResponse()
+
+        def read(request):
+            return HttpResponse(self.router.db_for_read(User))
+
+        request = RequestFactory().post('/')
+        response = ReplicaPinningMiddleware(write)(request)
+        cookie = response.cookies[COOKIE_NAME].value
+
+        request = RequestFactory().get('/', HTTP_COOKIE=f'{COOKIE_NAME}={cookie}')
+        self.assertEqual(ReplicaPinningMiddleware(read)(request).content, b'default')
+
+        request = RequestFactory().get('/')
+        self.assertNotEqual(ReplicaPinningMiddleware(read)(request).content, b'default')
+
+    def test_async_requests_are_pinned(self):
+        """
+        Ensure async requests are scoped and pinned as sync ones.
+        """
+
+        async def write(request):
+            self.router.db_for_write(User)
+            return HttpResponse(self.router.db_for_read(User))
+
+        middleware = ReplicaPinningMiddleware(write)
+        response = async_to_sync(middleware)(RequestFactory().post('/'))
+
+        self.assertEqual(response.content, b'default')
+        self.assertIn(COOKIE_NAME, response.cookies)
+
+
+@skipUnless(settings.DATABASE_REPLICAS, 'Set DB_REPLICA_URLS to test replicas.')
+class ReplicaReads(TransactionTestCase):
+    databases = '__all__'
+
+    def setUp(self) -> None:
+        self.replica = settings.DATABASE_REPLICAS[0]
+        User.objects.create_user(email='test@example.com', password='supersecret')
+
+    def queries(self, request, view) -> tuple:
+        """
+        Run `view` through the middleware, return its response with the
+        queries it sent to the primary and to the replica.
+        """
+        with (
+            override_settings(DATABASE_REPLICAS=[self.replica]),
+            CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary,
+            CaptureQueriesContext(connections[self.replica]) as replica,
+        ):
+            response = ReplicaPinningMiddleware(view)(request)
+        return response, len(primary), len(replica)
+
+    def test_reads_go_to_the_replica_until_pinned(self):
+        """
+        Ensure reads hit the replica, and the primary once the client wrote.
+        """
+
+        def read(request):
+            self.assertTrue(User.objects.filter(email='test@example.com').exists())
+            return HttpResponse()
+
+        def write(request):
+            Group.objects.create(name='test')
+            return read(request)
+
+        _, *queries = self.queries(RequestFactory().get('/'), read)
+        self.assertEqual(queries, [0, 1])
+        response, *queries = self.queries(RequestFactory().post('/'), write)
+        self.assertEqual(queries, [2, 0])
+
+        cookie = response.cookies[COOKIE_NAME].value
+        request = RequestFactory().get('/', HTTP_COOKIE=f'{COOKIE_NAME}={cookie}')
+        _, *queries = self.queries(request, read)
+        self.assertEqual(queries, [1, 0])
@@ -0,0 +1,117 @@
+import gzip
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from utils import schema
+
+
+class CachedSchema(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(SCHEMA_CACHE_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        schema.clear()
+        self.addCleanup(schema.clear)
+
+    def test_schema_is_generated_once(self):
+        """
+        Ensure the schema is generated on the first request only, and loaded
+        from disk by a fresh process.
+        """
+        with mock.patch.object(
+            schema.CachedSchema, 'generate', wraps=schema.CachedSchema.generate
+        ) as generate:
+            first = self.client.get('/schema/')
+            second = self.client.get('/schema/')
+            schema.clear()
+            third = self.client.get('/schema/')
+
+        generate.assert_called_once()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first.content, third.content)
+        self.assertIn(b'/account/sign-in/', first.content)
+
+    def test_unchanged_schema_is_not_sent_again(self):
+        """
+        Ensure a request with the current ETag is answered 304.
+        """
+        etag = self.client.get('/schema/')['ETag']
+
+        response = self.client.get('/schema/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get('/schema/', headers={'If-None-Match': '"stale"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_compressed_variants(self):
+        """
+        Ensure clients accepting gzip get the precompressed schema, in each
+        format.
+        """
+        for fmt in ('yaml', 'json'):
+            with self.subTest(fmt=fmt):
+                plain = self.client.get(f'/schema/?format={fmt}')
+                compressed = self.client.get(
+                    f'/schema/?format={fmt}',
+                    headers={'Accept-Encoding': 'gzip, deflate'},
+                )
+
+                self.assertEqual(compressed['Content-Encoding'], 'gzip')
+                self.assertIn('Accept-Encoding', compressed['Vary'])
+                self.assertEqual(gzip.decompress(compressed.content), plain.content)
+                self.assertNotEqual(compressed['ETag'], plain['ETag'])
+
+                response = self.client.get(
+                    f'/schema/?format={fmt}',
+                    headers={'If-None-Match': plain['ETag'], 'Accept-Encoding': 'gzip'},
+                )
+                self.assertEqual(response.status_code, 304)
+
+    def test_build_command(self):
+        """
+        Ensure `build_schema` prebuilds the schema served afterwards, along
+        with its compressed variants.
+        """
+        call_command('build_schema', stdout=StringIO())
+        schema.clear()
+
+        compress = mock.Mock()
+        with mock.patch.object(
+            schema.CachedSchema, 'generate'
+        ) as generate, mock.patch.dict(schema.COMPRESSORS, gzip=compress):
+            response = self.client.get('/schema/', headers={'Accept-Encoding': 'gzip'})
+
+        generate.assert_not_called()
+        compress.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_unwritable_directory(self):
+        """
+        Ensure the schema is served from memory when `SCHEMA_CACHE_DIR` can't
+        be written, and `build_schema` reports it.
+        """
+        with tempfile.NamedTemporaryFile() as file, override_settings(
+            SCHEMA_CACHE_DIR=f'{file.name}/schemas'
+        ):
+            with self.assertLogs('utils.schema', 'ERROR'):
+                response = self.client.get('/schema/')
+            self.assertEqual(response.status_code, 200)
+
+            with mock.patch.object(schema.CachedSchema, 'generate') as generate:
+                self.assertEqual(self.client.get('/schema/').status_code, 200)
+            generate.assert_not_called()
+
+            with self.assertLogs('utils.schema', 'ERROR'), self.assertRaises(
+                CommandError
+            ):
+                call_command('build_schema', stdout=StringIO())
@@ -0,0 +1,116 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from utils.background import BackgroundQueue
+from utils.sessions import SessionStore, local_cache, write_behind
+
+
+class WriteBehindSessions(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        local_cache().clear()
+        # Flush by hand, the test transaction is invisible to other threads.
+        write_behind().interval = 3600
+
+    def test_reads_are_served_from_memory(self):
+        """
+        Ensure a saved session loads without querying the database.
+        """
+        session = SessionStore()
+        session['foo'] = 'bar'
+        session.create()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(session.session_key)['foo'], 'bar')
+
+    def test_updates_are_persisted_later(self):
+        """
+        Ensure updates reach the database when the buffer is flushed.
+        """
+        session = SessionStore()
+        session.create()
+        session['foo'] = 'bar'
+        with self.assertNumQueries(0):
+            session.save()
+
+        write_behind().flush()
+        row = Session.objects.get(pk=session.session_key)
+        self.assertEqual(row.get_decoded(), {'foo': 'bar'})
+
+    def test_deleted_session_is_not_resurrected(self):
+        """
+        Ensure a pending write doesn't recreate a deleted session.
+        """
+        session = SessionStore()
+        session.create()
+        session['foo'] = 'bar'
+        session.save()
+        session.delete()
+
+        write_behind().flush()
+        self.assertFalse(Session.objects.exists())
+        self.assertFalse(SessionStore().exists(session.session_key))
+
+    @override_settings(SESSION_LOCAL_CACHE_TTL=0)
+    def test_local_cache_can_be_disabled(self):
+        """
+        Ensure a zero TTL serves sessions from the shared cache only, so
+        deletions from other processes are seen at once.
+        """
+        session = SessionStore()
+        session['foo'] = 'bar'
+        session.create()
+        self.assertEqual(len(local_cache()), 0)
+
+        cache.delete(session.cache_key)
+        Session.objects.all().delete()
+        self.assertEqual(SessionStore(session.session_key).load(), {})
+
+
+class BackgroundQueueRetries(TestCase):
+    def test_failed_flush_is_retried_then_dropped(self):
+        """
+        Ensure failed items are put back, behind newer ones with the same key,
+        and dropped with an error after the last retry.
+        """
+        batches = []
+
+        def flush(items):
+            batches.append(items)
+            raise DatabaseError
+
+        queue = BackgroundQueue(flush, interval=3600, retries=1)
+        queue.put('old', key='a')
+        with self.assertLogs('utils.background', 'ERROR'):
+            queue.flush()
+        queue.put('new', key='a')
+        queue.put('b', key='b')
+        with self.assertLogs('utils.background', 'ERROR') as logs:
+            queue.flush()
+
+        self.assertEqual(batches, [['old'], ['new', 'b']])
+        self.assertIn('dropped 2 items', logs.output[-1])
+        self.assertEqual(len(queue), 0)
+
+
+class PruneSessions(TestCase):
+    def test_only_expired_sessions_are_deleted(self):
+        """
+        Ensure chunked pruning removes every expired row and nothing else.
+        """
+        now = timezone.now()
+        Session.objects.bulk_create(
+            Session(session_key=f'{i:032}', session_data='', expire_date=now + delta)
+            for i, delta in enumerate([-timedelta(days=1)] * 5 + [timedelta(days=1)])
+        )
+
+        call_command('prune_sessions', chunk_size=2, pause=0, stdout=StringIO())
+
+        self.assertEqual(Session.objects.count(), 1)
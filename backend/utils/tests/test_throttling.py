@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from rest_framework import status
+
+from authentication.throttling import SignInEmailThrottle
+from utils.throttling import LocalWindowStore, estimate, get_window_store
+
+
+class SlidingWindow(TestCase):
+    def test_previous_window_decays(self):
+        """
+        Ensure the previous window weighs less as the current one elapses.
+        """
+        self.assertEqual(estimate(10, 2, 0.0), 12)
+        self.assertEqual(estimate(10, 2, 0.5), 7)
+        self.assertEqual(estimate(10, 2, 1.0), 2)
+
+    def test_local_store_memory_is_bounded(self):
+        """
+        Ensure keys past the limit evict the least recently hit counters.
+        """
+        store = LocalWindowStore(max_keys=100)
+        store.hit('recent', 0, 60)
+        for i in range(1000):
+            store.hit(f'key{i}', 0, 60)
+            store.hit('recent', 0, 60)
+
+        self.assertEqual(len(store), 100)
+        self.assertEqual(store.hit('recent', 0, 60), (0, 1001))
+        self.assertEqual(store.hit('key999', 0, 60), (0, 1))
+        self.assertEqual(store.hit('key0', 0, 60), (0, 0))
+
+    def test_counts_roll_over_to_previous_window(self):
+        """
+        Ensure counts move to the previous window, and expire after it.
+        """
+        store = LocalWindowStore(max_keys=10)
+        for _ in range(3):
+            store.hit('key', 0, 60)
+
+        self.assertEqual(store.hit('key', 1, 60), (3, 0))
+        self.assertEqual(store.hit('key', 5, 60), (0, 0))
+
+
+@override_settings(
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'sign_in_email': '2/min'},
+    }
+)
+class SignInThrottles(TestCase):
+    def setUp(self) -> None:
+        get_window_store.cache_clear()
+        self.addCleanup(get_window_store.cache_clear)
+
+    def test_sign_in_is_throttled_by_target_email(self):
+        """
+        Ensure repeated sign ins to one email get 429 with Retry-After.
+        """
+        data = {'email': 'foo@example.com', 'password': 'littlesecret'}
+        for _ in range(2):
+            response = self.client.post('/account/sign-in/', data)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.post('/account/sign-in/', data)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+        data['email'] = 'bar@example.com'
+        response = self.client.post('/account/sign-in/', data)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # Changing address doesn't reset the bound of the email.
+        data['email'] = ' FOO@example.com'
+        response = self.client.post('/account/sign-in/', data, REMOTE_ADDR='127.0.0.2')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_forwarded_for_is_ignored_without_proxies(self):
+        """
+        Ensure clients can't pick their throttle key with X-Forwarded-For.
+        """
+        data = {'email': 'foo@example.com', 'password': 'littlesecret'}
+        for i in range(3):
+            response = self.client.post(
+                '/account/sign-in/', data, HTTP_X_FORWARDED_FOR=f'10.0.0.{i}'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(THROTTLE_LOCAL_MAX_KEYS=100)
+    def test_spraying_client_does_not_throttle_others(self):
+        """
+        Ensure a client hitting many emails only evicts the oldest counters.
+        """
+
+        def allow(email, ip):
+            request = SimpleNamespace(data={'email': email}, META={'REMOTE_ADDR': ip})
+            return SignInEmailThrottle().allow_request(request, None)
+
+        for i in range(200):
+            allow(f'{i}@example.net', '10.0.0.1')
+
+        allowed = [allow(f'{i}@example.com', f'10.1.0.{i}') for i in range(40)]
+        self.assertTrue(all(allowed))
+        self.assertEqual(len(get_window_store('sign_in_email')), 100)
+        self.assertEqual(len(get_window_store('sign_in')), 0)
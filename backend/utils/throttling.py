@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+
+def estimate(previous, current, elapsed_fraction) -> float:
+    """
+    Sliding window estimate: the previous window counts in proportion to the
+    part of it still covered by the sliding window.
+    """
+    return previous * (1 - elapsed_fraction) + current
+
+
+def retry_after(previous, current, limit, elapsed_fraction, duration) -> float:
+    """
+    Seconds until `estimate` drops under `limit`, assuming no further hits.
+    """
+    if current >= limit:
+        # Wait for the next window, then for this one to decay in turn.
+        return duration * (1 - elapsed_fraction) + duration * (1 - limit / current)
+    return duration * max(0.0, 1 - (limit - current) / previous - elapsed_fraction)
+
+
+class LocalWindowStore:
+    """
+    In-process counters, a few integers per key, for the `max_keys` keys hit
+    most recently: the least recently hit counter is evicted first.
+
+    Counters expire by themselves, a counter two windows old reads as 0.
+    """
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._counters = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._counters)
+
+    def hit(self, key, window_index, duration) -> tuple[int, int]:
+        """
+        Count a hit and return the `(previous, current)` counts before it.
+        """
+        with self._lock:
+            index, previous, current = self._counters.pop(key, (window_index, 0, 0))
+            if index != window_index:
+                previous = current if index == window_index - 1 else 0
+                current = 0
+            self._counters[key] = (window_index, previous, current + 1)
+            if len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        return previous, current
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+
+class CacheWindowStore:
+    """
+    Counters shared through a Django cache, one key per window.
+    """
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def hit(self, key, window_index, duration) -> tuple[int, int]:
+        previous_key = f'{key}:{window_index - 1}'
+        current_key = f'{key}:{window_index}'
+        counts = self.cache.get_many([previous_key, current_key])
+        self.cache.add(current_key, 0, duration * 2)
+        self.cache.incr(current_key)
+        return counts.get(previous_key, 0), counts.get(current_key, 0)
+
+    def clear(self):
+        pass
+
+
+@lru_cache(maxsize=None)
+def get_window_store(scope=None):
+    """
+    Return the store of `scope` set by `THROTTLE_STORE`: 'local' or a cache
+    alias. Local stores are per scope, so keys of one can't evict another's.
+    """
+    if settings.THROTTLE_STORE == 'local':
+        return LocalWindowStore(settings.THROTTLE_LOCAL_MAX_KEYS)
+    return CacheWindowStore(settings.THROTTLE_STORE)
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Throttle `scope` with a sliding window counter. Subclasses return the
+    client key from `get_key`, requests without a key are not throttled.
+
+    Scopes missing from `DEFAULT_THROTTLE_RATES` are not throttled. Rejected
+    requests are counted too, so a client hammering the endpoint stays blocked.
+    """
+
+    scope = None
+
+    def __init__(self):
+        self._wait = None
+
+    def get_key(self, request, view) -> str | None:
+        raise NotImplementedError('.get_key() must be overridden')
+
+    def get_ident(self, request):
+        # DRF trusts X-Forwarded-For when NUM_PROXIES is unset, letting
+        # clients pick their own key.
+        if not api_settings.NUM_PROXIES:
+            return request.META.get('REMOTE_ADDR')
+        return super().get_ident(request)
+
+    def allow_request(self, request, view):
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        key = self.get_key(request, view)
+        if rate is None or key is None:
+            return True
+
+        limit, duration = SimpleRateThrottle.parse_rate(None, rate)
+        now = time.time()
+        window_index, offset = divmod(now, duration)
+        elapsed = offset / duration
+
+        previous, current = get_window_store(self.scope).hit(
+            f'throttle:{self.scope}:{key}', int(window_index), duration
+        )
+        if estimate(previous, current, elapsed) < limit:
+            return True
+
+        self._wait = retry_after(previous, current + 1, limit, elapsed, duration)
+        return False
+
+    def wait(self):
+        return self._wait